@@ -0,0 +1,169 @@
+# 🎲 Estimativa preliminar por amostragem estratificada
+# Em vez de classificar a entrada inteira, sorteia parte das rotinas de cada estrato (Prefixo ×
+# Tipo Programa), classifica só as linhas delas e extrapola os totais com intervalos de confiança.
+# A unidade sorteada é a rotina (arquivo), com todas as suas linhas: assim a deduplicação por
+# (arquivo, localizador) e a contagem de rotinas oficiais impactadas continuam exatas na amostra.
+# O sorteio é um hash do nome do arquivo: a mesma semente sempre escolhe as mesmas rotinas.
+
+import os
+import json
+import math
+import heapq
+import zlib
+from datetime import datetime
+from formatos_entrada import FORMATOS, PULAR
+
+AMOSTRA_PADRAO = float(os.environ.get("CNPJ_AMOSTRA", "0.05"))
+# Rotinas sorteadas no mínimo por estrato (estratos menores entram inteiros)
+MINIMO_POR_ESTRATO = 30
+SEMENTE_PADRAO = 42
+# Quantil da normal para o intervalo de 95%
+Z_95 = 1.96
+
+ARQUIVO_ESTIMATIVA = 'analise_estimativa_amostra.json'
+
+# Métricas extrapoladas: nome -> valor de uma rotina, a partir dos seus pontos de ajuste e descartes
+METRICAS_ESTIMADAS = {
+    'Pontos de Ajuste Crítico': lambda ajustes, descartes, oficial: ajustes,
+    'Pontos Críticos (Oficiais)': lambda ajustes, descartes, oficial: ajustes if oficial else 0,
+    'Rotinas Oficiais Impactadas': lambda ajustes, descartes, oficial: int(oficial and ajustes > 0),
+    'Itens Descartados': lambda ajustes, descartes, oficial: descartes,
+}
+
+
+def estrato(arquivo):
+    """(Prefixo, Tipo Programa) da rotina, como nas tabelas da análise (analise_cnpj.montar_tabela)."""
+    return arquivo[:3].upper(), arquivo.split('.')[-1]
+
+
+def sorteio(arquivo, semente=SEMENTE_PADRAO):
+    """Número em [0, 1) fixo para cada (semente, arquivo)."""
+    return zlib.crc32(f"{semente}:{arquivo}".encode('utf-8')) / 2 ** 32
+
+
+def amostrar(registros, formato, fracao=AMOSTRA_PADRAO, semente=SEMENTE_PADRAO, minimo=MINIMO_POR_ESTRATO):
+    """Sorteia as rotinas da amostra em uma passada sobre a entrada.
+
+    Cada estrato fica com as rotinas de sorteio abaixo de `fracao` ou, se forem menos de `minimo`,
+    com as `minimo` de menor sorteio. Só as linhas das rotinas ainda candidatas são guardadas.
+    Retorna (linhas da amostra, {estrato: rotinas na entrada}, {estrato: [rotinas sorteadas]}).
+    """
+    extrair = FORMATOS[formato]
+    populacao = {}   # estrato -> rotinas na entrada
+    menores = {}     # estrato -> heap (com sinal invertido) dos `minimo` menores sorteios
+    candidatas = {}  # arquivo -> linhas
+    descartadas = set()
+
+    for linha_bruta in registros:
+        linha = linha_bruta.strip()
+        if not linha:
+            continue
+        extraido = extrair(linha)
+        if extraido is None or extraido is PULAR or not extraido[0]:
+            continue
+        arquivo = extraido[0]
+        if arquivo in candidatas:
+            candidatas[arquivo].append(linha)
+            continue
+        if arquivo in descartadas:
+            continue
+
+        grupo = estrato(arquivo)
+        populacao[grupo] = populacao.get(grupo, 0) + 1
+        u = sorteio(arquivo, semente)
+        heap = menores.setdefault(grupo, [])
+        if len(heap) < minimo:
+            heapq.heappush(heap, -u)
+            entra = True
+        elif u < -heap[0]:
+            heapq.heapreplace(heap, -u)
+            entra = True
+        else:
+            entra = u < fracao
+        if entra:
+            candidatas[arquivo] = [linha]
+        else:
+            descartadas.add(arquivo)
+
+    # Ficam as candidatas abaixo da fração ou entre os `minimo` menores sorteios do estrato ao final
+    sorteadas, linhas = {}, []
+    for arquivo, linhas_arquivo in candidatas.items():
+        grupo = estrato(arquivo)
+        u = sorteio(arquivo, semente)
+        if u < fracao or u <= -menores[grupo][0]:
+            sorteadas.setdefault(grupo, []).append(arquivo)
+            linhas.extend(linhas_arquivo)
+    return linhas, populacao, sorteadas
+
+
+def _contagens(tabela):
+    """{arquivo: pontos} de uma tabela de resultados (vazia se None)."""
+    if tabela is None:
+        return {}
+    return tabela['Arquivo'].value_counts().to_dict()
+
+
+def estimar(resultado, populacao, sorteadas, z=Z_95):
+    """Extrapola as METRICAS_ESTIMADAS para a entrada inteira (estimador estratificado por rotina).
+
+    Em cada estrato h com M rotinas, m sorteadas e média ȳ por rotina, o total é M·ȳ e a variância
+    M²·(1 − m/M)·s²/m; os estratos somam. Retorna {métrica: {'estimativa', 'erro_padrao',
+    'ic_inferior', 'ic_superior', 'amostra'}}, com o intervalo limitado ao mínimo observado.
+    """
+    from analise_cnpj import classificar_arquivo
+    ajustes, descartes = _contagens(resultado['ajustes']), _contagens(resultado['descartes'])
+
+    metricas = {}
+    for nome, valor in METRICAS_ESTIMADAS.items():
+        total, variancia, observado = 0.0, 0.0, 0
+        for grupo, arquivos in sorteadas.items():
+            valores = [
+                valor(ajustes.get(a, 0), descartes.get(a, 0), classificar_arquivo(a) == 'Oficiais') for a in arquivos
+            ]
+            M, m = populacao[grupo], len(valores)
+            media = sum(valores) / m
+            total += M * media
+            observado += sum(valores)
+            if m > 1 and m < M:
+                s2 = sum((v - media) ** 2 for v in valores) / (m - 1)
+                variancia += M * M * (1 - m / M) * s2 / m
+        erro = math.sqrt(variancia)
+        metricas[nome] = {
+            'estimativa': round(total),
+            'erro_padrao': round(erro, 1),
+            'ic_inferior': max(observado, math.floor(total - z * erro)),
+            'ic_superior': math.ceil(total + z * erro),
+            'amostra': observado,
+        }
+    return metricas
+
+
+def montar_estimativa(resultado, populacao, sorteadas, fracao, semente, linhas_amostra):
+    """Conteúdo do ARQUIVO_ESTIMATIVA."""
+    return {
+        'gerado_em': datetime.now().isoformat(timespec='seconds'),
+        'fracao': fracao,
+        'semente': semente,
+        'nivel_confianca': 0.95,
+        'estratos': len(populacao),
+        'rotinas_entrada': sum(populacao.values()),
+        'rotinas_amostra': sum(len(arquivos) for arquivos in sorteadas.values()),
+        'linhas_amostra': linhas_amostra,
+        'metricas': estimar(resultado, populacao, sorteadas),
+    }
+
+
+def salvar_estimativa(estimativa, caminho=ARQUIVO_ESTIMATIVA):
+    # Gravado à parte e substituído de uma vez: o dashboard pode estar lendo a estimativa anterior
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, 'w', encoding='utf-8') as arquivo:
+        json.dump(estimativa, arquivo, ensure_ascii=False, indent=2)
+    os.replace(temporario, caminho)
+
+
+def carregar_estimativa(caminho=ARQUIVO_ESTIMATIVA):
+    """Estimativa gravada pela última execução com --amostra, ou None se não existe."""
+    if not os.path.exists(caminho):
+        return None
+    with open(caminho, encoding='utf-8') as arquivo:
+        return json.load(arquivo)
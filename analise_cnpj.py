@@ -0,0 +1,402 @@
+# 📚 Biblioteca de análise de impacto do CNPJ alfanumérico
+# Classificação sem efeitos colaterais: recebe linhas e termos em memória e gera os vereditos sob
+# demanda, sem ler/gravar arquivos nem imprimir. main.py, dashboard.py e servico_analise.py usam esta API.
+#
+#   from analise_cnpj import analisar
+#   for veredito in analisar(linhas, {'CCLI': 'variavel'}):
+#       ...
+
+import re
+from functools import lru_cache
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional
+from formatos_entrada import FORMATOS, FORMATO_PADRAO, PULAR, detectar_formato, separar_amostra
+
+# --- REGRAS DE DESCARTE DE ALTA CONFIANÇA ---
+# Se uma linha corresponder a qualquer uma destas regras, será descartada.
+REGRAS_DESCARTE_CONFIANCA = [
+    # Regra unificada para comentários que será verificada com uma exceção
+    ("Comentário", r"^\s*(;+|//)"),
+    # Novas regras para descartar definições de classes (.cls) que não são código executável
+    ("Definição de Classe (Property, Parameter, etc.)", r"^\s*(Property|Parameter|Index|Method|Class|Relationship|Query|Trigger|ForeignKey)\s+"),
+    ("Definição de Mapeamento XML/Storage", r"^\s*<(Sql|Data|Storage|Index|Stream|Map|Routine)"),
+    ("Definição de Bloco XData", r"^\s*(XData|Import|Include)\s+"),
+    # Movida para cima para ter prioridade sobre regras mais genéricas
+    ("Extração Simples de Substring", r"(\$E|\$EXTRACT)\s*\(\s*\bVARIAVEL\b"),
+    ("String Literal", r'".*\bVARIAVEL\b.*"'),
+    # Novas regras para descartar usos simples em SQL que não representam risco
+    ("Uso como Alias em SQL", r"\bAS\s+'?\bVARIAVEL\b'?,?"),
+    ("Comparação Simples em SQL", r"(WHERE|ON)\s+.*\s*\bVARIAVEL\b\s*(=|LIKE)\s*.*|SET\s+.*\s*\bVARIAVEL\b\s*="),
+    # Regra aprimorada para ser mais específica e evitar descartar atribuições que usam a variável
+    ("Atribuição Simples (de variável)", r"^\s*(S|Set)\s+\w+\s*=\s*\bVARIAVEL\b\s*($|;|,|!)"),
+    # Regra aprimorada para permitir atribuições complexas (com funções, métodos, etc.)
+    ("Atribuição Simples (para variável)", r"^\s*(S|Set)\s+\bVARIAVEL\b\s*=\s*.*($|;|,|!)"),
+    # Regra expandida para cobrir atribuições em lista, como S ALT=0,CCLI=""
+    ('Set para Vazio', r'^\s*(S|Set)\s+.*\bVARIAVEL\b\s*=\s*""|,\s*\bVARIAVEL\b\s*=\s*""'),
+    # Nova regra, focada apenas na comparação
+    ("Comparação com Vazio", r"if\s+'?\bVARIAVEL\b'?\s*=\s*\"\""),
+    # Nova regra para comparação com strings fixas
+    ('Comparação com String Fixa', r'^\s*(I|If)\s+\'?\bVARIAVEL\b\'?\s*=\s*".*"'),
+    ("Uso como Parâmetro Simples", r"(\(|,)\s*\bVARIAVEL\b\s*(\)|,)"),
+    ("Parâmetro em Chamada de Método/Função", r"(##class\(|##super\(|\$\$\w+\^)\([^)]*\bVARIAVEL\b[^)]*\)"),
+    ("Chamada de Rotina (Do)", r"^\s*Do\s+.*\^.*\bVARIAVEL\b"),
+    ("Uso em $ORDER", r"\$O\s*\(.*\bVARIAVEL\b"),
+    # Nova regra para o comando Kill
+    ("Comando Kill", r"^\s*(K|Kill)\s+.*?\bVARIAVEL\b"),
+    # Regra aprimorada para incluir a abreviação 'N' e ser mais precisa
+    ("Declaração New", r"^\s*(N|New)\s+.*?\bVARIAVEL\b"),
+    ("Verificação de Existência ($D, $G)", r"(if\s+\$G|\$D)\(.*\bVARIAVEL\b"),
+]
+
+# --- REGRAS PARA IDENTIFICAR AJUSTES CRÍTICOS ---
+# Todas as linhas não descartadas serão testadas contra estas regras.
+REGRAS_AJUSTE_CRITICO = [
+    # --- VALIDAÇÃO E ENTRADA ---
+    (
+        "Máscara Numérica Explícita", r"\?\d*N", "REFATORACAO_PONTUAL",
+        "Máscara que força entrada numérica - precisa aceitar alfanumérico."
+    ),
+    (
+        "Validação de Comprimento", r"\$L(ENGTH)?\s*\(\s*\bVARIAVEL\b.*\)\s*[=<>]\s*(11|14)", "REFATORACAO_PONTUAL",
+        "Validação de tamanho fixo - precisa ser flexibilizada."
+    ),
+    (
+        "Conversão/Operação Numérica", r"(\$NUMBER|\$ZSTRIP)\s*\(\s*\bVARIAVEL\b|\bVARIAVEL\b\s*[\+\-\*\/]\s*\d+|\d+\s*[\+\-\*\/]\s*\bVARIAVEL\b", "REFATORACAO_PONTUAL",
+        "Conversão para número ou operação aritmética - falhará com alfanumérico."
+    ),
+    # --- LÓGICA DE NEGÓCIO ---
+    (
+        "Padding com Soma", r"(1000000\d{6,}\s*\+\s*\bVARIAVEL\b|\bVARIAVEL\b\s*\+\s*1000000\d{6,})", "REFATORACAO_PONTUAL",
+        "Técnica de padding com soma para ordenação/comparação - incompatível com alfanumérico."
+    ),
+    (
+        "Extração com Lógica Numérica ($E, $EXTRACT)", r"(\$E|\$EXTRACT)\s*\((?=[^)]*\+)[^)]*\bVARIAVEL\b[^)]*\)", "REFATORACAO_PONTUAL",
+        "Extração de substring combinada com soma, indicando manipulação numérica."
+    ),
+    (
+        "Parsing com $PIECE", r"\$P(IECE)?\s*\(\s*\bVARIAVEL\b", "REFATORACAO_PONTUAL",
+        "Parsing da variável - pode ser afetado se o delimitador for um número."
+    ),
+    # --- FORMATAÇÃO E EXIBIÇÃO ---
+    (
+        "Formatação Manual para Exibição", r'(\bVARIAVEL\b\s*_\s*""[\\.\\/\\-]"")|W(RITE)?\s+.*\bVARIAVEL\b', "REFATORACAO_PONTUAL",
+        "Formatação manual para exibição - deve ser substituída por função central."
+    ),
+    # --- INTEGRAÇÃO E REVISÃO MANUAL ---
+    (
+        "Uso em Contexto de Integração", r"(HTTP|REST|SOAP|XML|JSON|EXPORT|IMPORT|FTP|FILE).*\bVARIAVEL\b", "REFATORACAO_PONTUAL",
+        "Uso em contexto de integração. Requer análise manual da compatibilidade."
+    ),
+    # --- ESTRUTURA DE DADOS ---
+    (
+        "Uso em Operação de Banco", r"&(SQL|sql)\(.*\bVARIAVEL\b.*\)|(SELECT|INSERT|UPDATE|DELETE|WHERE|ORDER\s+BY).*\bVARIAVEL\b", "REFATORACAO_PONTUAL",
+        "Operação de banco - verificar tipos de dados, índices e performance da consulta."
+    ),
+]
+
+# Regras usadas quando `analisar` não recebe outras
+REGRAS_PADRAO = {'descarte': REGRAS_DESCARTE_CONFIANCA, 'ajuste': REGRAS_AJUSTE_CRITICO}
+
+RESULTADO_AJUSTE = 'Ajuste'
+RESULTADO_DESCARTE = 'Descarte'
+RESULTADO_IGNORADA = 'Ignorada'
+
+
+class Veredito(NamedTuple):
+    """Resultado da análise de uma linha do dump."""
+    resultado: str                      # RESULTADO_AJUSTE, RESULTADO_DESCARTE ou RESULTADO_IGNORADA
+    arquivo: Optional[str]
+    localizador: Optional[str]
+    variaveis: str                      # Termos encontrados, em ordem alfabética, separados por ', '
+    codigo: str                         # Código da linha (a linha inteira quando ignorada)
+    categoria: Optional[str] = None
+    padrao: Optional[str] = None
+    justificativa: Optional[str] = None
+    motivo: Optional[str] = None        # Regra de descarte ou motivo de a linha ter sido ignorada
+
+
+def classificar_arquivo(nome_arquivo):
+    """Adiciona classificação 'Oficiais', 'Scripts' ou 'Não Oficiais'."""
+    prefixos_oficiais = [
+        'dd', 'gap', 'i', 'audit', 'autobasi', 'basico', 'br', 'cbpi', 'csp',
+        'estoque', 'faturamento', 'fiscal', 'frete', 'gem', 'ipi', 'ipp',
+        'mnemonic', 'precos', 'sistema', 'supervisao', 'tropical', 'tti'
+    ]
+    nome_arquivo_lower = nome_arquivo.lower()
+    if nome_arquivo_lower.startswith('aba'):
+        return 'Scripts'
+    if any(nome_arquivo_lower.startswith(p) for p in prefixos_oficiais):
+        return 'Oficiais'
+    return 'Não Oficiais'
+
+
+def checar_descarte(codigo, var_alvo):
+    """Verifica se a linha deve ser ignorada com base nas regras de descarte de alta confiança."""
+    for motivo, regex in REGRAS_DESCARTE_CONFIANCA:
+        regex_var = regex.replace('VARIAVEL', re.escape(var_alvo))
+        if re.search(regex_var, codigo, re.IGNORECASE):
+            return motivo
+    return None
+
+
+def analisar_ponto_critico(codigo, var_alvo):
+    """Aplica as regras de ajuste crítico e retorna a primeira correspondência."""
+    # Primeiro, verifica regras que não dependem da variável (globais)
+    for nome, regex, categoria, just in REGRAS_AJUSTE_CRITICO:
+        if 'VARIAVEL' not in regex:
+            if re.search(regex, codigo, re.IGNORECASE):
+                return nome, categoria, just, regex
+
+    # Depois, verifica regras vinculadas à variável
+    for nome, regex, categoria, just in REGRAS_AJUSTE_CRITICO:
+        if 'VARIAVEL' in regex:
+            regex_var = regex.replace('VARIAVEL', re.escape(var_alvo))
+            if re.search(regex_var, codigo, re.IGNORECASE):
+                return nome, categoria, just, regex_var
+
+    # Se nenhuma regra crítica corresponder, classifica para revisão manual
+    return "Revisão Manual Necessária", "REFATORACAO_PONTUAL", "Não corresponde a nenhum padrão de ajuste ou descarte conhecido.", "N/A"
+
+
+def compilar_termos(termos):
+    """Regex de busca de cada termo: [(termo, tipo, regex compilada)]."""
+    compilados = []
+    for termo, tipo in termos.items():
+        # Sub-rotinas são buscadas como palavras completas para evitar falsos positivos
+        if tipo == 'sub-rotina':
+            regex = r'\b' + re.escape(termo) + r'\b'
+        # Variáveis e texto-livre podem ser parte de outra string
+        elif tipo in ['variavel', 'texto-livre']:
+            regex = re.escape(termo)
+        else:
+            continue
+        compilados.append((termo, tipo, re.compile(regex, re.IGNORECASE)))
+    return compilados
+
+
+@lru_cache(maxsize=4096)
+def _regra_com_variaveis(regex, variaveis):
+    """Regra com VARIAVEL substituída pelas variáveis da linha (compilada uma vez por combinação)."""
+    vars_regex_linha = r'\b(' + '|'.join(re.escape(v) for v in variaveis) + r')\b'
+    return re.compile(regex.replace('VARIAVEL', vars_regex_linha), re.IGNORECASE)
+
+
+# Um comando segue na linha seguinte quando termina em concatenação, vírgula ou com parênteses
+# abertos, ou quando a linha seguinte começa por concatenação, vírgula ou fechamento de parênteses
+_LITERAL = re.compile(r'"[^"]*"')
+_COMENTARIO = re.compile(r'(^|\s);.*$|//.*$')
+_CONTINUA_NO_FIM = re.compile(r'(_|,|\(|\{)\s*$')
+_CONTINUA_NO_INICIO = re.compile(r'^\s*(_|,|\)|&&|\|\|)')
+
+
+def _continua(texto, seguinte):
+    """Se o comando em `texto` (uma ou mais linhas) prossegue na linha `seguinte`."""
+    texto = _COMENTARIO.sub('', _LITERAL.sub('""', texto))
+    return (texto.count('(') > texto.count(')') or bool(_CONTINUA_NO_FIM.search(texto))
+            or bool(_CONTINUA_NO_INICIO.match(seguinte)))
+
+
+def comando_completo(codigo, antes=(), depois=()):
+    """A linha unida às vizinhas que fazem parte do mesmo comando: (comando, quantidade de linhas)."""
+    partes = [codigo.strip()]
+    for linha in reversed(antes):
+        if not _continua(linha, partes[0]):
+            break
+        partes.insert(0, linha.strip())
+    for linha in depois:
+        if not _continua(' '.join(partes), linha):
+            break
+        partes.append(linha.strip())
+    return ' '.join(partes), len(partes)
+
+
+def _aplicar_regras(texto, variaveis, regras):
+    """Primeira regra de descarte ou de ajuste que casa com o texto: ('descarte', motivo), ('ajuste', regra) ou None."""
+    for motivo, regex in regras['descarte']:
+        if motivo == "Comentário": continue # Já foi tratado
+        if _regra_com_variaveis(regex, variaveis).search(texto):
+            return 'descarte', motivo
+    for regra in regras['ajuste']:
+        if _regra_com_variaveis(regra[1], variaveis).search(texto):
+            return 'ajuste', regra
+    return None
+
+
+def classificar_linha(arquivo, localizador, codigo, termos_encontrados, regras=REGRAS_PADRAO, vizinhas=None):
+    """Veredito de uma linha única de código com os termos encontrados nela ({termo: tipo}).
+
+    `vizinhas` ((linhas anteriores, linhas seguintes) no fonte, opcional) permite classificar pelo
+    comando completo quando a linha sozinha cairia em Revisão Manual.
+    """
+    # Constrói a string de variáveis para o relatório
+    variaveis_str = ", ".join(sorted(termos_encontrados.keys()))
+    base = (arquivo, localizador, variaveis_str, codigo)
+
+    # Etapa 1: Descartar comentários (prioridade máxima e sem exceções)
+    if re.match(r"^\s*(;+|//)", codigo):
+        return Veredito(RESULTADO_DESCARTE, *base, motivo="Comentário")
+
+    # Etapa 2: Descartar rotinas não oficiais ou scripts
+    classificacao_arquivo = classificar_arquivo(arquivo)
+    if classificacao_arquivo in ['Não Oficiais', 'Scripts']:
+        motivo = "Rotina de Script" if classificacao_arquivo == 'Scripts' else "Rotina Não Oficial"
+        return Veredito(RESULTADO_DESCARTE, *base, motivo=motivo)
+
+    # Etapa 3: Separa os termos encontrados por tipo para aplicar lógicas distintas
+    vars_na_linha = [t for t, tipo in termos_encontrados.items() if tipo == 'variavel']
+    subs_na_linha = [t for t, tipo in termos_encontrados.items() if tipo == 'sub-rotina']
+
+    # 3.1: Lógica para Sub-rotinas
+    if subs_na_linha:
+        return Veredito(
+            RESULTADO_AJUSTE, *base, categoria="CHAMADA_SUBROTINA", padrao="Chamada de Sub-rotina",
+            justificativa=f"Chamada à(s) sub-rotina(s): {', '.join(sorted(subs_na_linha))}."
+        )
+
+    # 3.2: Lógica para Variáveis (regras de DESCARTE restantes e depois de AJUSTE CRÍTICO)
+    if vars_na_linha:
+        variaveis = tuple(vars_na_linha)
+        sufixo = ""
+        encontrada = _aplicar_regras(codigo, variaveis, regras)
+        # 3.3: Comando que continua em outras linhas do fonte: as regras valem para o comando inteiro
+        if encontrada is None and vizinhas is not None:
+            comando, linhas = comando_completo(codigo, *vizinhas)
+            if linhas > 1:
+                encontrada = _aplicar_regras(comando, variaveis, regras)
+                sufixo = f" (comando em {linhas} linhas)"
+        if encontrada is not None and encontrada[0] == 'descarte':
+            return Veredito(RESULTADO_DESCARTE, *base, motivo=encontrada[1])
+        if encontrada is not None:
+            nome, _, categoria, just = encontrada[1]
+            return Veredito(RESULTADO_AJUSTE, *base, categoria=categoria, padrao=nome, justificativa=just + sufixo)
+
+    # Etapa 4: Padrão final -> Revisão Manual
+    justificativa = "Termo de texto-livre encontrado." if not vars_na_linha else "Não corresponde a nenhum padrão de ajuste ou descarte conhecido."
+    return Veredito(
+        RESULTADO_AJUSTE, *base, categoria="REFATORACAO_PONTUAL", padrao="Revisão Manual Necessária",
+        justificativa=justificativa
+    )
+
+
+def _agrupar(registros, termos_compilados, extrair, linhas_unicas):
+    """Etapa 1: acrescenta cada linha com termos a `linhas_unicas`; gera os vereditos das ignoradas."""
+    for linha_bruta in registros:
+        linha_strip = linha_bruta.strip()
+        if not linha_strip:
+            continue
+
+        extraido = extrair(linha_strip)
+        if extraido is PULAR:
+            continue
+        if extraido is None or not extraido[0]:
+            yield Veredito(RESULTADO_IGNORADA, None, None, "", linha_strip, motivo="Formato Inválido")
+            continue
+        arquivo, localizador, codigo = extraido
+
+        termos_encontrados = {termo: tipo for termo, tipo, regex in termos_compilados if regex.search(codigo)}
+        if not termos_encontrados:
+            yield Veredito(RESULTADO_IGNORADA, arquivo, localizador, "", linha_strip, motivo="Nenhum Termo Encontrado")
+            continue
+
+        chave = (arquivo, localizador)
+        if chave not in linhas_unicas:
+            linhas_unicas[chave] = (codigo, {})
+        linhas_unicas[chave][1].update(termos_encontrados)
+
+
+def agrupar(registros: Iterable[str], termos: dict, formato: str = FORMATO_PADRAO) -> tuple:
+    """Etapa 1 sobre um trecho da entrada: (linhas únicas, vereditos das linhas ignoradas).
+
+    As linhas únicas são {(arquivo, localizador): (código, {termo: tipo})}, na ordem da primeira
+    ocorrência; trechos consecutivos de uma mesma entrada são unidos por mesclar_agrupamentos.
+    """
+    linhas_unicas = {}
+    ignoradas = list(_agrupar(registros, compilar_termos(termos), FORMATOS[formato], linhas_unicas))
+    return linhas_unicas, ignoradas
+
+
+def mesclar_agrupamentos(parciais) -> tuple:
+    """Une os agrupamentos de trechos consecutivos, na ordem da entrada, por (arquivo, localizador).
+
+    Cada linha única fica com o código da primeira ocorrência e os termos de todas, como na
+    leitura sequencial.
+    """
+    linhas_unicas, ignoradas = {}, []
+    for parcial, ignoradas_parcial in parciais:
+        ignoradas.extend(ignoradas_parcial)
+        for chave, (codigo, termos_encontrados) in parcial.items():
+            if chave not in linhas_unicas:
+                linhas_unicas[chave] = (codigo, {})
+            linhas_unicas[chave][1].update(termos_encontrados)
+    return linhas_unicas, ignoradas
+
+
+def classificar_agrupamento(linhas_unicas: dict, regras: Optional[dict] = None,
+                            contexto: Optional[Callable] = None) -> Iterator[Veredito]:
+    """Etapa 2: classifica cada linha única agrupada.
+
+    `contexto(arquivo, localizador)` devolve as linhas vizinhas no fonte ((anteriores, seguintes) ou
+    None); é chamado só para as linhas que a regra de uma linha deixaria em Revisão Manual.
+    """
+    regras = regras or REGRAS_PADRAO
+    for (arquivo, localizador), (codigo, termos_encontrados) in linhas_unicas.items():
+        veredito = classificar_linha(arquivo, localizador, codigo, termos_encontrados, regras)
+        if contexto is not None and veredito.padrao == "Revisão Manual Necessária" and veredito.variaveis:
+            vizinhas = contexto(arquivo, localizador)
+            if vizinhas is not None:
+                veredito = classificar_linha(arquivo, localizador, codigo, termos_encontrados, regras, vizinhas)
+        yield veredito
+
+
+def analisar(registros: Iterable[str], termos: dict, regras: Optional[dict] = None,
+             formato: Optional[str] = None, contexto: Optional[Callable] = None) -> Iterator[Veredito]:
+    """Analisa linhas de resultado de busca sob demanda.
+
+    `formato` é um dos FORMATOS de formatos_entrada (findStudio, grep -rn, rg --json); sem ele,
+    é detectado pelas primeiras linhas. `termos` é {termo: tipo} ('variavel', 'sub-rotina' ou
+    'texto-livre') e `regras` segue REGRAS_PADRAO. Linhas sem formato ou sem termos saem como
+    RESULTADO_IGNORADA durante a leitura. Um mesmo (arquivo, localizador) pode aparecer em várias
+    buscas e soma os termos de todas, por isso as linhas únicas são classificadas depois de
+    consumir `registros`, uma a uma. `contexto` segue classificar_agrupamento.
+    """
+    if formato is None:
+        amostra, registros = separar_amostra(registros)
+        formato = detectar_formato(amostra)
+
+    # Etapa 1: agrupar por linha de código única (código da primeira ocorrência)
+    linhas_unicas = {}
+    yield from _agrupar(registros, compilar_termos(termos), FORMATOS[formato], linhas_unicas)
+
+    # Etapa 2: classificar cada linha única
+    yield from classificar_agrupamento(linhas_unicas, regras, contexto)
+
+
+def montar_tabela(resultados):
+    """DataFrame de resultados com as colunas derivadas do nome do arquivo (None se vazio)."""
+    if not resultados:
+        return None
+    # pandas só é necessário para montar as tabelas: quem consome os vereditos em fluxo não o importa
+    import pandas as pd
+    df = pd.DataFrame(resultados)
+    df['Tipo Programa'] = df['Arquivo'].str.split('.').str[-1]
+    df['Prefixo'] = df['Arquivo'].str[:3].str.upper()
+    df['Classificação'] = df['Arquivo'].apply(classificar_arquivo)
+    return df
+
+
+def coletar(vereditos):
+    """Agrupa os vereditos em tabelas: {'ajustes', 'descartes' (DataFrames ou None), 'linhas_ignoradas'}."""
+    ajustes, descartes, ignoradas = [], [], []
+    for v in vereditos:
+        if v.resultado == RESULTADO_AJUSTE:
+            ajustes.append({
+                "Arquivo": v.arquivo, "Localizador": v.localizador, "Variável": v.variaveis,
+                "Categoria": v.categoria, "Padrão": v.padrao, "Justificativa": v.justificativa, "Código": v.codigo
+            })
+        elif v.resultado == RESULTADO_DESCARTE:
+            descartes.append({
+                "Arquivo": v.arquivo, "Localizador": v.localizador, "Variável": v.variaveis,
+                "Regra de Descarte": v.motivo, "Código": v.codigo
+            })
+        else:
+            ignoradas.append(f"{v.motivo}: {v.codigo}")
+    return {'ajustes': montar_tabela(ajustes), 'descartes': montar_tabela(descartes), 'linhas_ignoradas': ignoradas}
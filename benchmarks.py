@@ -0,0 +1,836 @@
+# ⏱️ Benchmarks do processamento de código-fonte
+# Compara o motor compilado com a implementação de referência (regex por regra) e confere a saída.
+#
+# Uso: python benchmarks.py [arquivo.txt]   (sem arquivo, gera um COBOL sintético de 1M linhas)
+#      python benchmarks.py --historico     (diff entre duas execuções sintéticas de 2M pontos)
+#      python benchmarks.py --servico       (teste de carga local do serviço HTTP de análise)
+#      python benchmarks.py --formatos      (leitores de entrada: findStudio, grep -rn, rg --json)
+#      python benchmarks.py --leitura       (Etapa 1 sequencial x dividida entre processos, 1M linhas)
+#      python benchmarks.py --compressao    (leitura de entradas .gz/BGZF/.xz/.zst x texto simples)
+#      python benchmarks.py --retomada      (custo dos pontos de retomada e análise interrompida e retomada)
+#      python benchmarks.py --particoes     (Explorador: recorte de 5 prefixos x tabela inteira, 1M pontos)
+#      python benchmarks.py --termos        (inclusão de um termo pelo índice do corpus x análise completa, 1M linhas)
+#      python benchmarks.py --parciais      (fatias analisadas em processos separados e mescladas x análise completa)
+#      python benchmarks.py --simulacao     (simulação Monte Carlo do esforço: 100k e 1M cenários, conferida pela média PERT)
+#      python benchmarks.py --premissas     (precificação com premissas editadas sobre as contagens x recálculo a partir dos pontos)
+
+import os
+import re
+import sys
+import time
+import random
+import tempfile
+import threading
+import json
+import uuid
+import gzip
+import lzma
+import hashlib
+from itertools import zip_longest
+import urllib.request
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from processamento_codigo import (
+    ESTIMATIVAS_CATEGORIA, anexar, resumir_codigo, novos_buffers, buffer_para_dataframe,
+    iterar_linhas, iterar_blocos, varrer_blocos
+)
+from historico_execucoes import registrar_execucao, comparar_execucoes
+from servico_analise import criar_servidor, encerrar_servidor
+from formatos_entrada import FORMATOS, PULAR, extrair_findstudio, detectar_formato
+from analise_cnpj import analisar
+from leitura_paralela import PROCESSOS, analisar_arquivo
+import compressao
+from compressao import gravar_bgzf
+import retomada
+from retomada import identificar_entrada, trechos_texto, analisar_com_retomada
+from particoes import salvar_particoes, carregar_particoes, carregar_manifesto, valores_particao
+from esquemas import aplicar_esquema, ESQUEMA_AJUSTES
+from analise_cnpj import classificar_arquivo, coletar
+from indice_termos import identificar_corpus, construir_corpus, salvar_corpus, reanalisar_termos
+from resultados_parciais import carregar_parcial, mesclar_parciais, resultado_do_parcial
+from simulacao_esforco import PESO_PERT, CAMPOS_CATEGORIA, simular_esforco, resumir_simulacao
+from precificacao import ATIVIDADES_BASE_PROJETO, INCERTEZA_CATEGORIAS_ESFORCO, premissas_padrao, contar_pontos, estimar
+from main import iterar_entrada, executar_parcial, calcular_precificacao
+
+LINHAS_SINTETICAS = 1_000_000
+SEMENTE = 42
+PONTOS_SINTETICOS = 2_000_000
+# Fração dos pontos novos, resolvidos e reclassificados entre as duas execuções sintéticas
+FRACAO_MUDANCAS = 0.01
+
+# Teste de carga do serviço: clientes simultâneos, análises por cliente e linhas por dump
+CLIENTES_SIMULTANEOS = 8
+ANALISES_POR_CLIENTE = 3
+LINHAS_POR_DUMP = 2_000
+CONSULTAS_POR_CLIENTE = 200
+
+# Leitores de entrada (--formatos)
+LINHAS_FORMATOS = 1_000_000
+
+# Etapa 1 em paralelo (--leitura)
+LINHAS_LEITURA = 1_000_000
+# Entradas comprimidas (--compressao)
+LINHAS_COMPRESSAO = 1_000_000
+# Pontos de retomada (--retomada): trechos gravados antes da interrupção simulada
+LINHAS_RETOMADA = 1_000_000
+TRECHOS_ANTES_DA_FALHA = 3
+# Tabela particionada (--particoes): pontos, prefixos distintos e prefixos do recorte (padrão do Explorador)
+PONTOS_PARTICOES = 1_000_000
+PREFIXOS_PARTICOES = 200
+PREFIXOS_RECORTE = 5
+# Alteração incremental de termos: termos da análise completa e o termo incluído depois
+LINHAS_TERMOS = 1_000_000
+TERMOS_ANTERIORES = {'CCLI': 'variavel', 'CGCC': 'variavel', 'CCSU': 'variavel', 'IBSRIC': 'sub-rotina'}
+TERMO_NOVO = {'CGCF': 'variavel'}
+# Análise distribuída: fatias da entrada, cada uma em um processo (como em máquinas separadas)
+LINHAS_PARCIAIS = 1_000_000
+FATIAS_PARCIAIS = 4
+# Simulação do esforço (--simulacao): cenários por rodada e tolerância da média frente à média PERT teórica
+CENARIOS_SIMULACAO = [100_000, 1_000_000]
+TOLERANCIA_MEDIA = 0.005
+# Precificação com premissas editadas (--premissas): pontos da tabela de ajustes e premissas sorteadas
+PONTOS_PREMISSAS = 1_000_000
+RODADAS_PREMISSAS = 200
+
+TERMOS_LEITURA = {'CNPJ': 'variavel', 'CGC': 'variavel', 'CADNAC': 'sub-rotina', 'INSCRICAO': 'texto-livre'}
+ARQUIVO_TERMOS = 'CNPJ 1.csv'
+
+# Trechos de código típicos de um dump do findStudio
+CODIGOS_FINDSTUDIO = [
+    'S X=$P(CCLI,"^",2)', '; comentario CCLI', 'I CCLI="" Q', 'S CCLI=""', 'D ^IBSRIC(CGCC)',
+    'W !,CGCC', '&sql(SELECT * FROM T WHERE CGCC = :x)', 'S Y=CGCF+1', 'S A=$E(CCLI,1,8)',
+    'Set CCSU = ##class(X).Get(CCSU)', 'S Z=$L(CCLI)=14', 'Q CCLI', 'K CCLI', 'N CCLI,X',
+]
+PREFIXOS_FINDSTUDIO = ['fiscal', 'br', 'csp', 'tti', 'aba', 'xyz']
+
+# Linhas típicas de um programa COBOL; poucas citam CNPJ, como no código real
+LINHAS_COBOL = [
+    '       IDENTIFICATION DIVISION.', '       PROGRAM-ID. CADCLI01.', '       WORKING-STORAGE SECTION.',
+    '       01 WS-CLIENTE.', '           05 WS-NOME          PIC X(40).', '           05 WS-ENDERECO      PIC X(60).',
+    '           05 WS-CNPJ          PIC 9(14).', '           05 WS-CGC REDEFINES WS-CNPJ PIC X(14).',
+    '           05 FILLER           PIC X(10) VALUE SPACES.', '       PROCEDURE DIVISION.',
+    '           PERFORM 100-INICIALIZA THRU 100-FIM.', '           MOVE SPACES TO WS-NOME.',
+    '           MOVE CNPJ TO WS-CNPJ-OUT.', '           IF CGC = ZEROS', '               GO TO 900-ERRO',
+    '           END-IF.', '           COMPUTE WS-DV = CNPJ / 11.', '           ADD 1 TO WS-CONTADOR.',
+    "           EXEC SQL SELECT CNPJ INTO :WS-CNPJ FROM CLIENTE END-EXEC.", '           DISPLAY CNPJ',
+    '           DISPLAY "TOTAL: " WS-CONTADOR', '      * VALIDACAO DO CNPJ DO CLIENTE', '      * ROTINA DE LEITURA',
+    '           CALL "VALIDA" USING cnpj', '           STRING CNPJ DELIMITED BY SIZE INTO WS-SAIDA',
+    '           WRITE(REG-CNPJ)', '           READ ARQ-CLIENTE AT END MOVE "S" TO WS-FIM.',
+    '           EVALUATE CGC', '           WHEN OTHER', '      // cgc antigo', '           SEARCH TAB-CGC',
+    '           MOVE cadNacPesJur TO WS-CHAVE', '           05 CadNacPesJur PIC X(14).',
+    '           CALL X USING Cgc CNPJ', '           CLOSE ARQ-CLIENTE.', '           STOP RUN.', '',
+]
+PESOS_COBOL = [8 if 'CNPJ' not in l.upper() and 'CGC' not in l.upper() and 'CADNAC' not in l.upper() else 1
+               for l in LINHAS_COBOL]
+
+
+# === IMPLEMENTAÇÃO DE REFERÊNCIA (uma regex por regra, como antes do motor compilado) ===
+def categorizar_linha_referencia(linha: str) -> str:
+    """Categoriza linha de código"""
+    linha_upper = linha.upper()
+    
+    if any(palavra in linha_upper for palavra in ['VALIDATE', 'CHECK', 'IF', 'WHEN', 'PERFORM']):
+        return 'Validação/Entrada'
+    elif any(palavra in linha_upper for palavra in ['DISPLAY', 'WRITE', 'MOVE', 'STRING']):
+        return 'Formatação/Exibição'
+    elif any(palavra in linha_upper for palavra in ['COMPUTE', 'ADD', 'EVALUATE', 'SEARCH']):
+        return 'Lógica de Negócio'
+    elif any(palavra in linha_upper for palavra in ['EXEC', 'SQL', 'SELECT', 'CICS', 'DB2']):
+        return 'Integrações Externas'
+    elif any(palavra in linha_upper for palavra in ['REDEFINES', 'OCCURS', 'PIC', 'VALUE']):
+        return 'Estrutura de Dados'
+    
+    return None
+
+def varrer_linhas_referencia(linhas, buffers: tuple) -> int:
+    """Classificação linha a linha percorrendo as listas de regex"""
+    padroes_cnpj = [
+        r'\bcnpj\b', r'\bCNPJ\b', r'\bCgc\b', r'\bcgc\b', r'\bCGC\b',
+        r'\bCadNacPesJur\b', r'\bcadNacPesJur\b', r'\bCADNACPESJUR\b'
+    ]
+    
+    regras_descarte = [
+        r'^\s*\*', r'^\s*//', r'^\s*REM\s', r'STRING\s*\(', 
+        r'WRITE\s*\(', r'DISPLAY\s', r'EXHIBIT\s'
+    ]
+    
+    pontos, nao_classificados, descartados = buffers
+    
+    i = 0
+    for i, linha in enumerate(linhas, 1):
+        linha_limpa = linha.strip()
+        
+        if not linha_limpa:
+            continue
+        
+        regra_descarte = None
+        for regra in regras_descarte:
+            if re.search(regra, linha_limpa, re.IGNORECASE):
+                regra_descarte = regra.replace('\\', '').replace('s*', '').replace('b', '')
+                break
+        
+        if regra_descarte:
+            anexar(descartados, i, resumir_codigo(linha_limpa), regra_descarte)
+            continue
+        
+        for padrao in padroes_cnpj:
+            if re.search(padrao, linha_limpa):
+                categoria = categorizar_linha_referencia(linha_limpa)
+                variavel = padrao.replace('\\', '').replace('b', '')
+                
+                if categoria:
+                    anexar(pontos, i, resumir_codigo(linha_limpa), variavel, categoria, ESTIMATIVAS_CATEGORIA.get(categoria, 1.0))
+                else:
+                    anexar(nao_classificados, i, resumir_codigo(linha_limpa), variavel)
+                break
+    
+    return i
+
+
+# === EXECUÇÃO ===
+def gerar_cobol(caminho: str, quantidade: int = LINHAS_SINTETICAS):
+    """Gera um arquivo COBOL sintético com a mistura de linhas de LINHAS_COBOL"""
+    aleatorio = random.Random(SEMENTE)
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        for linha in aleatorio.choices(LINHAS_COBOL, weights=PESOS_COBOL, k=quantidade):
+            arquivo.write(linha + '\n')
+
+def medir(varrer, iterar, caminho: str) -> tuple:
+    """Executa uma varredura completa do arquivo e retorna (segundos, DataFrames, total de linhas)"""
+    buffers = novos_buffers()
+    inicio = time.perf_counter()
+    with open(caminho, 'rb') as arquivo:
+        total_linhas = varrer(iterar(arquivo), buffers)
+    tabelas = [buffer_para_dataframe(b) for b in buffers]
+    return time.perf_counter() - inicio, tabelas, total_linhas
+
+def comparar_motor(caminho: str):
+    """Mede referência x motor compilado e confere que as três tabelas são idênticas"""
+    print(f"📝 Arquivo: {caminho} ({os.path.getsize(caminho) / 1024 / 1024:.1f} MB)")
+    
+    tempo_ref, tabelas_ref, linhas_ref = medir(varrer_linhas_referencia, iterar_linhas, caminho)
+    print(f"   Referência (regex por regra): {tempo_ref:.2f}s")
+    tempo_motor, tabelas_motor, linhas_motor = medir(varrer_blocos, iterar_blocos, caminho)
+    print(f"   Motor compilado:              {tempo_motor:.2f}s")
+    
+    identico = linhas_ref == linhas_motor and all(
+        ref.astype(object).equals(motor.astype(object)) for ref, motor in zip(tabelas_ref, tabelas_motor)
+    )
+    print(f"   Linhas: {linhas_motor:,} | pontos: {len(tabelas_motor[0]):,} | "
+          f"não classificados: {len(tabelas_motor[1]):,} | descartados: {len(tabelas_motor[2]):,}")
+    print(f"   Aceleração: {tempo_ref / tempo_motor:.1f}x | Saída idêntica: {'✅' if identico else '❌'}")
+    return identico
+
+def gerar_pontos(ids: np.ndarray, categorias: np.ndarray) -> pd.DataFrame:
+    """Tabela de ajustes sintética: um ponto por id, em arquivos e rótulos fixos"""
+    serie = pd.Series(ids).astype(str)
+    return pd.DataFrame({
+        'Arquivo': 'prg' + pd.Series(ids % 5000).astype(str) + '.INT',
+        'Localizador': 'LBL' + serie,
+        'Código': 'S X=$P(CCLI,"^",' + serie + ')',
+        'Categoria': 'REFATORACAO_PONTUAL',
+        'Padrão': np.where(categorias, 'Validação de Tamanho', 'Revisão Manual Necessária'),
+    })
+
+def comparar_historico(quantidade: int = PONTOS_SINTETICOS):
+    """Registra duas execuções sintéticas e mede o diff entre elas"""
+    gerador = np.random.default_rng(SEMENTE)
+    mudancas = int(quantidade * FRACAO_MUDANCAS)
+    ids_a = np.arange(quantidade)
+    categorias_a = gerador.random(quantidade) < 0.5
+    # B: remove os primeiros pontos, inclui novos ids e troca o padrão de outros
+    ids_b = np.concatenate([ids_a[mudancas:], np.arange(quantidade, quantidade + mudancas)])
+    categorias_b = np.concatenate([categorias_a[mudancas:], np.zeros(mudancas, dtype=bool)])
+    categorias_b[:mudancas] = ~categorias_b[:mudancas]
+
+    with tempfile.TemporaryDirectory() as pasta:
+        id_a = registrar_execucao(gerar_pontos(ids_a, categorias_a), None, {'Total Estimado': 1000}, pasta)
+        id_b = registrar_execucao(gerar_pontos(ids_b, categorias_b), None, {'Total Estimado': 1100}, pasta)
+        inicio = time.perf_counter()
+        diff = comparar_execucoes(id_a, id_b, pasta)
+        tempo = time.perf_counter() - inicio
+
+    esperado = all(len(diff[nome]) == mudancas for nome in ['adicionados', 'removidos', 'reclassificados'])
+    print(f"🔄 Diff entre execuções de {quantidade:,} pontos: {tempo:.2f}s")
+    print(f"   Novos: {len(diff['adicionados']):,} | resolvidos: {len(diff['removidos']):,} | "
+          f"reclassificados: {len(diff['reclassificados']):,} | Contagens corretas: {'✅' if esperado else '❌'}")
+    return esperado
+
+def gerar_dump_findstudio(quantidade: int, semente: int) -> bytes:
+    """Dump sintético no formato do findStudio: `arquivo(localizador): código`"""
+    aleatorio = random.Random(semente)
+    linhas = [
+        f"{aleatorio.choice(PREFIXOS_FINDSTUDIO)}{aleatorio.randint(0, 300)}.INT"
+        f"(LBL{aleatorio.randint(0, 50)}+{i}): {aleatorio.choice(CODIGOS_FINDSTUDIO)}"
+        for i in range(quantidade)
+    ]
+    return ('\n'.join(linhas) + '\n').encode('utf-8')
+
+def montar_multipart(campos: dict) -> tuple:
+    """Corpo multipart/form-data para {nome: bytes}; retorna (content-type, corpo)"""
+    fronteira = uuid.uuid4().hex
+    partes = []
+    for nome, conteudo in campos.items():
+        partes.append(
+            f'--{fronteira}\r\nContent-Disposition: form-data; name="{nome}"; filename="{nome}"\r\n'
+            f'Content-Type: application/octet-stream\r\n\r\n'.encode('utf-8') + conteudo + b'\r\n'
+        )
+    partes.append(f'--{fronteira}--\r\n'.encode('utf-8'))
+    return f'multipart/form-data; boundary={fronteira}', b''.join(partes)
+
+def percentil(valores: list, p: float) -> float:
+    """Percentil p (0-100) de uma lista de tempos"""
+    return float(np.percentile(valores, p)) if valores else float('nan')
+
+def cliente_carga(base: str, indice: int, termos: bytes) -> dict:
+    """Um cliente: envia análises, acompanha o progresso em fluxo e consulta a situação"""
+    tempos = {'envio': [], 'analise': [], 'consulta': [], 'recusadas': 0, 'erros': 0}
+    for n in range(ANALISES_POR_CLIENTE):
+        tipo, corpo = montar_multipart({
+            'entrada': gerar_dump_findstudio(LINHAS_POR_DUMP, SEMENTE + indice * 100 + n), 'termos': termos
+        })
+        inicio = time.perf_counter()
+        pedido = urllib.request.Request(f"{base}/analises", data=corpo, headers={'Content-Type': tipo})
+        try:
+            with urllib.request.urlopen(pedido) as resposta:
+                id_trabalho = json.load(resposta)['id']
+        except urllib.error.HTTPError as erro:
+            tempos['recusadas' if erro.code == 429 else 'erros'] += 1
+            continue
+        tempos['envio'].append(time.perf_counter() - inicio)
+
+        # Consultas curtas enquanto a análise roda (carga sobre a camada HTTP)
+        for _ in range(CONSULTAS_POR_CLIENTE // ANALISES_POR_CLIENTE):
+            antes = time.perf_counter()
+            with urllib.request.urlopen(f"{base}/analises/{id_trabalho}") as resposta:
+                resposta.read()
+            tempos['consulta'].append(time.perf_counter() - antes)
+
+        # O fluxo de progresso termina junto com a análise; a última linha é a situação final
+        with urllib.request.urlopen(f"{base}/analises/{id_trabalho}/progresso") as resposta:
+            final = json.loads(resposta.read().splitlines()[-1])
+        tempos['analise'].append(time.perf_counter() - inicio)
+        if final.get('status') != 'concluida':
+            tempos['erros'] += 1
+            continue
+        with urllib.request.urlopen(f"{base}/analises/{id_trabalho}/tabelas/ajustes?formato=json") as resposta:
+            if not json.load(resposta):
+                tempos['erros'] += 1
+    return tempos
+
+def testar_servico():
+    """Sobe o serviço em uma porta livre e mede vazão e latência com clientes simultâneos"""
+    with open(ARQUIVO_TERMOS, 'rb') as arquivo:
+        termos = arquivo.read()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        servidor = criar_servidor(porta=0, pasta=pasta)
+        base = f"http://127.0.0.1:{servidor.server_address[1]}"
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        print(f"🌐 Serviço em {base}: {CLIENTES_SIMULTANEOS} clientes x {ANALISES_POR_CLIENTE} análises "
+              f"de {LINHAS_POR_DUMP:,} linhas")
+        try:
+            inicio = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=CLIENTES_SIMULTANEOS) as clientes:
+                resultados = list(clientes.map(
+                    lambda i: cliente_carga(base, i, termos), range(CLIENTES_SIMULTANEOS)
+                ))
+            duracao = time.perf_counter() - inicio
+        finally:
+            encerrar_servidor(servidor)
+
+    tempos = {chave: [t for r in resultados for t in r[chave]] for chave in ['envio', 'analise', 'consulta']}
+    recusadas = sum(r['recusadas'] for r in resultados)
+    erros = sum(r['erros'] for r in resultados)
+    requisicoes = len(tempos['envio']) + len(tempos['consulta']) + 2 * len(tempos['analise'])
+    print(f"   Duração: {duracao:.1f}s | requisições: {requisicoes:,} ({requisicoes / duracao:.1f} req/s)")
+    print(f"   Análises concluídas: {len(tempos['analise'])} ({len(tempos['analise']) / duracao * 60:.1f}/min) | "
+          f"recusadas (fila cheia): {recusadas} | erros: {erros}")
+    for nome, chave in [('Envio (POST)', 'envio'), ('Consulta (GET)', 'consulta'), ('Análise completa', 'analise')]:
+        print(f"   {nome:<17} p50: {percentil(tempos[chave], 50) * 1000:8.1f} ms | "
+              f"p95: {percentil(tempos[chave], 95) * 1000:8.1f} ms")
+    return erros == 0
+
+def extrair_findstudio_referencia(linha: str):
+    """Leitor original do findStudio (regex), referência para o leitor por delimitadores"""
+    if "Searching for" in linha:
+        return PULAR
+    match = re.match(r"^(.*?)\((.*?)\)(.*?):\s*(.*)", linha)
+    if match:
+        arquivo, loc_parens, loc_brackets, codigo = match.groups()
+        return arquivo.strip(), loc_parens.strip() + loc_brackets.strip(), codigo.strip()
+    return None
+
+def gerar_linhas_formatos(quantidade: int) -> dict:
+    """Os mesmos resultados de busca em cada formato de entrada: {formato: [linhas]}"""
+    aleatorio = random.Random(SEMENTE)
+    pontos = [
+        (f"{aleatorio.choice(PREFIXOS_FINDSTUDIO)}{aleatorio.randint(0, 300)}.INT", i + 1,
+         aleatorio.choice(CODIGOS_FINDSTUDIO))
+        for i in range(quantidade)
+    ]
+    return {
+        'findstudio': [f"{arquivo}({numero}): {codigo}" for arquivo, numero, codigo in pontos],
+        'grep': [f"{arquivo}:{numero}:{codigo}" for arquivo, numero, codigo in pontos],
+        'ripgrep-json': [
+            json.dumps({'type': 'match', 'data': {
+                'path': {'text': arquivo}, 'lines': {'text': codigo + '\n'}, 'line_number': numero,
+                'absolute_offset': 0, 'submatches': []
+            }})
+            for arquivo, numero, codigo in pontos
+        ],
+    }
+
+# Linhas limite do findStudio: delimitadores faltando, repetidos ou fora de ordem
+CASOS_FINDSTUDIO = [
+    "a(b): c", "a(b)[c]: d", "a(b)c:d:e", "a(b(c)): d", "a((b)): c", "(b): c", "a(): c", "a(b) c",
+    "a(b:c): d", "a:b(c): d", "a)b(c): d", "a(b)", "a(", "a(b", ":", "()", "():", "a ( b ) [ c ] :  d  ",
+    "Searching for CNPJ", "FISCAL.INT(LBL1+2):    MOVE CNPJ TO X", "x.int(1)\t:\tcodigo",
+]
+
+def testar_formatos(quantidade: int = LINHAS_FORMATOS):
+    """Vazão de cada leitor de entrada e conferência do findStudio com o leitor original"""
+    linhas = gerar_linhas_formatos(quantidade)
+    esperado = [extrair_findstudio(l) for l in linhas['findstudio']]
+    print(f"📥 Leitores de entrada com {quantidade:,} linhas por formato")
+
+    inicio = time.perf_counter()
+    referencia = [extrair_findstudio_referencia(l) for l in linhas['findstudio']]
+    tempo_referencia = time.perf_counter() - inicio
+    print(f"   {'findstudio (regex)':<20} {quantidade / tempo_referencia:>12,.0f} linhas/s")
+
+    identico = referencia == esperado
+    for nome, extrair in FORMATOS.items():
+        inicio = time.perf_counter()
+        extraidos = [extrair(l) for l in linhas[nome]]
+        tempo = time.perf_counter() - inicio
+        # Mesmo ponto de código em todos os formatos (o localizador do findStudio sintético é o número da linha)
+        confere = extraidos == esperado
+        identico &= confere
+        print(f"   {nome:<20} {quantidade / tempo:>12,.0f} linhas/s | "
+              f"Mesmos pontos: {'✅' if confere else '❌'}")
+
+    # Casos limite e linhas embaralhadas: o leitor por delimitadores deve igualar a regex
+    aleatorio = random.Random(SEMENTE)
+    simbolos = list("ab()[]: \t")
+    casos = CASOS_FINDSTUDIO + [
+        ''.join(aleatorio.choice(simbolos) for _ in range(aleatorio.randint(1, 12))) for _ in range(100_000)
+    ]
+    casos = [caso.strip() for caso in casos if caso.strip()]
+    divergentes = [c for c in casos if extrair_findstudio(c) != extrair_findstudio_referencia(c)]
+    identico &= not divergentes
+    print(f"   Casos limite do findStudio: {len(casos):,} | divergentes: {len(divergentes)} "
+          f"{'✅' if not divergentes else '❌ ' + repr(divergentes[:5])}")
+
+    detectados = {nome: detectar_formato(l[:50]) for nome, l in linhas.items()}
+    inicio = time.perf_counter()
+    for _ in range(1_000):
+        detectar_formato(linhas['findstudio'][:50])
+    tempo = (time.perf_counter() - inicio) / 1_000
+    confere = all(nome == detectado for nome, detectado in detectados.items())
+    identico &= confere
+    print(f"   Detecção do formato: {tempo * 1000:.2f} ms | Corretos: {'✅' if confere else '❌ ' + str(detectados)}")
+    return identico
+
+def comparar_leitura(quantidade: int = LINHAS_LEITURA, processos: int = max(PROCESSOS, 2)):
+    """Etapa 1 sequencial x faixas do arquivo mapeado em processos, com os mesmos vereditos"""
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "findstudio_sintetico.txt")
+        with open(caminho, 'wb') as arquivo:
+            for parte in range(0, quantidade, 500_000):
+                arquivo.write(gerar_dump_findstudio(min(500_000, quantidade - parte), SEMENTE + parte))
+        tamanho = os.path.getsize(caminho) / 1024 / 1024
+        print(f"🧵 Etapa 1 com {quantidade:,} linhas ({tamanho:,.0f} MB), {processos} processos "
+              f"({os.cpu_count()} CPUs)")
+
+        inicio = time.perf_counter()
+        with open(caminho, 'r', encoding='utf-8', errors='ignore') as arquivo:
+            sequencial = list(analisar(arquivo, TERMOS_LEITURA, formato='findstudio'))
+        tempo_sequencial = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        identico = True
+        for esperado, veredito in zip_longest(
+            sequencial, analisar_arquivo(caminho, TERMOS_LEITURA, 'findstudio', processos=processos)
+        ):
+            identico &= esperado == veredito
+        tempo_paralelo = time.perf_counter() - inicio
+
+    print(f"   Sequencial: {tempo_sequencial:.2f}s | Paralelo: {tempo_paralelo:.2f}s "
+          f"({tempo_sequencial / tempo_paralelo:.1f}x) | Vereditos idênticos: {'✅' if identico else '❌'}")
+    return identico
+
+def ler_entrada(caminho: str) -> tuple:
+    """Lê todas as linhas como a análise lê a entrada; retorna (linhas, resumo do conteúdo, segundos)"""
+    resumo = hashlib.blake2b()
+    inicio = time.perf_counter()
+    linhas = 0
+    for linha in iterar_entrada(caminho):
+        resumo.update(linha.encode('utf-8'))
+        linhas += 1
+    return linhas, resumo.hexdigest(), time.perf_counter() - inicio
+
+def comparar_compressao(quantidade: int = LINHAS_COMPRESSAO):
+    """Vazão da leitura de cada compressão em relação ao texto simples, com as mesmas linhas"""
+    threads = max(compressao.THREADS_DESCOMPRESSAO, 2)
+    with tempfile.TemporaryDirectory() as pasta:
+        texto = os.path.join(pasta, "dump.txt")
+        with open(texto, 'wb') as arquivo:
+            for parte in range(0, quantidade, 500_000):
+                arquivo.write(gerar_dump_findstudio(min(500_000, quantidade - parte), SEMENTE + parte))
+        with open(texto, 'rb') as arquivo:
+            conteudo = arquivo.read()
+        tamanho = len(conteudo) / 1024 / 1024
+
+        arquivos = {'texto': texto}
+        arquivos['gzip'] = os.path.join(pasta, "dump.txt.gz")
+        with open(arquivos['gzip'], 'wb') as arquivo:
+            arquivo.write(gzip.compress(conteudo, 6))
+        arquivos['bgzf'] = os.path.join(pasta, "dump.bgzf.gz")
+        gravar_bgzf(texto, arquivos['bgzf'])
+        arquivos['xz'] = os.path.join(pasta, "dump.txt.xz")
+        with open(arquivos['xz'], 'wb') as arquivo:
+            arquivo.write(lzma.compress(conteudo, preset=1))
+        if compressao.zstd is not None or compressao.zstandard is not None:
+            arquivos['zstd'] = os.path.join(pasta, "dump.txt.zst")
+            with open(arquivos['zstd'], 'wb') as arquivo:
+                if compressao.zstd is not None:
+                    arquivo.write(compressao.zstd.compress(conteudo))
+                else:
+                    arquivo.write(compressao.zstandard.ZstdCompressor().compress(conteudo))
+        del conteudo
+
+        print(f"🗜️ Leitura de {quantidade:,} linhas ({tamanho:,.0f} MB descomprimidos)"
+              + ("" if 'zstd' in arquivos else " | zstd: sem `zstandard`, não medido"))
+        referencia = None
+        identico = True
+        original = compressao.THREADS_DESCOMPRESSAO
+        medicoes = [(nome, caminho, 1) for nome, caminho in arquivos.items()]
+        medicoes.insert(3, ('bgzf', arquivos['bgzf'], threads))
+        try:
+            for nome, caminho, threads_leitura in medicoes:
+                compressao.THREADS_DESCOMPRESSAO = threads_leitura
+                linhas, resumo, tempo = ler_entrada(caminho)
+                referencia = referencia or (linhas, resumo, tempo)
+                confere = (linhas, resumo) == referencia[:2]
+                identico &= confere
+                rotulo = f"{nome} ({threads_leitura} threads)" if nome == 'bgzf' else nome
+                print(f"   {rotulo:<18} {os.path.getsize(caminho) / 1024 / 1024:7.1f} MB | {tempo:6.2f}s | "
+                      f"{tamanho / tempo:7.1f} MB/s | {tempo / referencia[2]:4.2f}x o texto | "
+                      f"Mesmas linhas: {'✅' if confere else '❌'}")
+        finally:
+            compressao.THREADS_DESCOMPRESSAO = original
+    return identico
+
+def interromper_apos(trechos, quantidade: int):
+    """Etapa 1 que falha depois de `quantidade` trechos (simula a análise morta no meio)"""
+    def trechos_com_falha(inicio):
+        for numero, trecho in enumerate(trechos(inicio)):
+            if numero == quantidade:
+                raise KeyboardInterrupt
+            yield trecho
+    return trechos_com_falha
+
+def comparar_retomada(quantidade: int = LINHAS_RETOMADA):
+    """Análise com pontos de retomada x sem, e interrompida + retomada x sem interrupção"""
+    original = retomada.TAMANHO_TRECHO
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "findstudio_sintetico.txt")
+        with open(caminho, 'wb') as arquivo:
+            for parte in range(0, quantidade, 500_000):
+                arquivo.write(gerar_dump_findstudio(min(500_000, quantidade - parte), SEMENTE + parte))
+        log_retomada = os.path.join(pasta, "checkpoint.log")
+        identidade = identificar_entrada(caminho, TERMOS_LEITURA, 'findstudio')
+        trechos = trechos_texto(caminho, TERMOS_LEITURA, 'findstudio')
+        # Trechos menores que o padrão, para haver vários pontos de retomada no arquivo sintético
+        retomada.TAMANHO_TRECHO = max(1, os.path.getsize(caminho) // 10)
+        print(f"💾 Pontos de retomada com {quantidade:,} linhas "
+              f"(trechos de {retomada.TAMANHO_TRECHO / 1024 / 1024:.1f} MB)")
+        try:
+            inicio = time.perf_counter()
+            with open(caminho, 'r', encoding='utf-8', errors='ignore') as arquivo:
+                sequencial = list(analisar(arquivo, TERMOS_LEITURA, formato='findstudio'))
+            tempo_sequencial = time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            com_retomada = analisar_com_retomada(log_retomada, identidade, trechos, log=lambda mensagem: None)
+            tempo_retomada = time.perf_counter() - inicio
+
+            try:
+                analisar_com_retomada(log_retomada, identidade, interromper_apos(trechos, TRECHOS_ANTES_DA_FALHA),
+                                      log=lambda mensagem: None)
+            except KeyboardInterrupt:
+                pass
+            inicio = time.perf_counter()
+            retomado = analisar_com_retomada(log_retomada, identidade, trechos, retomar=True, log=lambda mensagem: None)
+            tempo_retomado = time.perf_counter() - inicio
+        finally:
+            retomada.TAMANHO_TRECHO = original
+
+        # Entrada vazia: nenhum trecho (o arquivo não pode ser mapeado em memória) e nenhum veredito
+        vazio = os.path.join(pasta, "vazio.txt")
+        open(vazio, 'wb').close()
+        vazia = analisar_com_retomada(os.path.join(pasta, "checkpoint_vazio.log"),
+                                      identificar_entrada(vazio, TERMOS_LEITURA, 'findstudio'),
+                                      trechos_texto(vazio, TERMOS_LEITURA, 'findstudio'), log=lambda mensagem: None)
+
+    identico = com_retomada == sequencial and retomado == sequencial and vazia == []
+    print(f"   Sem pontos: {tempo_sequencial:.2f}s | Com pontos: {tempo_retomada:.2f}s "
+          f"(+{tempo_retomada / tempo_sequencial - 1:.0%}) | Retomada após {TRECHOS_ANTES_DA_FALHA} trechos: "
+          f"{tempo_retomado:.2f}s | Vereditos idênticos: {'✅' if identico else '❌'} | "
+          f"Entrada vazia: {'✅' if vazia == [] else '❌'}")
+    return identico
+
+def gerar_ajustes_prefixos(quantidade: int, prefixos: int) -> pd.DataFrame:
+    """Tabela de ajustes sintética no esquema do relatório, com pontos espalhados por `prefixos` prefixos"""
+    gerador = np.random.default_rng(SEMENTE)
+    # Prefixo de 3 letras por grupo (ex.: 'fab'); a primeira letra alterna entre prefixos oficiais e não oficiais
+    iniciais = 'fbcaxgti'
+    nomes = [iniciais[p % len(iniciais)] + chr(97 + p // 26 % 26) + chr(97 + p % 26) for p in range(prefixos)]
+    arquivos = pd.Series([f"{nome}{a:02d}.INT" for nome in nomes for a in range(20)])
+    df = gerar_pontos(np.arange(quantidade), gerador.random(quantidade) < 0.5)
+    df['Arquivo'] = arquivos.iloc[gerador.integers(0, len(arquivos), quantidade)].to_numpy()
+    df['Variável'] = 'CCLI'
+    df['Justificativa'] = 'Sintético'
+    df['Tipo Programa'] = 'INT'
+    df['Prefixo'] = df['Arquivo'].str[:3].str.upper()
+    df['Classificação'] = df['Arquivo'].map(classificar_arquivo)
+    # Mesma ordem do relatório Excel (main.preparar_relatorio)
+    df = df.sort_values(by=['Classificação', 'Arquivo', 'Localizador'])
+    return aplicar_esquema(df, ESQUEMA_AJUSTES).reset_index(drop=True)
+
+def comparar_particoes(quantidade: int = PONTOS_PARTICOES):
+    """Carga do Explorador: partições dos prefixos selecionados x tabela inteira, com as mesmas linhas"""
+    df = gerar_ajustes_prefixos(quantidade, PREFIXOS_PARTICOES)
+    with tempfile.TemporaryDirectory() as pasta:
+        destino = os.path.join(pasta, "ajustes_particoes")
+        inicio = time.perf_counter()
+        salvar_particoes(df, destino)
+        tempo_gravacao = time.perf_counter() - inicio
+        prefixos = valores_particao(carregar_manifesto(destino), 'Prefixo')
+        print(f"🗂️ Tabela de {quantidade:,} pontos em {len(prefixos)} prefixos | gravação particionada: "
+              f"{tempo_gravacao:.2f}s")
+
+        inicio = time.perf_counter()
+        inteira, _ = carregar_particoes(destino, ESQUEMA_AJUSTES)
+        tempo_inteira = time.perf_counter() - inicio
+        memoria_inteira = inteira.memory_usage(deep=True).sum() / 1024 / 1024
+        del inteira
+
+        selecionados = prefixos[:PREFIXOS_RECORTE]
+        inicio = time.perf_counter()
+        recorte, linhas = carregar_particoes(destino, ESQUEMA_AJUSTES, {'Prefixo': selecionados})
+        tempo_recorte = time.perf_counter() - inicio
+        memoria_recorte = recorte.memory_usage(deep=True).sum() / 1024 / 1024
+
+    esperado = df.iloc[linhas].reset_index(drop=True)
+    identico = recorte.reset_index(drop=True).equals(esperado) and len(recorte) == df['Prefixo'].isin(selecionados).sum()
+    print(f"   Tabela inteira: {tempo_inteira:.2f}s, {memoria_inteira:,.0f} MB | "
+          f"{len(selecionados)} prefixos ({len(recorte):,} linhas): {tempo_recorte:.3f}s, {memoria_recorte:,.1f} MB | "
+          f"Mesmas linhas: {'✅' if identico else '❌'}")
+    return identico
+
+def resultados_iguais(a: dict, b: dict) -> bool:
+    """Mesmas tabelas e mesmas linhas ignoradas (em qualquer ordem)"""
+    return sorted(a['linhas_ignoradas']) == sorted(b['linhas_ignoradas']) and all(
+        (a[nome] is None and b[nome] is None) or a[nome].reset_index(drop=True).equals(b[nome].reset_index(drop=True))
+        for nome in ('ajustes', 'descartes')
+    )
+
+def comparar_termos(quantidade: int = LINHAS_TERMOS):
+    """Inclusão de um termo: reanálise pelo índice do corpus x análise completa, com o mesmo resultado"""
+    termos_novos = {**TERMOS_ANTERIORES, **TERMO_NOVO}
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "findstudio_sintetico.txt")
+        with open(caminho, 'wb') as arquivo:
+            for parte in range(0, quantidade, 500_000):
+                arquivo.write(gerar_dump_findstudio(min(500_000, quantidade - parte), SEMENTE + parte))
+        pasta_corpus = os.path.join(pasta, "corpus")
+        identidade = identificar_corpus(caminho, 'findstudio')
+        print(f"🔤 Inclusão de {', '.join(TERMO_NOVO)} em {len(TERMOS_ANTERIORES)} termos, {quantidade:,} linhas")
+
+        inicio = time.perf_counter()
+        anterior = coletar(analisar(iterar_entrada(caminho), TERMOS_ANTERIORES, formato='findstudio'))
+        tempo_anterior = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        salvar_corpus(pasta_corpus, identidade, TERMOS_ANTERIORES, construir_corpus(iterar_entrada(caminho), 'findstudio'),
+                      anterior)
+        tempo_corpus = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        incremental = reanalisar_termos(pasta_corpus, identidade, termos_novos, log=lambda mensagem: None)
+        tempo_incremental = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        completo = coletar(analisar(iterar_entrada(caminho), termos_novos, formato='findstudio'))
+        tempo_completo = time.perf_counter() - inicio
+
+    identico = resultados_iguais(incremental, completo)
+    print(f"   Análise completa anterior: {tempo_anterior:.2f}s + corpus indexado: {tempo_corpus:.2f}s "
+          f"(+{tempo_corpus / tempo_anterior:.0%})")
+    print(f"   Com o termo novo: completa {tempo_completo:.2f}s | pelo índice {tempo_incremental:.2f}s "
+          f"({tempo_completo / tempo_incremental:.1f}x) | Resultado idêntico: {'✅' if identico else '❌'}")
+    return identico
+
+def analisar_fatia(caminho: str, termos_csv: str, destino: str, parte: int, partes: int) -> float:
+    """Um nó da análise distribuída: grava o parcial da fatia e retorna o tempo gasto"""
+    inicio = time.perf_counter()
+    executar_parcial([caminho], termos_csv, destino, parte, partes, log=lambda mensagem: None, processos=1,
+                     pasta_fontes=None)
+    return time.perf_counter() - inicio
+
+def comparar_parciais(quantidade: int = LINHAS_PARCIAIS, fatias: int = FATIAS_PARCIAIS):
+    """Fatias em processos separados + mescla (em duas ordens/árvores) x análise completa, com o mesmo resultado"""
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "findstudio_sintetico.txt")
+        with open(caminho, 'wb') as arquivo:
+            for parte in range(0, quantidade, 500_000):
+                arquivo.write(gerar_dump_findstudio(min(500_000, quantidade - parte), SEMENTE + parte))
+        termos_csv = os.path.join(pasta, "termos.csv")
+        pd.DataFrame({'termo': list(TERMOS_LEITURA), 'tipo': list(TERMOS_LEITURA.values())}).to_csv(
+            termos_csv, sep=';', index=False)
+        print(f"🧩 {quantidade:,} linhas em {fatias} fatias, cada uma em um processo")
+
+        inicio = time.perf_counter()
+        completo = coletar(analisar(iterar_entrada(caminho), TERMOS_LEITURA, formato='findstudio'))
+        tempo_completo = time.perf_counter() - inicio
+
+        destinos = [os.path.join(pasta, f"parcial_{parte}.parquet") for parte in range(1, fatias + 1)]
+        inicio = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=fatias) as executor:
+            tempos = list(executor.map(analisar_fatia, [caminho] * fatias, [termos_csv] * fatias, destinos,
+                                       range(1, fatias + 1), [fatias] * fatias))
+        tempo_fatias = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        parciais = [carregar_parcial(destino) for destino in destinos]
+        plano = mesclar_parciais(parciais)
+        tempo_mescla = time.perf_counter() - inicio
+        # Mesma mescla em ordem inversa e em árvore: ((n, ..., 3), (2, 1))
+        metade = fatias // 2
+        arvore = mesclar_parciais([mesclar_parciais(parciais[:metade - 1:-1]), mesclar_parciais(parciais[metade - 1::-1])])
+
+    independente = (plano['metadados'] == arvore['metadados'] and plano['pontos'].equals(arvore['pontos'])
+                    and plano['ignoradas'].equals(arvore['ignoradas']))
+    identico = independente and resultados_iguais(resultado_do_parcial(plano), completo)
+    print(f"   Completa: {tempo_completo:.2f}s | Fatias: {tempo_fatias:.2f}s no total "
+          f"(a maior: {max(tempos):.2f}s) + mescla {tempo_mescla:.2f}s")
+    print(f"   Mescla independente da ordem: {'✅' if independente else '❌'} | "
+          f"Igual à análise completa: {'✅' if identico else '❌'}")
+    return identico
+
+def media_pert(atividades, incerteza_categorias) -> dict:
+    """Esforço médio teórico por categoria: média PERT de cada frente x média do fator lognormal"""
+    medias = {}
+    for categoria, campo in CAMPOS_CATEGORIA.items():
+        soma = sum(
+            config[campo] * (config['incerteza']['otimista'] + PESO_PERT + config['incerteza']['pessimista'])
+            / (PESO_PERT + 2)
+            for config in atividades.values()
+        )
+        medias[categoria] = soma * np.exp(incerteza_categorias[categoria] ** 2 / 2)
+    return medias
+
+def testar_simulacao(cenarios: list = CENARIOS_SIMULACAO):
+    """Tempo da simulação vetorizada e conferência: média teórica, reprodutibilidade e caso sem incerteza"""
+    teoricas = media_pert(ATIVIDADES_BASE_PROJETO, INCERTEZA_CATEGORIAS_ESFORCO)
+    print(f"📈 Simulação do esforço: {len(ATIVIDADES_BASE_PROJETO)} frentes x {len(CAMPOS_CATEGORIA)} categorias")
+    corretas = True
+    for quantidade in cenarios:
+        inicio = time.perf_counter()
+        esforcos = simular_esforco(ATIVIDADES_BASE_PROJETO, INCERTEZA_CATEGORIAS_ESFORCO, quantidade)
+        tempo_sorteio = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        tabelas = resumir_simulacao(ATIVIDADES_BASE_PROJETO, esforcos)
+        tempo_resumo = time.perf_counter() - inicio
+        desvios = {c: abs(esforcos[c].sum(axis=1).mean() / teoricas[c] - 1) for c in CAMPOS_CATEGORIA}
+        dentro = all(desvio <= TOLERANCIA_MEDIA for desvio in desvios.values())
+        corretas &= dentro
+        total = tabelas['simulacao'].set_index('Métrica').loc['Total Estimado']
+        print(f"   {quantidade:,} cenários: sorteio {tempo_sorteio:.3f}s + percentis/histograma {tempo_resumo:.3f}s | "
+              f"P50 {total['P50 (h)']}h, P80 {total['P80 (h)']}h, P95 {total['P95 (h)']}h | "
+              f"Média x teórica: {max(desvios.values()):.2%} {'✅' if dentro else '❌'}")
+
+    # Mesma semente, mesmos cenários; sem incerteza, todos os percentis são a estimativa determinística
+    repetida = [resumir_simulacao(ATIVIDADES_BASE_PROJETO, simular_esforco(
+        ATIVIDADES_BASE_PROJETO, INCERTEZA_CATEGORIAS_ESFORCO, cenarios[0]))['simulacao'] for _ in range(2)]
+    reprodutivel = repetida[0].equals(repetida[1])
+    fixas = {nome: {k: v for k, v in config.items() if k != 'incerteza'} for nome, config in ATIVIDADES_BASE_PROJETO.items()}
+    sem_incerteza = resumir_simulacao(fixas, simular_esforco(fixas, {}, 1_000))['simulacao']
+    degenerada = all((sem_incerteza[coluna] == sem_incerteza['Determinístico (h)']).all()
+                     for coluna in ['Média (h)', 'P50 (h)', 'P80 (h)', 'P95 (h)'])
+    print(f"   Reprodutível pela semente: {'✅' if reprodutivel else '❌'} | "
+          f"Sem incerteza = determinístico: {'✅' if degenerada else '❌'}")
+    return corretas and reprodutivel and degenerada
+
+def sortear_premissas(gerador) -> dict:
+    """Premissas editadas como no dashboard: horas por frente, taxas por ponto e buffer"""
+    premissas = premissas_padrao()
+    for horas in premissas['atividades'].values():
+        for campo in horas:
+            horas[campo] = int(horas[campo] * gerador.uniform(0.5, 2.0))
+    for taxas in premissas['taxas'].values():
+        for campo in taxas:
+            taxas[campo] = round(float(gerador.uniform(0, 0.5)), 2)
+    premissas['buffer'] = int(gerador.integers(0, 51)) / 100
+    return premissas
+
+def comparar_premissas(quantidade: int = PONTOS_PREMISSAS, rodadas: int = RODADAS_PREMISSAS):
+    """Estimativa recalculada sobre as contagens x a partir da tabela de pontos, com o mesmo sumário"""
+    df = gerar_ajustes_prefixos(quantidade, PREFIXOS_PARTICOES)
+    print(f"🧮 Premissas editadas: {rodadas} rodadas sobre {quantidade:,} pontos")
+    inicio = time.perf_counter()
+    completo = calcular_precificacao(df)
+    tempo_completo = time.perf_counter() - inicio
+    contagens = contar_pontos(df)
+    identico = estimar(contagens)['sumario'].equals(completo['sumario'])
+
+    gerador = np.random.default_rng(SEMENTE)
+    sorteadas = [sortear_premissas(gerador) for _ in range(rodadas)]
+    inicio = time.perf_counter()
+    for premissas in sorteadas:
+        estimar(contagens, premissas)
+    tempo_estimativa = (time.perf_counter() - inicio) / rodadas
+    # Referência: as mesmas premissas recontando os pontos da tabela a cada rodada
+    inicio = time.perf_counter()
+    for premissas in sorteadas[:10]:
+        estimar(contar_pontos(df), premissas)
+    tempo_recontagem = (time.perf_counter() - inicio) / 10
+    print(f"   Precificação a partir dos pontos (com simulação): {tempo_completo:.2f}s | "
+          f"recontando os pontos: {tempo_recontagem * 1000:.1f} ms | sobre as contagens: {tempo_estimativa * 1000:.2f} ms "
+          f"({tempo_recontagem / tempo_estimativa:.0f}x) | Mesmo sumário: {'✅' if identico else '❌'}")
+    return identico
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ['--historico']:
+        identico = comparar_historico()
+    elif sys.argv[1:] == ['--servico']:
+        identico = testar_servico()
+    elif sys.argv[1:] == ['--formatos']:
+        identico = testar_formatos()
+    elif sys.argv[1:] == ['--leitura']:
+        identico = comparar_leitura()
+    elif sys.argv[1:] == ['--compressao']:
+        identico = comparar_compressao()
+    elif sys.argv[1:] == ['--retomada']:
+        identico = comparar_retomada()
+    elif sys.argv[1:] == ['--particoes']:
+        identico = comparar_particoes()
+    elif sys.argv[1:] == ['--termos']:
+        identico = comparar_termos()
+    elif sys.argv[1:] == ['--parciais']:
+        identico = comparar_parciais()
+    elif sys.argv[1:] == ['--simulacao']:
+        identico = testar_simulacao()
+    elif sys.argv[1:] == ['--premissas']:
+        identico = comparar_premissas()
+    elif len(sys.argv) > 1:
+        identico = comparar_motor(sys.argv[1])
+    else:
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = os.path.join(pasta, "cobol_sintetico.txt")
+            print(f"🛠️ Gerando COBOL sintético com {LINHAS_SINTETICAS:,} linhas...")
+            gerar_cobol(caminho)
+            identico = comparar_motor(caminho)
+    sys.exit(0 if identico else 1)
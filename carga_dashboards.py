@@ -0,0 +1,360 @@
+# 🏋️ Teste de carga dos dashboards Streamlit
+# Simula N sessões simultâneas (AppTest, sem navegador) navegando, filtrando e enviando arquivos
+# sobre resultados sintéticos, e mede a latência de cada interação e a memória (RSS) do servidor.
+# Todas as sessões rodam neste processo, como no servidor Streamlit: o cache compartilhado
+# (st.cache_resource) e a memória medida são os mesmos de uma instância em produção.
+#
+# Uso: python carga_dashboards.py [--sessoes 8] [--repeticoes 2] [--pontos 20000]
+#                                 [--app dashboard|interativo|todos]
+#      python carga_dashboards.py --partida   (partida a frio: imports e primeira página de cada app)
+
+import os
+import sys
+import time
+import random
+import json
+import argparse
+import contextlib
+import subprocess
+import tempfile
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from streamlit import config
+from streamlit.runtime import Runtime
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+from streamlit.testing.v1 import AppTest, app_test
+from streamlit.testing.v1.util import build_mock_config_get_option
+from benchmarks import gerar_dump_findstudio, percentil, LINHAS_COBOL, PESOS_COBOL
+
+PASTA_PROJETO = os.path.dirname(os.path.abspath(__file__))
+ARQUIVO_DASHBOARD = os.path.join(PASTA_PROJETO, 'dashboard.py')
+ARQUIVO_INTERATIVO = os.path.join(PASTA_PROJETO, 'dashboard_interativo.py')
+ARQUIVO_TERMOS = os.path.join(PASTA_PROJETO, 'CNPJ 1.csv')
+
+SESSOES_PADRAO = 8
+REPETICOES_PADRAO = 2
+PONTOS_SINTETICOS = 20_000   # Linhas do dump sintético que alimenta o dashboard.py
+LINHAS_UPLOAD = 20_000       # Linhas de cada TXT enviado ao dashboard interativo
+ARQUIVOS_DISTINTOS = 4       # Sessões compartilham uploads: parte das análises vem do cache
+TEMPO_LIMITE = 300           # Segundos por rerun antes de o AppTest desistir
+INTERVALO_RSS = 0.1
+SEMENTE = 42
+
+# Partida a frio: cada app roda em um processo novo, que informa o tempo da primeira página,
+# de cada página visitada pela primeira vez e os módulos importados pelo script
+CODIGO_PARTIDA = '''
+import sys, json, time
+from streamlit.testing.v1 import AppTest, app_test
+from streamlit.testing.v1.util import build_mock_config_get_option
+at = AppTest.from_file(sys.argv[1], default_timeout=float(sys.argv[2]))
+antes = set(sys.modules)
+inicio = time.perf_counter()
+at.run()
+medidas = {'primeira_pagina': time.perf_counter() - inicio, 'paginas': {}, 'erros': len(at.exception)}
+if at.sidebar.radio:
+    for pagina in at.sidebar.radio[0].options[1:]:
+        inicio = time.perf_counter()
+        at.sidebar.radio[0].set_value(pagina).run()
+        medidas['paginas'][pagina] = time.perf_counter() - inicio
+        medidas['erros'] += len(at.exception)
+medidas['modulos'] = sorted(set(sys.modules) - antes)
+print(json.dumps(medidas))
+'''
+PACOTES_EXIBIDOS = 6
+
+# Variáveis enviadas no CSV do dashboard interativo (colunas: Variável, Tipo, Descrição)
+VARIAVEIS_UPLOAD = [
+    ('CNPJ', 'campo', 'CNPJ do cliente'), ('CGC', 'campo', 'CGC legado'),
+    ('cadNacPesJur', 'campo', 'Cadastro nacional de pessoa jurídica'),
+]
+
+# === MEMÓRIA ===
+def ler_rss() -> int:
+    """RSS atual (bytes) do servidor: este processo mais os processos filhos do pool de análise"""
+    try:
+        pagina = os.sysconf('SC_PAGE_SIZE')
+        pids = [os.getpid()]
+        for tarefa in os.listdir('/proc/self/task'):
+            with open(f'/proc/self/task/{tarefa}/children') as arquivo:
+                pids.extend(int(pid) for pid in arquivo.read().split())
+        total = 0
+        for pid in pids:
+            try:
+                with open(f'/proc/{pid}/statm') as arquivo:
+                    total += int(arquivo.read().split()[1]) * pagina
+            except OSError:
+                pass  # Processo filho encerrado durante a leitura
+        return total
+    except OSError:
+        # Fora do Linux: só o pico do próprio processo está disponível
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+
+def monitorar_rss(amostras: list, parar: threading.Event):
+    """Amostra o RSS até o evento de parada"""
+    while not parar.is_set():
+        amostras.append(ler_rss())
+        parar.wait(INTERVALO_RSS)
+
+
+# === DADOS SINTÉTICOS ===
+def gerar_resultados_sinteticos(pasta: str, pontos: int):
+    """Grava na pasta os relatórios de duas execuções sintéticas (a segunda alimenta o histórico)"""
+    from main import executar_analise, gerar_relatorios
+    silencioso = lambda mensagem: None
+    for execucao in range(2):
+        caminho = os.path.join(pasta, f'dump_{execucao}.txt')
+        with open(caminho, 'wb') as arquivo:
+            arquivo.write(gerar_dump_findstudio(pontos, SEMENTE + execucao))
+        gerar_relatorios(executar_analise(caminho, ARQUIVO_TERMOS, silencioso), silencioso)
+
+def gerar_uploads(linhas: int) -> list:
+    """Uploads do dashboard interativo: por conjunto distinto, o CSV de variáveis e dois TXTs.
+
+    Cada arquivo é (nome, conteúdo, tipo MIME), o formato aceito pelo file_uploader do AppTest.
+    """
+    csv = 'Variável,Tipo,Descrição\n' + ''.join(f'{v},{t},{d}\n' for v, t, d in VARIAVEIS_UPLOAD)
+    conjuntos = []
+    for conjunto in range(ARQUIVOS_DISTINTOS):
+        aleatorio = random.Random(SEMENTE + conjunto)
+        codigos = [
+            (f'{parte}_{conjunto}.txt',
+             ('\n'.join(aleatorio.choices(LINHAS_COBOL, weights=PESOS_COBOL, k=linhas)) + '\n').encode('utf-8'),
+             'text/plain')
+            for parte in ('cadastro', 'faturamento')
+        ]
+        conjuntos.append((('variaveis.csv', csv.encode('utf-8'), 'text/csv'), codigos))
+    return conjuntos
+
+
+# === SESSÕES ===
+_runtime_ativo = None
+
+def _runtime_compartilhado(cls):
+    """Runtime do AppTest tolerante a sessões em threads.
+
+    Cada rerun do AppTest cria o seu Runtime falso e o remove ao terminar; com várias sessões
+    simultâneas, o fim de um rerun apagaria o Runtime de outro ainda em execução.
+    """
+    global _runtime_ativo
+    if cls._instance is not None:
+        _runtime_ativo = cls._instance
+    if _runtime_ativo is None:
+        raise RuntimeError("Runtime hasn't been created!")
+    return _runtime_ativo
+
+def preparar_sessoes_simultaneas():
+    """Permite várias instâncias de AppTest rodando ao mesmo tempo neste processo"""
+    Runtime.instance = classmethod(_runtime_compartilhado)
+    # Como no servidor, um único cache de bytecode: compilar o mesmo script em várias threads
+    # ao mesmo tempo quebra o compilador do Python 3.11 ("AST constructor recursion depth mismatch")
+    compartilhado = ScriptCache()
+    ScriptCache.__init__ = lambda self: self.__dict__.update(_cache=compartilhado._cache, _lock=compartilhado._lock)
+    # O AppTest liga a opção global.appTest só durante cada rerun (patch de config.get_option);
+    # reruns sobrepostos desfariam o patch uns dos outros, então ela fica ligada durante todo o teste
+    config.get_option = build_mock_config_get_option({'global.appTest': True})
+    app_test.patch_config_options = lambda opcoes: contextlib.nullcontext()
+    Runtime.exists = classmethod(lambda cls: _runtime_ativo is not None or cls._instance is not None)
+
+class Medidor:
+    """Cronometra os reruns de uma sessão: cada interação vira (app, nome, segundos, com erro?)"""
+
+    def __init__(self, app: str):
+        self.app = app
+        self.medicoes = []
+
+    def executar(self, nome: str, at: AppTest, acao=None) -> AppTest:
+        inicio = time.perf_counter()
+        mensagem = None
+        try:
+            (acao() if acao else at).run()
+            if at.exception:
+                mensagem = at.exception[0].message
+        except Exception as e:
+            mensagem = repr(e)
+        self.medicoes.append((self.app, nome, time.perf_counter() - inicio, mensagem is not None))
+        if mensagem is not None:
+            print(f"⚠️ {self.app}/{nome}: {mensagem}")
+        return at
+
+def widget_por_rotulo(elementos, rotulo: str):
+    """Primeiro widget cujo rótulo começa com o texto indicado (None se a página não o exibir)"""
+    return next((e for e in elementos if e.label.startswith(rotulo)), None)
+
+def sessao_dashboard(indice: int, repeticoes: int) -> list:
+    """Um GP no dashboard executivo: abre, percorre as páginas, filtra o explorador e compara execuções"""
+    medidor = Medidor('dashboard')
+    at = AppTest.from_file(ARQUIVO_DASHBOARD, default_timeout=TEMPO_LIMITE)
+    medidor.executar('abrir', at)
+    aleatorio = random.Random(SEMENTE + indice)
+
+    for _ in range(repeticoes):
+        navegacao = at.sidebar.radio[0]
+        for pagina in navegacao.options:
+            medidor.executar('navegar', at, lambda: at.sidebar.radio[0].set_value(pagina))
+
+        medidor.executar('navegar', at, lambda: at.sidebar.radio[0].set_value('🔍 Explorador de Pontos Críticos'))
+        prefixos = widget_por_rotulo(at.sidebar.multiselect, 'Prefixo/Grupo')
+        if prefixos is not None and prefixos.options:
+            escolhidos = aleatorio.sample(prefixos.options, min(2, len(prefixos.options)))
+            medidor.executar('filtrar_prefixo', at, lambda: prefixos.set_value(escolhidos))
+        medidor.executar('buscar_codigo', at, lambda: at.text_input(key='explorador_ajustes_busca').set_value('CCLI'))
+        medidor.executar('ordenar', at, lambda: at.selectbox(key='explorador_ajustes_ordem').set_value('Arquivo'))
+        pagina = next((n for n in at.number_input if n.key == 'explorador_ajustes_pagina'), None)
+        if pagina is not None and pagina.max is not None and pagina.max >= 2:
+            medidor.executar('paginar', at, lambda: pagina.set_value(2))
+        medidor.executar('limpar_busca', at, lambda: at.text_input(key='explorador_ajustes_busca').set_value(''))
+        conjunto = widget_por_rotulo(at.radio, 'Conjunto de dados')
+        if conjunto is not None and 'Descartes' in conjunto.options:
+            # Widgets são buscados de novo após cada rerun: os da árvore anterior ficam obsoletos
+            for nome in ('Descartes', 'Ajustes Críticos'):
+                medidor.executar('trocar_conjunto', at, lambda: widget_por_rotulo(at.radio, 'Conjunto de dados').set_value(nome))
+
+        medidor.executar('comparar_execucoes', at, lambda: at.sidebar.radio[0].set_value('🔄 Comparar Execuções'))
+    return medidor.medicoes
+
+def sessao_interativo(indice: int, repeticoes: int, conjuntos: list) -> list:
+    """Um GP no dashboard interativo: envia CSV e TXTs, analisa e filtra os resultados"""
+    medidor = Medidor('interativo')
+    csv, codigos = conjuntos[indice % len(conjuntos)]
+
+    for _ in range(repeticoes):
+        at = AppTest.from_file(ARQUIVO_INTERATIVO, default_timeout=TEMPO_LIMITE)
+        medidor.executar('abrir', at)
+        medidor.executar('enviar_csv', at, lambda: at.file_uploader[0].set_value(csv))
+        medidor.executar('enviar_codigo', at, lambda: at.file_uploader[1].set_value(codigos))
+
+        analisar = widget_por_rotulo(at.button, '🚀 ANALISAR')
+        if analisar is None:
+            medidor.medicoes.append((medidor.app, 'analisar', 0.0, True))
+            continue
+        inicio = len(medidor.medicoes)
+        medidor.executar('analisar', at, analisar.click)
+        # Uploads repetidos (por esta ou por outra sessão) devem vir do cache compartilhado
+        if any('reaproveitado' in s.value for s in at.success):
+            app, _, segundos, erro = medidor.medicoes[inicio]
+            medidor.medicoes[inicio] = (app, 'analisar_cache', segundos, erro)
+
+        origem = widget_por_rotulo(at.multiselect, '📁 Filtrar por arquivo de origem')
+        if origem is not None and origem.options:
+            medidor.executar('filtrar_origem', at, lambda: origem.set_value(origem.options[:1]))
+        categorias = widget_por_rotulo(at.multiselect, '🏷️ Filtrar por Categoria')
+        if categorias is not None and len(categorias.options) > 1:
+            medidor.executar('filtrar_categoria', at, lambda: categorias.set_value(categorias.options[:1]))
+    return medidor.medicoes
+
+
+# === PARTIDA A FRIO ===
+def medir_partida(script: str) -> dict:
+    """Roda o app em um processo novo (diretório atual) com -X importtime.
+
+    Retorna as medidas do processo filho e 'imports': segundos de import por pacote de topo,
+    somente dos módulos importados pelo próprio script (não pelo AppTest).
+    """
+    processo = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CODIGO_PARTIDA, script, str(TEMPO_LIMITE)],
+        capture_output=True, text=True, env={**os.environ, 'PYTHONPATH': PASTA_PROJETO}
+    )
+    medidas = json.loads(processo.stdout.strip().splitlines()[-1])
+
+    # Linhas do -X importtime: "import time: próprio [us] | acumulado | módulo"
+    modulos = set(medidas['modulos'])
+    imports = defaultdict(float)
+    for linha in processo.stderr.splitlines():
+        if linha.startswith('import time:') and '|' in linha:
+            proprio, _, nome = linha[len('import time:'):].split('|')
+            nome = nome.strip()
+            if nome in modulos and proprio.strip().isdigit():
+                imports[nome.split('.')[0]] += int(proprio) / 1e6
+    medidas['imports'] = dict(sorted(imports.items(), key=lambda item: -item[1]))
+    return medidas
+
+def testar_partida(pontos: int):
+    """Partida a frio do dashboard.py e do dashboard_interativo.py sobre resultados sintéticos"""
+    erros = 0
+    with tempfile.TemporaryDirectory(prefix='cnpj_partida_') as pasta:
+        os.chdir(pasta)
+        print(f"🛠️ Gerando resultados sintéticos ({pontos:,} linhas, 2 execuções)...")
+        gerar_resultados_sinteticos(pasta, pontos)
+        for nome, script in [('dashboard', ARQUIVO_DASHBOARD), ('interativo', ARQUIVO_INTERATIVO)]:
+            medidas = medir_partida(script)
+            erros += medidas['erros']
+            total_imports = sum(medidas['imports'].values())
+            principais = ', '.join(f"{p} {s:.2f}s" for p, s in list(medidas['imports'].items())[:PACOTES_EXIBIDOS])
+            print(f"\n🚀 {nome}: primeira página {medidas['primeira_pagina']:.2f}s "
+                  f"(imports do script {total_imports:.2f}s: {principais})")
+            for pagina, segundos in medidas['paginas'].items():
+                print(f"   1ª visita a {pagina:<34} {segundos:6.2f}s")
+        os.chdir(PASTA_PROJETO)
+    return erros == 0
+
+
+# === RELATÓRIO ===
+def imprimir_relatorio(medicoes: list, duracao: float, rss: list):
+    """Percentis de latência por app e interação, vazão total e memória do servidor"""
+    grupos = defaultdict(list)
+    erros = defaultdict(int)
+    for app, nome, segundos, erro in medicoes:
+        grupos[(app, nome)].append(segundos)
+        erros[(app, nome)] += erro
+
+    print(f"\n{'App':<11} {'Interação':<19} {'n':>5} {'p50 (ms)':>10} {'p95 (ms)':>10} "
+          f"{'p99 (ms)':>10} {'máx (ms)':>10} {'erros':>6}")
+    for (app, nome), tempos in grupos.items():
+        print(f"{app:<11} {nome:<19} {len(tempos):>5} {percentil(tempos, 50) * 1000:>10.0f} "
+              f"{percentil(tempos, 95) * 1000:>10.0f} {percentil(tempos, 99) * 1000:>10.0f} "
+              f"{max(tempos) * 1000:>10.0f} {erros[(app, nome)]:>6}")
+
+    print(f"\n⏱️ Duração: {duracao:.1f}s | interações: {len(medicoes):,} ({len(medicoes) / duracao:.1f}/s)")
+    if rss:
+        mb = 1024 * 1024
+        print(f"🧠 RSS do servidor: inicial {rss[0] / mb:.0f} MB | pico {max(rss) / mb:.0f} MB | "
+              f"final {rss[-1] / mb:.0f} MB")
+    return sum(erros.values())
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga dos dashboards Streamlit")
+    parser.add_argument('--sessoes', type=int, default=SESSOES_PADRAO, help="Sessões simultâneas")
+    parser.add_argument('--repeticoes', type=int, default=REPETICOES_PADRAO, help="Roteiros por sessão")
+    parser.add_argument('--pontos', type=int, default=PONTOS_SINTETICOS, help="Linhas do dump sintético")
+    parser.add_argument('--app', choices=['dashboard', 'interativo', 'todos'], default='todos')
+    parser.add_argument('--partida', action='store_true', help="Mede a partida a frio de cada app")
+    args = parser.parse_args()
+    if args.partida:
+        return testar_partida(args.pontos)
+
+    with tempfile.TemporaryDirectory(prefix='cnpj_carga_') as pasta:
+        # Os dashboards leem os resultados do diretório atual
+        os.chdir(pasta)
+        print(f"🛠️ Gerando resultados sintéticos ({args.pontos:,} linhas, 2 execuções) e uploads...")
+        gerar_resultados_sinteticos(pasta, args.pontos)
+        conjuntos = gerar_uploads(LINHAS_UPLOAD)
+        preparar_sessoes_simultaneas()
+
+        roteiros = []
+        for indice in range(args.sessoes):
+            # Com os dois apps, metade das sessões vai para cada um
+            app = args.app if args.app != 'todos' else ('dashboard', 'interativo')[indice % 2]
+            if app == 'dashboard':
+                roteiros.append(lambda i=indice: sessao_dashboard(i, args.repeticoes))
+            else:
+                roteiros.append(lambda i=indice: sessao_interativo(i, args.repeticoes, conjuntos))
+
+        print(f"🏋️ {args.sessoes} sessões simultâneas x {args.repeticoes} repetições ({args.app})")
+        amostras, parar = [], threading.Event()
+        monitor = threading.Thread(target=monitorar_rss, args=(amostras, parar), daemon=True)
+        monitor.start()
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.sessoes) as sessoes:
+            resultados = list(sessoes.map(lambda roteiro: roteiro(), roteiros))
+        duracao = time.perf_counter() - inicio
+        parar.set()
+        monitor.join()
+        os.chdir(PASTA_PROJETO)
+
+    erros = imprimir_relatorio([m for r in resultados for m in r], duracao, amostras)
+    return erros == 0
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,193 @@
+# 🗜️ Entradas comprimidas (.gz, .xz, .zst)
+# A compressão é reconhecida pelos primeiros bytes do arquivo (não pela extensão: o serviço HTTP grava
+# o upload sem nome) e o conteúdo é descomprimido em fluxo direto para a análise, sem arquivo
+# intermediário em disco. Arquivos BGZF (gzip em membros independentes com o tamanho de cada bloco
+# no cabeçalho, como os do `bgzip`) têm os blocos descomprimidos em paralelo.
+
+import io
+import os
+import gzip
+import lzma
+import zlib
+import struct
+from concurrent.futures import ThreadPoolExecutor
+
+# zstd: no Python 3.14+ faz parte da biblioteca padrão; antes disso, pacote `zstandard` (opcional)
+try:
+    from compression import zstd
+except ImportError:
+    zstd = None
+    try:
+        import zstandard
+    except ImportError:
+        zstandard = None
+
+ASSINATURAS = {
+    'gzip': b'\x1f\x8b',
+    'xz': b'\xfd7zXZ\x00',
+    'zstd': b'\x28\xb5\x2f\xfd',
+}
+
+THREADS_DESCOMPRESSAO = int(os.environ.get("CNPJ_PROCESSOS", str(os.cpu_count() or 1)))
+# Blocos BGZF (até 64 KB cada) enviados juntos a uma thread, e lotes em andamento ao mesmo tempo
+BLOCOS_POR_LOTE = 64
+LOTES_EM_ANDAMENTO = 4
+
+# Cabeçalho de um membro BGZF: gzip com FEXTRA e o subcampo 'BC' (tamanho total do bloco - 1)
+CABECALHO_BGZF = struct.Struct('<4BI2BH')
+SUBCAMPO_BGZF = struct.Struct('<2BHH')
+# Bloco final vazio que marca o fim de um arquivo BGZF
+FIM_BGZF = bytes.fromhex('1f8b08040000000000ff0600424302001b0003000000000000000000')
+TAMANHO_BLOCO_BGZF = 0xff00
+
+
+def detectar_compressao(caminho):
+    """'gzip', 'xz', 'zstd' ou None (arquivo sem compressão)."""
+    with open(caminho, 'rb') as arquivo:
+        inicio = arquivo.read(8)
+    for nome, assinatura in ASSINATURAS.items():
+        if inicio.startswith(assinatura):
+            return nome
+    return None
+
+
+def _eh_bgzf(arquivo):
+    """Se o primeiro membro gzip traz o tamanho do bloco (subcampo BGZF 'BC')."""
+    cabecalho = arquivo.read(CABECALHO_BGZF.size + SUBCAMPO_BGZF.size)
+    arquivo.seek(0)
+    if len(cabecalho) < CABECALHO_BGZF.size + SUBCAMPO_BGZF.size:
+        return False
+    id1, id2, metodo, flags, _, _, _, tamanho_extra = CABECALHO_BGZF.unpack_from(cabecalho)
+    si1, si2, tamanho_sub, _ = SUBCAMPO_BGZF.unpack_from(cabecalho, CABECALHO_BGZF.size)
+    return (flags & 4) and tamanho_extra >= 6 and (si1, si2, tamanho_sub) == (66, 67, 2)
+
+
+def _blocos_bgzf(arquivo):
+    """Membros de um arquivo BGZF, em ordem, lidos só pelos cabeçalhos (sem descomprimir)."""
+    while True:
+        cabecalho = arquivo.read(CABECALHO_BGZF.size)
+        if not cabecalho:
+            return
+        if len(cabecalho) < CABECALHO_BGZF.size:
+            raise ValueError("Arquivo BGZF truncado.")
+        id1, id2, _, flags, _, _, _, tamanho_extra = CABECALHO_BGZF.unpack(cabecalho)
+        extra = arquivo.read(tamanho_extra)
+        tamanho_bloco = None
+        posicao = 0
+        while posicao + 4 <= len(extra):
+            si1, si2, tamanho_sub = extra[posicao], extra[posicao + 1], extra[posicao + 2] | extra[posicao + 3] << 8
+            if (si1, si2, tamanho_sub) == (66, 67, 2):
+                tamanho_bloco = struct.unpack_from('<H', extra, posicao + 4)[0] + 1
+            posicao += 4 + tamanho_sub
+        if (id1, id2) != (0x1f, 0x8b) or not flags & 4 or tamanho_bloco is None:
+            raise ValueError("Membro gzip sem o tamanho de bloco BGZF.")
+        restante = arquivo.read(tamanho_bloco - CABECALHO_BGZF.size - tamanho_extra)
+        yield cabecalho + extra + restante
+
+
+def _descomprimir_lote(blocos):
+    # zlib libera o GIL durante a descompressão: os lotes rodam de fato em paralelo nas threads
+    return b''.join(zlib.decompress(bloco, 31) for bloco in blocos)
+
+
+def _lotes(blocos, tamanho):
+    lote = []
+    for bloco in blocos:
+        lote.append(bloco)
+        if len(lote) == tamanho:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def descomprimir_bgzf(arquivo, threads=THREADS_DESCOMPRESSAO):
+    """Conteúdo de um arquivo BGZF em pedaços, na ordem, com os lotes de blocos em paralelo."""
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        pendentes = []
+        for lote in _lotes(_blocos_bgzf(arquivo), BLOCOS_POR_LOTE):
+            pendentes.append(executor.submit(_descomprimir_lote, lote))
+            if len(pendentes) > threads * LOTES_EM_ANDAMENTO:
+                yield pendentes.pop(0).result()
+        for pendente in pendentes:
+            yield pendente.result()
+
+
+class LeitorPedacos(io.RawIOBase):
+    """Arquivo binário somente leitura sobre um gerador de pedaços de bytes."""
+
+    def __init__(self, pedacos, ao_fechar=None):
+        self._pedacos = pedacos
+        self._atual = memoryview(b'')
+        self._ao_fechar = ao_fechar
+
+    def readable(self):
+        return True
+
+    def readinto(self, destino):
+        while not self._atual:
+            pedaco = next(self._pedacos, None)
+            if pedaco is None:
+                return 0
+            self._atual = memoryview(pedaco)
+        tamanho = min(len(destino), len(self._atual))
+        destino[:tamanho] = self._atual[:tamanho]
+        self._atual = self._atual[tamanho:]
+        return tamanho
+
+    def close(self):
+        if not self.closed:
+            self._pedacos.close()
+            if self._ao_fechar:
+                self._ao_fechar()
+        super().close()
+
+
+def abrir_binario(caminho, threads=None):
+    """Abre o arquivo para leitura binária, descomprimindo em fluxo quando há compressão.
+
+    `threads` (padrão: THREADS_DESCOMPRESSAO) limita a descompressão paralela de arquivos BGZF.
+    """
+    threads = THREADS_DESCOMPRESSAO if threads is None else threads
+    compressao = detectar_compressao(caminho)
+    if compressao == 'gzip':
+        arquivo = open(caminho, 'rb')
+        if threads > 1 and _eh_bgzf(arquivo):
+            return io.BufferedReader(LeitorPedacos(descomprimir_bgzf(arquivo, threads), arquivo.close))
+        arquivo.close()
+        return gzip.open(caminho, 'rb')
+    if compressao == 'xz':
+        return lzma.open(caminho, 'rb')
+    if compressao == 'zstd':
+        if zstd is not None:
+            return zstd.open(caminho, 'rb')
+        if zstandard is None:
+            raise ValueError("Entrada .zst: instale o pacote `zstandard` (ou use Python 3.14+).")
+        arquivo = open(caminho, 'rb')
+        leitor = zstandard.ZstdDecompressor().stream_reader(arquivo, read_across_frames=True, closefd=True)
+        return io.BufferedReader(leitor)
+    return open(caminho, 'rb')
+
+
+def eh_tar(caminho):
+    """Se o arquivo (comprimido ou não) é um pacote tar, pelo cabeçalho do primeiro membro."""
+    with abrir_binario(caminho, threads=1) as arquivo:
+        cabecalho = arquivo.read(512)
+    return cabecalho[257:262] == b'ustar'
+
+
+def gravar_bgzf(origem, destino, nivel=6):
+    """Comprime `origem` em BGZF (gzip comum, legível por qualquer ferramenta) para leitura em paralelo."""
+    with open(origem, 'rb') as entrada, open(destino, 'wb') as saida:
+        while True:
+            dados = entrada.read(TAMANHO_BLOCO_BGZF)
+            if not dados:
+                break
+            compressor = zlib.compressobj(nivel, zlib.DEFLATED, -15)
+            corpo = compressor.compress(dados) + compressor.flush()
+            tamanho_bloco = CABECALHO_BGZF.size + SUBCAMPO_BGZF.size + len(corpo) + 8
+            saida.write(CABECALHO_BGZF.pack(0x1f, 0x8b, 8, 4, 0, 0, 0xff, 6))
+            saida.write(SUBCAMPO_BGZF.pack(66, 67, 2, tamanho_bloco - 1))
+            saida.write(corpo)
+            saida.write(struct.pack('<2I', zlib.crc32(dados), len(dados)))
+        saida.write(FIM_BGZF)
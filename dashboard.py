@@ -1,12 +1,12 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-import os
 import re
-import subprocess
 import threading
-import sys
+from servico_dados import obter_dados, publicar_dados, indices_compartilhados
+from explorador import (
+    obter_indice, montar_mascara, valores_disponiveis, resumir, exibir_pagina,
+    obter_indice_busca, filtrar_por_busca, obter_indice_contexto_salvo, exibir_contexto, obter_recorte, chave_recorte
+)
 
 # Configuração da página
 st.set_page_config(
@@ -22,6 +22,11 @@ st.markdown("### Visão Estratégica para Precificação da Proposta")
 # --- CONTROLE DE EXECUÇÃO NA SIDEBAR ---
 st.sidebar.title("⚙️ Controles")
 
+@st.cache_resource
+def _trava_analise():
+    """Uma análise por vez no processo: todas gravam os mesmos relatórios."""
+    return threading.Lock()
+
 if st.sidebar.button("Executar Nova Análise", type="primary"):
     st.session_state.run_analysis = True
     st.session_state.analysis_output = ""
@@ -31,46 +36,43 @@ if 'run_analysis' in st.session_state and st.session_state.run_analysis:
     st.sidebar.info("Análise em andamento...")
     output_placeholder = st.sidebar.empty()
     
-    # Usando st.spinner para uma melhor UX
-    with st.spinner('Executando main.py... Por favor, aguarde.'):
-        try:
-            # Garante que o processo filho use UTF-8 para I/O, resolvendo problemas de encoding no Windows.
-            env = os.environ.copy()
-            env['PYTHONIOENCODING'] = 'UTF-8'
-
-            # Comando para executar o script. '-u' para unbuffered output.
-            # Usar sys.executable garante que o subprocesso use o mesmo ambiente Python que o Streamlit.
-            process = subprocess.Popen(
-                [sys.executable, '-u', 'main.py'],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                encoding='utf-8',
-                text=True,
-                env=env
-            )
-
-            log_output = ""
-            for line in iter(process.stdout.readline, ''):
-                log_output += line
-                output_placeholder.code(log_output, language='log')
-            
-            process.stdout.close()
-            return_code = process.wait()
-
-            if return_code == 0:
-                st.session_state.analysis_output = log_output + "\n\n✅ Análise concluída com sucesso!"
-                st.toast("Análise finalizada! Os dados foram atualizados.", icon="🎉")
-            else:
-                st.session_state.analysis_output = log_output + f"\n\n❌ ERRO: A análise falhou com código de saída {return_code}."
-                st.toast("Ocorreu um erro durante a análise.", icon="🔥")
+    # A análise roda no próprio processo (biblioteca analise_cnpj via main.py), sem subprocesso
+    # e sem reler os relatórios: as tabelas calculadas são publicadas direto no serviço de dados
+    with st.spinner('Executando a análise... Por favor, aguarde.'):
+        # Importado só aqui: as demais execuções do script não precisam do motor de análise
+        from main import ARQUIVO_ENTRADA, ARQUIVO_TERMOS, ARQUIVO_CHECKPOINT, executar_analise, gerar_relatorios
+        from indice_termos import PASTA_CORPUS
+        mensagens = []
+
+        def log(mensagem):
+            mensagens.append(str(mensagem))
+            output_placeholder.code("\n".join(mensagens), language='log')
+
+        trava = _trava_analise()
+        if not trava.acquire(blocking=False):
+            st.session_state.analysis_output = "⏳ Outra análise já está em andamento. Aguarde e recarregue a página."
+        else:
+            try:
+                # Uma análise interrompida (ex.: servidor reiniciado) continua do último ponto salvo; se
+                # só os termos mudaram, apenas os pontos afetados são reclassificados
+                resultado = executar_analise(ARQUIVO_ENTRADA, ARQUIVO_TERMOS, log,
+                                             checkpoint=ARQUIVO_CHECKPOINT, retomar=True, corpus=PASTA_CORPUS)
+                if resultado is not None:
+                    publicar_dados(gerar_relatorios(resultado, log))
+                    st.session_state.analysis_output = "\n".join(mensagens) + "\n\n✅ Análise concluída com sucesso!"
+                    st.toast("Análise finalizada! Os dados foram atualizados.", icon="🎉")
+                else:
+                    st.session_state.analysis_output = "\n".join(mensagens) + "\n\n❌ ERRO: A análise não pôde ser executada."
+                    st.toast("Ocorreu um erro durante a análise.", icon="🔥")
 
-        except Exception as e:
-            st.session_state.analysis_output = f"❌ FALHA CRÍTICA ao executar o script: {e}"
-            st.toast("Falha crítica ao tentar executar o script.", icon="🚨")
+            except Exception as e:
+                st.session_state.analysis_output = f"❌ FALHA CRÍTICA ao executar a análise: {e}"
+                st.toast("Falha crítica ao tentar executar a análise.", icon="🚨")
+            finally:
+                trava.release()
 
     st.session_state.run_analysis = False
     st.session_state.analysis_done = True
-    st.cache_data.clear() # Limpa o cache para forçar o recarregamento dos dados
     st.rerun() # Força o rerun do script do dashboard
 
 if 'analysis_done' in st.session_state and st.session_state.analysis_done:
@@ -81,10 +83,14 @@ if 'analysis_done' in st.session_state and st.session_state.analysis_done:
         st.rerun()
 
 # Configuração de arquivos
-ARQUIVO_AJUSTES = 'analise_ajustes_criticos.xlsx'
-ARQUIVO_PRECIFICACAO = 'analise_precificacao_proposta.xlsx'
-ARQUIVO_DESCARTES = 'analise_descartes.xlsx'
-ARQUIVO_NAO_CLASSIFICADOS = 'analise_sem_classificacao.xlsx'
+ARQUIVO_INDICE_BUSCA_AJUSTES = 'analise_ajustes_criticos_busca.npz'
+ARQUIVO_INDICE_BUSCA_DESCARTES = 'analise_descartes_busca.npz'
+ARQUIVO_INDICE_CONTEXTO = 'analise_contexto_fontes.npz'
+PASTA_PARTICOES_AJUSTES = 'analise_ajustes_criticos_particoes'
+PASTA_PARTICOES_DESCARTES = 'analise_descartes_particoes'
+
+# Linhas exibidas por tabela na comparação entre execuções
+LIMITE_LINHAS_COMPARACAO = 5000
 
 # Mapeamento de categorias para cores (atualizado)
 CORES_FRENTES = {
@@ -95,43 +101,20 @@ CORES_FRENTES = {
     'Outros': '#9370DB'
 }
 
-# Função para carregar dados
-@st.cache_data
-def carregar_dados():
-    dados = {}
-    
-    # Carregar dados de ajustes (pontos críticos)
-    if os.path.exists(ARQUIVO_AJUSTES):
-        dados['ajustes'] = pd.read_excel(ARQUIVO_AJUSTES)
-    
-    # Carregar dados de precificação
-    if os.path.exists(ARQUIVO_PRECIFICACAO):
-        dados['precificacao'] = {}
-        try:
-            xls = pd.ExcelFile(ARQUIVO_PRECIFICACAO)
-            sheet_map = {
-                'sumario': '1_Summary_Executivo',
-                'detalhes': '2_Estimativa_Detalhada',
-                'pontos': '3_Detalhe_Pontos_Oficiais' # Mantido para consistência
-            }
-            for key, sheet_name in sheet_map.items():
-                if sheet_name in xls.sheet_names:
-                    dados['precificacao'][key] = pd.read_excel(ARQUIVO_PRECIFICACAO, sheet_name=sheet_name)
-        except Exception as e:
-            st.error(f"Erro ao carregar precificação: {e}")
-    
-    # Carregar outros dados
-    for nome, arquivo in [('descartes', ARQUIVO_DESCARTES), ('nao_classificados', ARQUIVO_NAO_CLASSIFICADOS)]:
-        if os.path.exists(arquivo):
-            try:
-                dados[nome] = pd.read_excel(arquivo)
-            except Exception as e:
-                st.warning(f"Erro ao carregar {nome}: {e}")
-    
-    return dados
+# Cenários da simulação refeita ao editar as horas na Precificação Detalhada (what-if)
+CENARIOS_PREMISSAS = 20_000
+
 
-# Carregar dados
-dados = carregar_dados()
+@st.cache_data(show_spinner=False, max_entries=64)
+def simular_premissas(contagens, horas):
+    """Percentis da simulação para as horas editadas; o buffer fica fora da chave (não muda os cenários)."""
+    from precificacao import simular
+    return simular(contagens, horas, CENARIOS_PREMISSAS)['simulacao']
+
+# Carregar dados (cópia única compartilhada por todas as sessões)
+dados, versao_dados, erros_dados = obter_dados()
+for erro in erros_dados:
+    st.error(erro)
 
 # Sidebar para navegação
 st.sidebar.title("🔍 Navegação")
@@ -141,27 +124,42 @@ pagina = st.sidebar.radio(
         "📈 Visão Executiva", 
         "💰 Precificação Detalhada",
         "🏗️ Análise por Prefixo/Grupo",
-        "🔍 Explorador de Pontos Críticos"
+        "🔍 Explorador de Pontos Críticos",
+        "🔄 Comparar Execuções"
     ]
 )
 
 # === PÁGINA: VISÃO EXECUTIVA ===
 if pagina == "📈 Visão Executiva":
-    
-    if 'precificacao' in dados and 'sumario' in dados['precificacao']:
-        summary = dados['precificacao']['sumario']
+
+    # Estimativa preliminar (python main.py --amostra): números extrapolados, sempre rotulados como estimativa
+    from amostragem import ARQUIVO_ESTIMATIVA, carregar_estimativa
+    estimativa = carregar_estimativa(ARQUIVO_ESTIMATIVA)
+    if estimativa:
+        st.markdown("## 🎲 Estimativa Preliminar por Amostragem")
+        st.info(
+            f"⚠️ **Valores estimados**, não contados: {estimativa['rotinas_amostra']} de "
+            f"{estimativa['rotinas_entrada']} rotinas sorteadas ({estimativa['fracao']:.0%} por estrato "
+            f"Prefixo × Tipo Programa, {estimativa['estratos']} estratos) em {estimativa['gerado_em']}. "
+            f"Intervalos de confiança de {estimativa['nivel_confianca']:.0%}."
+        )
+        colunas_estimativa = st.columns(len(estimativa['metricas']))
+        for coluna, (nome, valor) in zip(colunas_estimativa, estimativa['metricas'].items()):
+            with coluna:
+                st.metric(
+                    f"{nome} (estimativa)",
+                    f"~{valor['estimativa']}",
+                    help=f"IC {estimativa['nivel_confianca']:.0%}: {valor['ic_inferior']} a {valor['ic_superior']} "
+                         f"(observado na amostra: {valor['amostra']})"
+                )
+                st.caption(f"IC: {valor['ic_inferior']} – {valor['ic_superior']}")
+
+    # Métricas e dados dos gráficos vêm dos painéis pré-calculados na análise (sem ler os relatórios)
+    if 'paineis' in dados and 'metricas' in dados['paineis']:
+        metrics = dados['paineis']['metricas']
         
         st.markdown("## 🎯 Resumo Executivo - Abordagem Realista")
         
-        # Extrair métricas do summary
-        metrics = {}
-        for _, row in summary.iterrows():
-            metrics[row['Métrica']] = row['Valor']
-        
-        # Garantir que todos os valores de métricas sejam strings para evitar erro de tipo
-        for k, v in metrics.items():
-            metrics[k] = str(v)
-        
         # Métricas principais em colunas
         col1, col2, col3, col4, col5 = st.columns(5)
         
@@ -174,8 +172,8 @@ if pagina == "📈 Visão Executiva":
             
         with col2:
             st.metric(
-                "Com Buffer 20%", 
-                metrics.get('Estimativa com Buffer 20%', 'N/A'),
+                "Com Buffer 15%", 
+                metrics.get('Estimativa com Buffer (15%)', 'N/A'),
                 help="Margem para imprevistos e atividades não planejadas"
             )
 
@@ -196,19 +194,59 @@ if pagina == "📈 Visão Executiva":
         with col5:
             st.metric(
                 "Rotinas Impactadas",
-                str(metrics.get('Rotinas Oficiais Impactadas', 'N/A')),
+                metrics.get('Rotinas Oficiais Impactadas', 'N/A'),
                 help="Número de programas/rotinas oficiais únicos que sofrerão alterações."
             )
 
+        # Faixas de esforço da simulação Monte Carlo (incerteza de cada frente e de cada equipe)
+        if 'simulacao' in dados['paineis'] and 'histograma' in dados['paineis']:
+            import plotly.graph_objects as go
+            st.markdown("## 🎲 Faixas de Esforço (Simulação Monte Carlo)")
+
+            df_simulacao = dados['paineis']['simulacao']
+            df_histograma = dados['paineis']['histograma']
+            total = df_simulacao.set_index('Métrica').loc['Total Estimado']
+            cenarios = int(df_histograma['Cenários'].sum())
+
+            col1, col2, col3 = st.columns(3)
+            for coluna, percentil, texto in [
+                (col1, 'P50', "Metade dos cenários fica abaixo deste esforço"),
+                (col2, 'P80', "Esforço suficiente em 80% dos cenários"),
+                (col3, 'P95', "Esforço suficiente em 95% dos cenários"),
+            ]:
+                with coluna:
+                    st.metric(
+                        f"Esforço {percentil}", f"{total[f'{percentil} (h)']}h",
+                        delta=f"{total[f'{percentil} (h)'] - total['Determinístico (h)']:+}h vs. estimativa",
+                        delta_color="off", help=f"{texto} ({cenarios:,} cenários simulados)".replace(',', '.')
+                    )
+
+            fig_hist = go.Figure(go.Bar(
+                x=(df_histograma['Início (h)'] + df_histograma['Fim (h)']) / 2,
+                y=df_histograma['Cenários'],
+                width=df_histograma['Fim (h)'] - df_histograma['Início (h)'],
+                marker_color='#4682B4',
+                customdata=df_histograma[['Início (h)', 'Fim (h)', 'Acumulado (%)']],
+                hovertemplate="%{customdata[0]}h – %{customdata[1]}h<br>%{y} cenários<br>Acumulado: %{customdata[2]}%<extra></extra>"
+            ))
+            for percentil, cor in [('P50', '#2E8B57'), ('P80', '#FF8C00'), ('P95', '#FF4B4B')]:
+                fig_hist.add_vline(
+                    x=total[f'{percentil} (h)'], line_dash='dash', line_color=cor,
+                    annotation_text=f"{percentil}: {total[f'{percentil} (h)']}h"
+                )
+            fig_hist.update_layout(
+                title_text="Distribuição do Esforço Total nos Cenários Simulados",
+                xaxis_title="Esforço Total (h)", yaxis_title="Cenários", height=450, bargap=0
+            )
+            st.plotly_chart(fig_hist, use_container_width=True)
+            st.dataframe(df_simulacao, use_container_width=True, hide_index=True)
+
         # Gráfico de distribuição por frente de trabalho
-        if 'detalhes' in dados['precificacao']:
+        if 'frentes' in dados['paineis']:
+            import plotly.express as px
             st.markdown("## 📊 Distribuição de Esforço por Frente de Trabalho")
             
-            df_cat = dados['precificacao']['detalhes'].copy()
-
-            # Fix para erro de tipo: garantir que colunas potencialmente mistas sejam string
-            if 'Pontos Identificados' in df_cat.columns:
-                df_cat['Pontos Identificados'] = df_cat['Pontos Identificados'].astype(str)
+            df_cat = dados['paineis']['frentes']
             
             # Gráfico de barras horizontais
             fig_bar = px.bar(
@@ -257,11 +295,84 @@ O escopo desta proposta contempla o projeto completo de adequação do sistema a
 # === PÁGINA: PRECIFICAÇÃO DETALHADA ===
 elif pagina == "💰 Precificação Detalhada":
     
-    if 'precificacao' in dados and 'detalhes' in dados['precificacao']:
+    if 'paineis' in dados and 'frentes' in dados['paineis']:
+        import plotly.graph_objects as go
         st.markdown("## 💰 Análise Detalhada por Frente de Trabalho")
         
-        df_detalhes = dados['precificacao']['detalhes']
-        
+        df_detalhes = dados['paineis']['frentes']
+
+        # Premissas editáveis (what-if): a estimativa é recalculada sobre as contagens já materializadas
+        # pela análise, sem rodar o main.py; a simulação só é refeita quando as horas mudam
+        if 'contagens' in dados['paineis']:
+            from precificacao import ATIVIDADES_BASE_PROJETO, BUFFER_PADRAO, premissas_padrao, estimar
+            contagens = dados['paineis']['contagens']
+            padrao = premissas_padrao()
+
+            st.markdown("### 🎛️ Premissas da Estimativa (What-if)")
+            if st.button("↩️ Restaurar premissas padrão"):
+                for chave in [c for c in st.session_state if str(c).startswith('premissa_')]:
+                    del st.session_state[chave]
+
+            with st.expander("Ajustar horas por frente, horas por ponto oficial e buffer"):
+                buffer = st.slider(
+                    "Buffer para imprevistos (%)", 0, 50, round(BUFFER_PADRAO * 100), key='premissa_buffer'
+                ) / 100
+
+                st.markdown(f"**Horas por ponto oficial** ({contagens.get('pontos_oficiais', 0):,} pontos oficiais)".replace(',', '.'))
+                taxas = {}
+                for chave, taxa in padrao['taxas'].items():
+                    col1, col2 = st.columns(2)
+                    taxas[chave] = {
+                        'esforco_dev_por_ponto': col1.number_input(
+                            "Desenvolvimento (h/ponto)", 0.0, 10.0, float(taxa['esforco_dev_por_ponto']), 0.05,
+                            key=f'premissa_{chave}_dev'
+                        ),
+                        'esforco_testes_por_ponto': col2.number_input(
+                            "Testes QA (h/ponto)", 0.0, 10.0, float(taxa['esforco_testes_por_ponto']), 0.05,
+                            key=f'premissa_{chave}_testes'
+                        ),
+                    }
+
+                st.markdown("**Horas por frente de trabalho**")
+                atividades = {}
+                for chave, horas in padrao['atividades'].items():
+                    col1, col2, col3 = st.columns([3, 1, 1])
+                    col1.markdown(ATIVIDADES_BASE_PROJETO[chave]['nome'])
+                    atividades[chave] = {
+                        'esforco_dev': col2.number_input(
+                            "Dev (h)", 0, 10_000, horas['esforco_dev'], 10, key=f'premissa_{chave}_dev'
+                        ),
+                        'esforco_testes': col3.number_input(
+                            "Testes (h)", 0, 10_000, horas['esforco_testes'], 10, key=f'premissa_{chave}_testes'
+                        ),
+                    }
+
+            premissas = {'atividades': atividades, 'taxas': taxas, 'buffer': buffer}
+            tabelas = estimar(contagens, premissas)
+            df_detalhes = tabelas['estimativa']
+            atual = tabelas['sumario'].set_index('Métrica')['Valor']
+            base = estimar(contagens)['sumario'].set_index('Métrica')['Valor']
+            faixas = simular_premissas(contagens, {'atividades': atividades, 'taxas': taxas}).set_index('Métrica')
+
+            col1, col2, col3, col4, col5 = st.columns(5)
+            for coluna, rotulo, valor, referencia in [
+                (col1, "Esforço Total", atual['Total Estimado'], base['Total Estimado']),
+                (col2, f"Com Buffer {buffer:.0%}", atual.iloc[3], base.iloc[3]),
+                (col3, "Desenvolvimento", atual['Esforço Desenvolvimento'], base['Esforço Desenvolvimento']),
+                (col4, "Testes QA", atual['Esforço Testes QA'], base['Esforço Testes QA']),
+                (col5, "P80 (simulação)", faixas.loc['Total Estimado', 'P80 (h)'], None),
+            ]:
+                with coluna:
+                    st.metric(
+                        rotulo, f"{valor}h",
+                        delta=None if referencia is None or valor == referencia else f"{valor - referencia:+}h vs. padrão",
+                        delta_color="inverse"
+                    )
+            st.caption(
+                f"Faixas da simulação com as premissas atuais ({CENARIOS_PREMISSAS:,} cenários): ".replace(',', '.')
+                + " | ".join(f"{p} {faixas.loc['Total Estimado', f'{p} (h)']}h" for p in ('P50', 'P80', 'P95'))
+            )
+
         # Gráfico comparativo Dev vs Testes
         st.markdown("### Esforço: Desenvolvimento vs. Testes")
         fig_comp = go.Figure()
@@ -310,13 +421,12 @@ elif pagina == "💰 Precificação Detalhada":
 # === PÁGINA: ANÁLISE POR MÓDULO ===
 elif pagina == "🏗️ Análise por Prefixo/Grupo":
     
-    if 'ajustes' in dados:
+    if 'paineis' in dados and 'prefixos' in dados['paineis']:
+        import plotly.express as px
         st.markdown("## 🏗️ Análise de Impacto por Prefixo/Grupo de Programas")
-        df_ajustes = dados['ajustes']
         
-        # Contagem de pontos por módulo (prefixo do arquivo)
-        df_modulos = df_ajustes['Prefixo'].value_counts().reset_index()
-        df_modulos.columns = ['Prefixo/Grupo', 'Pontos Críticos']
+        # Contagem de pontos por módulo (prefixo do arquivo), pré-calculada na análise
+        df_modulos = dados['paineis']['prefixos']
         
         col1, col2 = st.columns([1, 2])
         
@@ -343,28 +453,72 @@ elif pagina == "🏗️ Análise por Prefixo/Grupo":
 # === PÁGINA: EXPLORADOR DE PONTOS CRÍTICOS ===
 elif pagina == "🔍 Explorador de Pontos Críticos":
 
-    if 'ajustes' in dados:
+    from particoes import carregar_manifesto, valores_particao
+    from esquemas import ESQUEMA_AJUSTES, ESQUEMA_DESCARTES
+
+    # Conjunto explorado: pontos críticos ou itens descartados. Com o dataset particionado gravado
+    # pela análise, só as partições dos filtros são lidas; sem ele (resultados antigos), a tabela inteira
+    conjuntos = {}
+    for nome, chave, arquivo_busca, pasta, esquema in [
+        ('Ajustes Críticos', 'ajustes', ARQUIVO_INDICE_BUSCA_AJUSTES, PASTA_PARTICOES_AJUSTES, ESQUEMA_AJUSTES),
+        ('Descartes', 'descartes', ARQUIVO_INDICE_BUSCA_DESCARTES, PASTA_PARTICOES_DESCARTES, ESQUEMA_DESCARTES),
+    ]:
+        manifesto = carregar_manifesto(pasta)
+        if manifesto is not None or chave in dados:
+            conjuntos[nome] = (chave, arquivo_busca, pasta, esquema, manifesto)
+
+    if 'Ajustes Críticos' in conjuntos:
         st.markdown("## 🔍 Explorador Interativo de Pontos Críticos")
-        df_ajustes = dados['ajustes'].copy()
-        
+
+        conjunto = st.radio("Conjunto de dados:", list(conjuntos.keys()), horizontal=True)
+        chave_dados, arquivo_indice_busca, pasta_particoes, esquema, manifesto = conjuntos[conjunto]
+
         # Filtros
         st.sidebar.header("Filtros do Explorador")
-        
-        # Filtro por Módulo (Prefixo)
-        modulos_unicos = sorted(df_ajustes['Prefixo'].unique())
-        modulos_selecionados = st.sidebar.multiselect("Prefixo/Grupo", modulos_unicos, default=modulos_unicos[:5])
-        
-        # Filtro por Arquivo
-        arquivos_unicos = sorted(df_ajustes[df_ajustes['Prefixo'].isin(modulos_selecionados)]['Arquivo'].unique())
-        arquivo_selecionado = st.sidebar.multiselect("Arquivo Específico", arquivos_unicos)
 
-        # Aplicar filtros
-        if modulos_selecionados:
-            df_filtrado = df_ajustes[df_ajustes['Prefixo'].isin(modulos_selecionados)]
-            if arquivo_selecionado:
-                df_filtrado = df_filtrado[df_filtrado['Arquivo'].isin(arquivo_selecionado)]
+        if manifesto is not None:
+            # Classificação e Prefixo escolhem as partições lidas do disco (valores vêm do manifesto)
+            classificacoes = valores_particao(manifesto, 'Classificação')
+            classificacoes_selecionadas = st.sidebar.multiselect("Classificação", classificacoes)
+            modulos_unicos = valores_particao(manifesto, 'Prefixo', {'Classificação': classificacoes_selecionadas})
+            modulos_selecionados = st.sidebar.multiselect("Prefixo/Grupo", modulos_unicos, default=modulos_unicos[:5])
+            filtros_particao = {'Classificação': classificacoes_selecionadas, 'Prefixo': modulos_selecionados}
+            df_ajustes, linhas_recorte = obter_recorte(
+                pasta_particoes, chave_dados, esquema, filtros_particao, versao_dados, armazenamento=indices_compartilhados()
+            )
+            recorte, total = chave_recorte(filtros_particao), manifesto['total']
+            # Índice do recorte fica na sessão: cada usuário olha o seu
+            indice = obter_indice(df_ajustes, chave_dados, ['Prefixo', 'Arquivo', 'Categoria', 'Variável'],
+                                  (versao_dados, recorte))
         else:
-            df_filtrado = df_ajustes
+            df_ajustes, linhas_recorte, recorte, total = dados[chave_dados], None, None, None
+            indice = obter_indice(
+                df_ajustes, chave_dados, ['Prefixo', 'Arquivo', 'Categoria', 'Variável'], versao_dados,
+                armazenamento=indices_compartilhados()
+            )
+
+            # Filtro por Módulo (Prefixo)
+            modulos_unicos = valores_disponiveis(indice, 'Prefixo')
+            modulos_selecionados = st.sidebar.multiselect("Prefixo/Grupo", modulos_unicos, default=modulos_unicos[:5])
+
+        indice_busca = obter_indice_busca(
+            df_ajustes, chave_dados, versao_dados, arquivo_indice_busca, armazenamento=indices_compartilhados(),
+            total=total, recorte=recorte
+        )
+
+        # Filtro por Arquivo (apenas os arquivos dos prefixos selecionados)
+        mascara_modulos = montar_mascara(indice, {'Prefixo': modulos_selecionados})
+        arquivos_unicos = valores_disponiveis(indice, 'Arquivo', mascara_modulos)
+        arquivo_selecionado = st.sidebar.multiselect("Arquivo Específico", arquivos_unicos)
+
+        # Aplicar filtros sobre o índice, sem copiar o DataFrame
+        mascara = montar_mascara(indice, {'Prefixo': modulos_selecionados, 'Arquivo': arquivo_selecionado})
+
+        # Busca textual no código via índice de trigramas (o salvo cobre a tabela inteira: recorte pelas linhas)
+        linhas_busca = linhas_recorte if indice_busca['total'] != len(df_ajustes) else None
+        mascara_busca = filtrar_por_busca(df_ajustes, indice_busca, f"explorador_{chave_dados}", linhas_busca)
+        if mascara_busca is not None:
+            mascara &= mascara_busca
 
         # Função para destacar variáveis no código
         def destacar_variaveis(row):
@@ -375,18 +529,71 @@ elif pagina == "🔍 Explorador de Pontos Críticos":
                 codigo = re.sub(f'({re.escape(var)})', r'**:red[\\1]**', codigo, flags=re.IGNORECASE)
             return codigo
 
-        # Aplicar o destaque
-        if not df_filtrado.empty:
-            # Criar uma cópia explícita aqui para evitar o SettingWithCopyWarning
-            df_filtrado = df_filtrado.copy()
-            df_filtrado.loc[:, 'Código'] = df_filtrado.apply(destacar_variaveis, axis=1)
-        
-        st.dataframe(df_filtrado, use_container_width=True)
-        st.info(f"Exibindo {len(df_filtrado)} de {len(df_ajustes)} pontos críticos.")
+        # O destaque é aplicado apenas às linhas da página exibida
+        def destacar_pagina(df_pagina):
+            df_pagina.loc[:, 'Código'] = df_pagina.apply(destacar_variaveis, axis=1)
+            return df_pagina
+
+        df_pagina = exibir_pagina(df_ajustes, indice, mascara, f"explorador_{chave_dados}", transformar=destacar_pagina)
+
+        # Linhas ao redor de cada ponto, quando a análise indexou a pasta de fontes exportada
+        indice_contexto = obter_indice_contexto_salvo(ARQUIVO_INDICE_CONTEXTO, armazenamento=indices_compartilhados())
+        if indice_contexto is not None:
+            exibir_contexto(df_pagina, indice_contexto, f"explorador_{chave_dados}")
+        quantidade, _ = resumir(indice, mascara)
+        st.info(f"Exibindo {quantidade} de {total or len(df_ajustes)} registros ({conjunto}).")
+        if manifesto is not None:
+            st.caption(f"{len(df_ajustes):,} linhas lidas das partições selecionadas (Classificação/Prefixo).")
 
     else:
         st.warning("⚠️ Dados de ajustes críticos não encontrados. Execute o script principal e recarregue a página.")
 
+# === PÁGINA: COMPARAR EXECUÇÕES ===
+elif pagina == "🔄 Comparar Execuções":
+    st.markdown("## 🔄 Comparação entre Execuções")
+    from historico_execucoes import carregar_manifesto, comparar_execucoes
+    execucoes = carregar_manifesto()
+
+    if len(execucoes) >= 2:
+        rotulos = {e['id']: f"{e['data']} — {e['pontos']} pontos" for e in execucoes}
+        ids = [e['id'] for e in execucoes]
+        col1, col2 = st.columns(2)
+        with col1:
+            id_antes = st.selectbox("Execução base:", ids, index=len(ids) - 2, format_func=rotulos.get)
+        with col2:
+            id_depois = st.selectbox("Comparar com:", ids, index=len(ids) - 1, format_func=rotulos.get)
+
+        # Snapshots são imutáveis: o diff de um par de execuções pode ficar em cache
+        @st.cache_data(show_spinner="Comparando execuções...")
+        def diff_execucoes(id_a, id_b):
+            return comparar_execucoes(id_a, id_b)
+
+        diff = diff_execucoes(id_antes, id_depois)
+        adicionados, removidos, reclassificados = diff['adicionados'], diff['removidos'], diff['reclassificados']
+
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Novos Pontos", len(adicionados))
+        with col2:
+            st.metric("Pontos Resolvidos", len(removidos))
+        with col3:
+            st.metric("Reclassificados", len(reclassificados))
+        with col4:
+            delta_total = diff['precificacao'].set_index('Métrica')['Delta'].get('Total Estimado')
+            st.metric("Delta Esforço Total", "N/A" if pd.isna(delta_total) else f"{delta_total:+}h")
+
+        st.markdown("### 💰 Delta da Precificação")
+        st.dataframe(diff['precificacao'], use_container_width=True, hide_index=True)
+
+        abas = st.tabs(["🆕 Novos", "✅ Resolvidos", "🔀 Reclassificados"])
+        for aba, tabela in zip(abas, [adicionados, removidos, reclassificados]):
+            with aba:
+                if len(tabela) > LIMITE_LINHAS_COMPARACAO:
+                    st.caption(f"Exibindo as primeiras {LIMITE_LINHAS_COMPARACAO} de {len(tabela)} linhas.")
+                st.dataframe(tabela.head(LIMITE_LINHAS_COMPARACAO), use_container_width=True, hide_index=True)
+    else:
+        st.info("ℹ️ São necessárias pelo menos duas execuções registradas. Execute o script principal novamente após alterações no código-fonte.")
+
 # Rodapé
 st.markdown("---")
 st.markdown("📊 **Dashboard de Análise CNPJ Alfanumérico** | Desenvolvido para suporte à precificação da proposta")
@@ -402,10 +609,8 @@ st.sidebar.markdown("""
 """)
 
 # Informações técnicas na sidebar
-if 'ajustes' in dados:
+if 'paineis' in dados and 'estatisticas' in dados['paineis']:
     st.sidebar.markdown("### 📈 Estatísticas:")
-    df = dados['ajustes']
-    st.sidebar.metric("Total de Pontos", len(df))
-    if 'Estimativa (Horas)' in df.columns:
-        st.sidebar.metric("Total Estimado", f"{df['Estimativa (Horas)'].sum():.1f}h")
-    st.sidebar.metric("Arquivos Únicos", df['Arquivo'].nunique()) 
\ No newline at end of file
+    estatisticas = dados['paineis']['estatisticas']
+    st.sidebar.metric("Total de Pontos", estatisticas['pontos'])
+    st.sidebar.metric("Arquivos Únicos", estatisticas['arquivos']) 
\ No newline at end of file
@@ -2,11 +2,12 @@
 # Para uso corporativo com controle de acesso
 
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime
-import os
+from servico_dados import obter_visao, aplicar_visao, indices_compartilhados
+from explorador import (
+    obter_indice, montar_mascara, valores_disponiveis, resumir, exibir_pagina,
+    obter_indice_busca, filtrar_por_busca
+)
 
 # === CONFIGURAÇÃO DE AUTENTICAÇÃO ===
 def check_password():
@@ -84,7 +85,7 @@ def show_session_info():
         for key in ['password_correct', 'user_profile', 'authenticated_at']:
             if key in st.session_state:
                 del st.session_state[key]
-        st.experimental_rerun()
+        st.rerun()
 
 def check_permission(action="view"):
     """Verifica permissões baseadas no perfil do usuário"""
@@ -113,18 +114,16 @@ if not check_password():
 # Mostrar informações da sessão
 show_session_info()
 
-# A partir daqui, o código do dashboard original continua...
-# Importar todas as funções do dashboard.py original
-
-# === CARREGAMENTO DE DADOS (mesmo código do dashboard original) ===
-@st.cache_data
-def carregar_dados():
-    """Carrega todos os datasets gerados pela análise"""
-    dados = {}
-    
-    # ... resto do código de carregamento igual ao dashboard.py
-    
-    return dados
+# Tabelas de detalhe disponíveis para exploração
+TABELAS_EXPLORAVEIS = {
+    'ajustes': '🎯 Ajustes Críticos',
+    'descartes': '🗑️ Descartes',
+    'nao_classificados': '❓ Sem Classificação'
+}
+INDICES_BUSCA = {
+    'ajustes': 'analise_ajustes_criticos_busca.npz',
+    'descartes': 'analise_descartes_busca.npz'
+}
 
 # === INTERFACE PRINCIPAL ===
 st.title("📊 Dashboard CNPJ Alfanumérico - Versão Corporativa")
@@ -160,7 +159,11 @@ if check_permission("view"):
 pagina = st.sidebar.selectbox("Selecione a página:", paginas_base)
 
 # === CARREGAMENTO E VALIDAÇÃO DE DADOS ===
-dados = carregar_dados()
+# Todas as sessões leem a mesma cópia; o perfil define apenas a visão (amostra e downloads)
+visao = obter_visao(user_profile)
+dados = visao['dados']
+for erro in visao['erros']:
+    st.error(erro)
 
 if not dados:
     st.error("❌ **Erro:** Nenhum dado encontrado!")
@@ -172,16 +175,68 @@ if not dados:
     """)
     st.stop()
 
+if visao['amostra'] is not None:
+    st.caption("🎲 Os detalhes exibidos são uma amostra dos resultados.")
+
+permitir_download = visao['download'] and check_permission("download")
+
+def indice_da_tabela(nome):
+    """Índice do explorador compartilhado entre sessões para uma tabela de detalhe"""
+    df = dados[nome]
+    colunas = [c for c in ['Prefixo', 'Arquivo', 'Categoria', 'Variável'] if c in df.columns]
+    return obter_indice(df, nome, colunas, visao['versao'], armazenamento=indices_compartilhados())
+
 # === CONTEÚDO DAS PÁGINAS ===
-# Aqui você copiaria todo o código das páginas do dashboard.py original
-# Mas com verificações de permissão onde necessário
-
-# Exemplo para downloads:
-if st.button("📥 Download") and check_permission("download"):
-    # Código de download
-    pass
-elif st.button("📥 Download") and not check_permission("download"):
-    st.error("❌ Permissão negada para download")
+if pagina == "🔍 Explorador Interativo":
+    tabelas = [nome for nome in TABELAS_EXPLORAVEIS if nome in dados]
+    if tabelas:
+        st.markdown("## 🔍 Explorador Interativo")
+        nome = st.radio(
+            "Conjunto de dados:", tabelas, format_func=TABELAS_EXPLORAVEIS.get, horizontal=True
+        )
+        df = dados[nome]
+        indice = indice_da_tabela(nome)
+        visiveis = aplicar_visao(visao, nome, montar_mascara(indice, {}))
+        
+        st.sidebar.header("Filtros do Explorador")
+        prefixos = valores_disponiveis(indice, 'Prefixo', visiveis)
+        prefixos_selecionados = st.sidebar.multiselect("Prefixo/Grupo", prefixos)
+        arquivos = valores_disponiveis(indice, 'Arquivo', visiveis & montar_mascara(indice, {'Prefixo': prefixos_selecionados}))
+        arquivos_selecionados = st.sidebar.multiselect("Arquivo Específico", arquivos)
+        
+        mascara = visiveis & montar_mascara(indice, {'Prefixo': prefixos_selecionados, 'Arquivo': arquivos_selecionados})
+        if nome in INDICES_BUSCA:
+            indice_busca = obter_indice_busca(
+                df, nome, visao['versao'], INDICES_BUSCA[nome], armazenamento=indices_compartilhados()
+            )
+            mascara_busca = filtrar_por_busca(df, indice_busca, f"auth_explorador_{nome}")
+            if mascara_busca is not None:
+                mascara &= mascara_busca
+        
+        exibir_pagina(
+            df, indice, mascara, f"auth_explorador_{nome}",
+            permitir_download=permitir_download, nome_download=nome
+        )
+        quantidade, _ = resumir(indice, mascara)
+        st.info(f"Exibindo {quantidade} de {int(visiveis.sum())} registros ({TABELAS_EXPLORAVEIS[nome]}).")
+    else:
+        st.warning("⚠️ Dados de detalhe não encontrados. Execute o script principal e recarregue a página.")
+
+elif pagina == "📋 Dados Brutos":
+    st.markdown("## 📋 Dados Brutos")
+    tabelas = [nome for nome in TABELAS_EXPLORAVEIS if nome in dados]
+    for aba, nome in zip(st.tabs([TABELAS_EXPLORAVEIS[n] for n in tabelas]), tabelas):
+        with aba:
+            indice = indice_da_tabela(nome)
+            exibir_pagina(
+                dados[nome], indice, aplicar_visao(visao, nome, montar_mascara(indice, {})), f"auth_brutos_{nome}",
+                permitir_download=permitir_download, nome_download=nome
+            )
+
+else:
+    # Aqui você copiaria o código das demais páginas do dashboard.py original,
+    # sempre lendo de `dados` e restringindo detalhes com aplicar_visao
+    st.info("🚧 Página disponível no dashboard principal (`dashboard.py`).")
 
 # === RODAPÉ CORPORATIVO ===
 st.markdown("---")
@@ -3,10 +3,21 @@
 
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import re
+import os
+import hashlib
+import tempfile
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from collections import OrderedDict
 from datetime import datetime
 from typing import Dict, List, Any
+from processamento_codigo import EXTENSOES_CODIGO, VERSAO_REGRAS, listar_entradas, processar_em_paralelo
+from exportacao import ler_exportacao
+from explorador import (
+    obter_indice, montar_mascara, valores_disponiveis, resumir, contar_por, exibir_pagina,
+    obter_indice_busca, filtrar_por_busca
+)
 
 # === CONFIGURAÇÃO ===
 st.set_page_config(
@@ -15,97 +26,148 @@ st.set_page_config(
     layout="wide"
 )
 
-# === FUNÇÕES DE PROCESSAMENTO ===
-def processar_codigo(conteudo: str) -> tuple:
-    """Processa código e identifica pontos CNPJ"""
-    
-    padroes_cnpj = [
-        r'\bcnpj\b', r'\bCNPJ\b', r'\bCgc\b', r'\bcgc\b', r'\bCGC\b',
-        r'\bCadNacPesJur\b', r'\bcadNacPesJur\b', r'\bCADNACPESJUR\b'
-    ]
-    
-    regras_descarte = [
-        r'^\s*\*', r'^\s*//', r'^\s*REM\s', r'STRING\s*\(', 
-        r'WRITE\s*\(', r'DISPLAY\s', r'EXHIBIT\s'
-    ]
-    
-    pontos = []
-    descartados = []
-    nao_classificados = []
-    
-    linhas = conteudo.split('\n')
-    
-    for i, linha in enumerate(linhas, 1):
-        linha_limpa = linha.strip()
-        
-        if not linha_limpa:
-            continue
-        
-        # Verificar descarte
-        deve_descartar = False
-        regra_descarte = None
-        
-        for regra in regras_descarte:
-            if re.search(regra, linha_limpa, re.IGNORECASE):
-                deve_descartar = True
-                regra_descarte = regra.replace('\\', '').replace('s*', '').replace('b', '')
-                break
-        
-        if deve_descartar:
-            descartados.append({
-                'Linha': i,
-                'Código': linha_limpa[:80] + '...' if len(linha_limpa) > 80 else linha_limpa,
-                'Motivo': regra_descarte
-            })
-            continue
-        
-        # Procurar CNPJ
-        for padrao in padroes_cnpj:
-            if re.search(padrao, linha_limpa):
-                categoria = categorizar_linha(linha_limpa)
-                
-                if categoria:
-                    estimativa = {
-                        'Validação/Entrada': 0.8,
-                        'Formatação/Exibição': 0.5,
-                        'Lógica de Negócio': 1.8,
-                        'Integrações Externas': 2.8,
-                        'Estrutura de Dados': 0.9
-                    }.get(categoria, 1.0)
-                    
-                    pontos.append({
-                        'Linha': i,
-                        'Código': linha_limpa[:80] + '...' if len(linha_limpa) > 80 else linha_limpa,
-                        'Variável': padrao.replace('\\', '').replace('b', ''),
-                        'Categoria': categoria,
-                        'Estimativa (h)': estimativa
-                    })
-                else:
-                    nao_classificados.append({
-                        'Linha': i,
-                        'Código': linha_limpa[:80] + '...' if len(linha_limpa) > 80 else linha_limpa,
-                        'Variável': padrao.replace('\\', '').replace('b', '')
-                    })
-                break
-    
-    return pontos, nao_classificados, descartados
+# === PROCESSAMENTO EM PARALELO ===
+@st.cache_resource
+def _pool_processos() -> ProcessPoolExecutor:
+    """Pool de processos único por servidor, reaproveitado por todas as sessões"""
+    # 'spawn' evita herdar as threads do servidor Streamlit nos processos filhos
+    return ProcessPoolExecutor(max_workers=os.cpu_count() or 1, mp_context=multiprocessing.get_context('spawn'))
+
+def analisar_arquivos(arquivo_csv, arquivos_codigo: List[Any], chave: str) -> Dict[str, Any]:
+    """Lê os arquivos enviados e monta o resultado completo da análise"""
+    
+    # Ler CSV
+    try:
+        df_variaveis = pd.read_csv(arquivo_csv)
+        st.success(f"✅ CSV carregado: {len(df_variaveis)} variáveis")
+    except Exception as e:
+        st.error(f"❌ Erro no CSV: {e}")
+        st.stop()
+    
+    # Processar os arquivos de código (TXT avulsos e membros de ZIP) em paralelo
+    barra = st.progress(0.0, text="📝 Lendo código-fonte...")
+    
+    def atualizar_progresso(lidos, total):
+        barra.progress(min(lidos / total, 1.0), text=f"📝 Processando código-fonte... {lidos / total:.0%}")
+    
+    try:
+        # Os uploads vão para disco para que os processos leiam em fluxo, sem cópia em memória
+        with tempfile.TemporaryDirectory(prefix="cnpj_upload_") as pasta:
+            caminhos = []
+            for indice, arquivo in enumerate(arquivos_codigo):
+                caminho = os.path.join(pasta, f"{indice}_{os.path.basename(arquivo.name)}")
+                with open(caminho, 'wb') as destino:
+                    destino.write(arquivo.getbuffer())
+                caminhos.append((caminho, arquivo.name))
+            
+            entradas = listar_entradas(caminhos)
+            if not entradas:
+                barra.empty()
+                st.error(f"❌ Nenhum arquivo de código no envio: os ZIP enviados não contêm arquivos {', '.join(EXTENSOES_CODIGO)}")
+                st.stop()
+            df_pontos, df_nao_class, df_descartes, linhas_por_arquivo = processar_em_paralelo(
+                entradas, executor=_pool_processos(), progresso=atualizar_progresso
+            )
+        barra.empty()
+        total_linhas = sum(linhas_por_arquivo.values())
+        st.success(f"✅ Código processado: {len(linhas_por_arquivo)} arquivo(s), {total_linhas} linhas")
+    except Exception as e:
+        st.error(f"❌ Erro no código-fonte: {e}")
+        st.stop()
+    
+    return {
+        'pontos': df_pontos,
+        'nao_classificados': df_nao_class,
+        'descartados': df_descartes,
+        'variaveis': df_variaveis,
+        'stats': {
+            'total_linhas': total_linhas,
+            'arquivo_nome': ", ".join(a.name for a in arquivos_codigo),
+            'linhas_por_arquivo': linhas_por_arquivo,
+            'processado_em': datetime.now(),
+            'chave': chave
+        }
+    }
+
+# === CACHE DE RESULTADOS (COMPARTILHADO ENTRE SESSÕES) ===
+# A chave inclui a versão das regras (processamento_codigo.VERSAO_REGRAS), derivada dos padrões e categorias
+LIMITE_CACHE_MB = int(os.environ.get("CNPJ_CACHE_MB", "512"))
+
+@st.cache_resource
+def _cache_resultados() -> Dict[str, Any]:
+    """Cache LRU único por processo, compartilhado por todas as sessões"""
+    return {
+        'itens': OrderedDict(),
+        'tamanhos': {},
+        'total_bytes': 0,
+        'em_andamento': {},
+        'trava': threading.Lock()
+    }
+
+def chave_conteudo(*arquivos) -> str:
+    """SHA-256 dos bytes (e nomes) enviados combinado com a versão das regras"""
+    hash_total = hashlib.sha256(VERSAO_REGRAS.encode())
+    for arquivo in arquivos:
+        hash_total.update(arquivo.name.encode())
+        hash_total.update(hashlib.sha256(arquivo.getbuffer()).digest())
+    return hash_total.hexdigest()
+
+def tamanho_resultado(resultado: Dict[str, Any]) -> int:
+    """Memória ocupada pelos DataFrames de um resultado"""
+    return sum(
+        int(df.memory_usage(deep=True).sum())
+        for df in resultado.values() if isinstance(df, pd.DataFrame)
+    )
+
+def obter_resultado(chave: str):
+    """Busca um resultado no cache e o marca como usado recentemente"""
+    cache = _cache_resultados()
+    with cache['trava']:
+        resultado = cache['itens'].get(chave)
+        if resultado is not None:
+            cache['itens'].move_to_end(chave)
+        return resultado
 
-def categorizar_linha(linha: str) -> str:
-    """Categoriza linha de código"""
-    linha_upper = linha.upper()
-    
-    if any(palavra in linha_upper for palavra in ['VALIDATE', 'CHECK', 'IF', 'WHEN', 'PERFORM']):
-        return 'Validação/Entrada'
-    elif any(palavra in linha_upper for palavra in ['DISPLAY', 'WRITE', 'MOVE', 'STRING']):
-        return 'Formatação/Exibição'
-    elif any(palavra in linha_upper for palavra in ['COMPUTE', 'ADD', 'EVALUATE', 'SEARCH']):
-        return 'Lógica de Negócio'
-    elif any(palavra in linha_upper for palavra in ['EXEC', 'SQL', 'SELECT', 'CICS', 'DB2']):
-        return 'Integrações Externas'
-    elif any(palavra in linha_upper for palavra in ['REDEFINES', 'OCCURS', 'PIC', 'VALUE']):
-        return 'Estrutura de Dados'
-    
-    return None
+def guardar_resultado(chave: str, resultado: Dict[str, Any]):
+    """Guarda um resultado e descarta os menos usados acima do limite de memória"""
+    cache = _cache_resultados()
+    limite = LIMITE_CACHE_MB * 1024 * 1024
+    tamanho = tamanho_resultado(resultado)
+    with cache['trava']:
+        if chave in cache['itens']:
+            cache['total_bytes'] -= cache['tamanhos'].pop(chave)
+            del cache['itens'][chave]
+        cache['itens'][chave] = resultado
+        cache['tamanhos'][chave] = tamanho
+        cache['total_bytes'] += tamanho
+        # O resultado mais recente é sempre mantido, mesmo que sozinho exceda o limite
+        while cache['total_bytes'] > limite and len(cache['itens']) > 1:
+            antiga, _ = cache['itens'].popitem(last=False)
+            cache['total_bytes'] -= cache['tamanhos'].pop(antiga)
+
+def resultado_em_cache(chave: str, processar) -> tuple:
+    """Retorna (resultado, reaproveitado), processando cada conteúdo uma única vez por processo"""
+    resultado = obter_resultado(chave)
+    if resultado is not None:
+        return resultado, True
+    
+    cache = _cache_resultados()
+    with cache['trava']:
+        trava_chave = cache['em_andamento'].setdefault(chave, threading.Lock())
+    
+    # Sessões concorrentes com o mesmo conteúdo aguardam o primeiro processamento
+    reaproveitado = True
+    try:
+        with trava_chave:
+            resultado = obter_resultado(chave)
+            if resultado is None:
+                resultado = processar()
+                guardar_resultado(chave, resultado)
+                reaproveitado = False
+    finally:
+        with cache['trava']:
+            cache['em_andamento'].pop(chave, None)
+    return resultado, reaproveitado
 
 # === INTERFACE ===
 st.title("📤 Dashboard CNPJ - Análise Interativa")
@@ -124,15 +186,16 @@ with col1:
     )
 
 with col2:
-    st.markdown("### 📝 Arquivo TXT (Código)")
-    arquivo_txt = st.file_uploader(
-        "Upload do TXT com código-fonte:",
-        type=['txt'],
-        help="Arquivo de texto com código para análise"
+    st.markdown("### 📝 Arquivos de Código (TXT ou ZIP)")
+    arquivos_codigo = st.file_uploader(
+        "Upload dos arquivos com código-fonte:",
+        type=[extensao.lstrip('.') for extensao in EXTENSOES_CODIGO] + ['zip'],
+        accept_multiple_files=True,
+        help="Um ou mais arquivos de texto ou fontes exportados, ou arquivos ZIP com as rotinas para análise"
     )
 
 # === PROCESSAMENTO ===
-if arquivo_csv and arquivo_txt:
+if arquivo_csv and arquivos_codigo:
     
     col1, col2, col3 = st.columns([1,1,1])
     
@@ -146,46 +209,31 @@ if arquivo_csv and arquivo_txt:
     if processar:
         
         with st.spinner("🔄 Processando arquivos..."):
+            arquivos_ordenados = sorted(arquivos_codigo, key=lambda a: a.name)
+            chave = chave_conteudo(arquivo_csv, *arquivos_ordenados)
+            resultado, reaproveitado = resultado_em_cache(
+                chave, lambda: analisar_arquivos(arquivo_csv, arquivos_ordenados, chave)
+            )
             
-            # Ler CSV
-            try:
-                df_variaveis = pd.read_csv(arquivo_csv)
-                st.success(f"✅ CSV carregado: {len(df_variaveis)} variáveis")
-            except Exception as e:
-                st.error(f"❌ Erro no CSV: {e}")
-                st.stop()
-            
-            # Ler TXT
-            try:
-                conteudo = arquivo_txt.read().decode('utf-8', errors='ignore')
-                total_linhas = len(conteudo.split('\n'))
-                st.success(f"✅ TXT carregado: {total_linhas} linhas")
-            except Exception as e:
-                st.error(f"❌ Erro no TXT: {e}")
-                st.stop()
-            
-            # Processar
-            pontos, nao_class, descartes = processar_codigo(conteudo)
-            
-            # Salvar resultados
-            st.session_state['resultados'] = {
-                'pontos': pd.DataFrame(pontos),
-                'nao_classificados': pd.DataFrame(nao_class),
-                'descartados': pd.DataFrame(descartes),
-                'variaveis': df_variaveis,
-                'stats': {
-                    'total_linhas': total_linhas,
-                    'arquivo_nome': arquivo_txt.name,
-                    'processado_em': datetime.now()
-                }
-            }
+            # A sessão guarda apenas a referência ao resultado compartilhado
+            st.session_state['resultados_chave'] = chave
         
-        st.success("🎉 Processamento concluído!")
+        if reaproveitado:
+            st.success("⚡ Arquivos já analisados anteriormente - resultado reaproveitado do cache!")
+        else:
+            st.success("🎉 Processamento concluído!")
 
 # === RESULTADOS ===
-if 'resultados' in st.session_state:
-    
-    dados = st.session_state['resultados']
+dados = None
+if 'resultados_chave' in st.session_state:
+    dados = obter_resultado(st.session_state['resultados_chave'])
+    if dados is None:
+        del st.session_state['resultados_chave']
+        st.warning("⏳ O resultado desta sessão expirou do cache compartilhado. Clique em ANALISAR novamente.")
+
+if dados is not None:
+    # Gráficos só existem com resultados: a primeira página (uploads) abre sem carregar o plotly
+    import plotly.express as px
     
     st.markdown("---")
     st.markdown("## 📊 Resultados da Análise")
@@ -205,6 +253,17 @@ if 'resultados' in st.session_state:
     with col4:
         st.metric("🗑️ Descartados", len(dados['descartados']))
     
+    # === FILTRO POR ARQUIVO DE ORIGEM ===
+    arquivos_origem = list(dados['stats'].get('linhas_por_arquivo', {}).keys())
+    arquivos_filtro = []
+    if len(arquivos_origem) > 1:
+        arquivos_filtro = st.multiselect(
+            "📁 Filtrar por arquivo de origem:",
+            arquivos_origem,
+            help="Deixe vazio para considerar todos os arquivos"
+        )
+    filtro_origem = {'Arquivo': arquivos_filtro}
+    
     # === ABAS DE RESULTADOS ===
     tab1, tab2, tab3, tab4, tab5 = st.tabs([
         "🎯 Pontos de Impacto",
@@ -219,9 +278,11 @@ if 'resultados' in st.session_state:
         
         if not dados['pontos'].empty:
             df_pontos = dados['pontos']
+            versao = dados['stats']['chave']
+            indice = obter_indice(df_pontos, 'pontos', ['Arquivo', 'Categoria', 'Variável'], versao, coluna_horas='Estimativa (h)', armazenamento=dados)
             
             # Estimativa total
-            total_horas = df_pontos['Estimativa (h)'].sum()
+            _, total_horas = resumir(indice, montar_mascara(indice, filtro_origem))
             st.info(f"⏱️ **Estimativa Total:** {total_horas:.1f} horas ({total_horas/8:.1f} dias úteis)")
             
             # Filtros simples
@@ -229,39 +290,39 @@ if 'resultados' in st.session_state:
             
             with col1:
                 if 'Categoria' in df_pontos.columns:
+                    categorias = valores_disponiveis(indice, 'Categoria')
                     cats_selecionadas = st.multiselect(
                         "🏷️ Filtrar por Categoria:",
-                        df_pontos['Categoria'].unique(),
-                        default=df_pontos['Categoria'].unique()
+                        categorias,
+                        default=categorias
                     )
                 else:
                     cats_selecionadas = []
             
             with col2:
+                variaveis = valores_disponiveis(indice, 'Variável')
                 vars_selecionadas = st.multiselect(
                     "🔍 Filtrar por Variável:",
-                    df_pontos['Variável'].unique(),
-                    default=df_pontos['Variável'].unique()
+                    variaveis,
+                    default=variaveis
                 )
             
-            # Aplicar filtros
-            df_filtrado = df_pontos.copy()
-            if cats_selecionadas:
-                df_filtrado = df_filtrado[df_filtrado['Categoria'].isin(cats_selecionadas)]
-            if vars_selecionadas:
-                df_filtrado = df_filtrado[df_filtrado['Variável'].isin(vars_selecionadas)]
+            # Aplicar filtros sobre o índice (sem copiar o DataFrame)
+            mascara = montar_mascara(indice, {**filtro_origem, 'Categoria': cats_selecionadas, 'Variável': vars_selecionadas})
             
-            # Mostrar dados filtrados
-            st.markdown(f"**{len(df_filtrado)} pontos** ({df_filtrado['Estimativa (h)'].sum():.1f}h)")
-            st.dataframe(df_filtrado, use_container_width=True, hide_index=True)
+            # Busca textual no código via índice de trigramas
+            indice_busca = obter_indice_busca(df_pontos, 'pontos', versao, armazenamento=dados)
+            mascara_busca = filtrar_por_busca(df_pontos, indice_busca, 'pontos_impacto')
+            if mascara_busca is not None:
+                mascara &= mascara_busca
+            quantidade, horas_filtradas = resumir(indice, mascara)
             
-            # Download
-            csv = df_filtrado.to_csv(index=False, encoding='utf-8-sig')
-            st.download_button(
-                "📥 Download Pontos de Impacto",
-                csv,
-                file_name=f"pontos_impacto_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                mime="text/csv"
+            # Mostrar apenas a página atual dos dados filtrados
+            st.markdown(f"**{quantidade} pontos** ({horas_filtradas:.1f}h)")
+            exibir_pagina(
+                df_pontos, indice, mascara, 'pontos_impacto',
+                permitir_download=True,
+                nome_download=f"pontos_impacto_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
             )
         else:
             st.warning("⚠️ Nenhum ponto de impacto encontrado")
@@ -271,9 +332,11 @@ if 'resultados' in st.session_state:
         
         if not dados['pontos'].empty and 'Categoria' in dados['pontos'].columns:
             df_pontos = dados['pontos']
+            if arquivos_filtro:
+                df_pontos = df_pontos[df_pontos['Arquivo'].isin(arquivos_filtro)]
             
             # Agrupamento
-            cat_stats = df_pontos.groupby('Categoria').agg({
+            cat_stats = df_pontos.groupby('Categoria', observed=True).agg({
                 'Estimativa (h)': ['sum', 'mean', 'count']
             }).round(2)
             
@@ -311,7 +374,9 @@ if 'resultados' in st.session_state:
         
         if not dados['nao_classificados'].empty:
             st.info("💡 Estes itens podem precisar de análise manual")
-            st.dataframe(dados['nao_classificados'], use_container_width=True, hide_index=True)
+            df_nao_class = dados['nao_classificados']
+            indice_nao_class = obter_indice(df_nao_class, 'nao_classificados', ['Arquivo'], dados['stats']['chave'], armazenamento=dados)
+            exibir_pagina(df_nao_class, indice_nao_class, montar_mascara(indice_nao_class, filtro_origem), 'nao_classificados')
         else:
             st.success("✅ Todos os pontos foram classificados!")
     
@@ -321,9 +386,13 @@ if 'resultados' in st.session_state:
         if not dados['descartados'].empty:
             st.info("ℹ️ Linhas ignoradas (comentários, strings, etc.)")
             
+            df_descartados = dados['descartados']
+            indice_descartados = obter_indice(df_descartados, 'descartados', ['Arquivo', 'Motivo'], dados['stats']['chave'], armazenamento=dados)
+            mascara_descartados = montar_mascara(indice_descartados, filtro_origem)
+            
             # Análise de motivos
-            if 'Motivo' in dados['descartados'].columns:
-                motivo_count = dados['descartados']['Motivo'].value_counts()
+            if 'Motivo' in df_descartados.columns:
+                motivo_count = contar_por(indice_descartados, 'Motivo', mascara_descartados).sort_values(ascending=False)
                 
                 fig = px.bar(
                     x=motivo_count.values,
@@ -333,7 +402,7 @@ if 'resultados' in st.session_state:
                 )
                 st.plotly_chart(fig, use_container_width=True)
             
-            st.dataframe(dados['descartados'], use_container_width=True, hide_index=True)
+            exibir_pagina(df_descartados, indice_descartados, mascara_descartados, 'descartados')
         else:
             st.info("ℹ️ Nenhum item foi descartado")
     
@@ -344,17 +413,12 @@ if 'resultados' in st.session_state:
             "🎯 Impactos", "❓ Não Class.", "🗑️ Descartes", "📄 Variáveis"
         ])
         
-        with sub_tab1:
-            st.dataframe(dados['pontos'], use_container_width=True, hide_index=True)
-        
-        with sub_tab2:
-            st.dataframe(dados['nao_classificados'], use_container_width=True, hide_index=True)
-        
-        with sub_tab3:
-            st.dataframe(dados['descartados'], use_container_width=True, hide_index=True)
-        
-        with sub_tab4:
-            st.dataframe(dados['variaveis'], use_container_width=True, hide_index=True)
+        versao = dados['stats']['chave']
+        for aba, nome in zip([sub_tab1, sub_tab2, sub_tab3, sub_tab4], ['pontos', 'nao_classificados', 'descartados', 'variaveis']):
+            with aba:
+                df_bruto = dados[nome]
+                indice_bruto = obter_indice(df_bruto, f"bruto_{nome}", ['Arquivo'], versao, armazenamento=dados)
+                exibir_pagina(df_bruto, indice_bruto, montar_mascara(indice_bruto, filtro_origem), f"bruto_{nome}")
     
     # === AÇÕES ===
     st.markdown("---")
@@ -362,30 +426,25 @@ if 'resultados' in st.session_state:
     
     with col1:
         if st.button("🔄 Nova Análise"):
-            del st.session_state['resultados']
-            st.experimental_rerun()
+            del st.session_state['resultados_chave']
+            st.rerun()
     
     with col2:
-        # Download completo
-        if st.button("📦 Download Completo"):
-            import zipfile
-            import io
-            
-            zip_buffer = io.BytesIO()
-            
-            with zipfile.ZipFile(zip_buffer, 'w') as zip_file:
-                # Adicionar CSVs ao ZIP
-                for nome, df in dados.items():
-                    if isinstance(df, pd.DataFrame):
-                        csv_data = df.to_csv(index=False, encoding='utf-8-sig')
-                        zip_file.writestr(f"{nome}.csv", csv_data)
-            
-            st.download_button(
-                "📥 Baixar ZIP Completo",
-                zip_buffer.getvalue(),
-                file_name=f"analise_cnpj_completa_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip",
-                mime="application/zip"
-            )
+        # Download completo: pacote gerado uma vez por resultado e reaproveitado do disco
+        tabelas = {nome: df for nome, df in dados.items() if isinstance(df, pd.DataFrame)}
+        carimbo = dados['stats']['processado_em'].strftime('%Y%m%d_%H%M%S')
+        st.download_button(
+            "📦 Download Completo (CSV)",
+            lambda: ler_exportacao(tabelas, dados['stats']['chave'], 'csv'),
+            file_name=f"analise_cnpj_completa_{carimbo}.zip",
+            mime="application/zip"
+        )
+        st.download_button(
+            "🗜️ Download Compacto (Parquet)",
+            lambda: ler_exportacao(tabelas, dados['stats']['chave'], 'parquet'),
+            file_name=f"analise_cnpj_completa_{carimbo}_parquet.zip",
+            mime="application/zip"
+        )
     
     with col3:
         st.info(f"📅 Processado: {dados['stats']['processado_em'].strftime('%H:%M:%S')}")
@@ -416,13 +475,16 @@ else:
     
     with col2:
         st.markdown("""
-        ### 2️⃣ Arquivo TXT de Código
+        ### 2️⃣ Arquivos de Código (TXT ou ZIP)
         
-        Faça upload do código-fonte contendo:
+        Faça upload de um ou mais arquivos, ou de ZIPs com as rotinas, contendo:
         - Código COBOL, Natural, JCL
         - Rotinas de mainframe
         - Scripts de banco de dados
         
+        Os arquivos são processados em paralelo e os resultados
+        podem ser filtrados por arquivo de origem.
+        
         **O sistema irá:**
         - 🔍 Identificar variáveis CNPJ
         - 📊 Categorizar por tipo de uso
@@ -0,0 +1,68 @@
+# 📐 Esquemas das tabelas de saída
+# Colunas e tipos fixos por relatório: quem grava e quem lê usam o mesmo esquema,
+# então a conversão para Arrow no Streamlit não precisa de correções posteriores.
+
+import pandas as pd
+
+TEXTO = 'string'
+INTEIRO = 'Int64'  # Inteiro com suporte a vazio (<NA>)
+
+ESQUEMA_AJUSTES = {
+    'Arquivo': TEXTO, 'Tipo Programa': TEXTO, 'Prefixo': TEXTO, 'Classificação': TEXTO,
+    'Localizador': TEXTO, 'Variável': TEXTO, 'Categoria': TEXTO, 'Padrão': TEXTO,
+    'Justificativa': TEXTO, 'Código': TEXTO,
+}
+
+ESQUEMA_DESCARTES = {
+    'Arquivo': TEXTO, 'Tipo Programa': TEXTO, 'Prefixo': TEXTO, 'Classificação': TEXTO,
+    'Localizador': TEXTO, 'Variável': TEXTO, 'Regra de Descarte': TEXTO, 'Código': TEXTO,
+}
+
+# Valor numérico e unidade em colunas separadas (antes: "1234h" misturado com inteiros)
+ESQUEMA_SUMARIO = {'Métrica': TEXTO, 'Valor': INTEIRO, 'Unidade': TEXTO}
+
+ESQUEMA_ESTIMATIVA = {
+    'Frente de Trabalho': TEXTO, 'Tipo': TEXTO, 'Pontos Identificados': INTEIRO,
+    'Esforço Dev (h)': INTEIRO, 'Esforço Testes (h)': INTEIRO, 'Total (h)': INTEIRO, 'Observação': TEXTO,
+}
+
+ESQUEMA_PONTOS_OFICIAIS = {
+    'Arquivo': TEXTO, 'Localizador': TEXTO, 'Categoria': TEXTO, 'Padrão': TEXTO,
+    'Justificativa': TEXTO, 'Código': TEXTO,
+}
+
+# Percentis da simulação Monte Carlo do esforço (simulacao_esforco), por métrica e por frente
+_PERCENTIS_SIMULACAO = {
+    'Determinístico (h)': INTEIRO, 'Média (h)': INTEIRO, 'P50 (h)': INTEIRO, 'P80 (h)': INTEIRO, 'P95 (h)': INTEIRO,
+}
+ESQUEMA_SIMULACAO = {'Métrica': TEXTO, **_PERCENTIS_SIMULACAO}
+ESQUEMA_SIMULACAO_FRENTES = {'Frente de Trabalho': TEXTO, **_PERCENTIS_SIMULACAO}
+ESQUEMA_HISTOGRAMA = {'Início (h)': INTEIRO, 'Fim (h)': INTEIRO, 'Cenários': INTEIRO, 'Acumulado (%)': 'float64'}
+
+ESQUEMA_RESUMO = {'Arquivo': TEXTO, 'Tipo Programa': TEXTO, 'Pontos Críticos': INTEIRO}
+
+# Pontos críticos por prefixo (painel pré-calculado da página de análise por grupo)
+ESQUEMA_PREFIXOS = {'Prefixo/Grupo': TEXTO, 'Pontos Críticos': INTEIRO}
+
+# Abas do relatório de precificação
+ESQUEMAS_PRECIFICACAO = {
+    '1_Summary_Executivo': ESQUEMA_SUMARIO,
+    '2_Estimativa_Detalhada': ESQUEMA_ESTIMATIVA,
+    '3_Detalhe_Pontos_Oficiais': ESQUEMA_PONTOS_OFICIAIS,
+    '4_Simulacao_Percentis': ESQUEMA_SIMULACAO,
+    '5_Simulacao_Frentes': ESQUEMA_SIMULACAO_FRENTES,
+    '6_Simulacao_Histograma': ESQUEMA_HISTOGRAMA,
+}
+
+
+def aplicar_esquema(df, esquema):
+    """Seleciona as colunas do esquema, na ordem declarada, convertidas para os tipos declarados."""
+    faltantes = [coluna for coluna in esquema if coluna not in df.columns]
+    if faltantes:
+        raise ValueError(f"Colunas ausentes para o esquema: {', '.join(faltantes)}")
+    return df[list(esquema)].astype(esquema)
+
+
+def ler_excel(arquivo, esquema, sheet_name=0):
+    """Lê uma tabela de saída já com os tipos do esquema (sem inferência por célula)."""
+    return aplicar_esquema(pd.read_excel(arquivo, sheet_name=sheet_name, dtype=esquema), esquema)
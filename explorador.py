@@ -0,0 +1,255 @@
+# 🔍 Explorador paginado de resultados
+# Filtra, ordena e fatia no servidor; apenas a página atual é enviada ao navegador.
+
+import os
+import re
+import numpy as np
+import pandas as pd
+import streamlit as st
+from indice_busca import construir_indice_busca, carregar_indice_busca, buscar
+
+TAMANHOS_PAGINA = [25, 50, 100, 250, 500]
+# Recortes de partições mantidos em memória por tabela (os filtros usados mais recentemente)
+RECORTES_EM_MEMORIA = 4
+
+
+def indexar_resultados(df, colunas_filtro, colunas_ordenacao=None, coluna_horas=None):
+    """Pré-calcula códigos por valor e ordens globais das colunas indexadas."""
+    colunas_ordenacao = colunas_ordenacao if colunas_ordenacao is not None else list(df.columns)
+    indice = {'total': len(df), 'codigos': {}, 'valores': {}, 'ordens': {}, 'horas': None}
+
+    for col in colunas_filtro:
+        if col not in df.columns:
+            continue
+        codigos, valores = pd.factorize(df[col].astype(str), sort=True)
+        indice['codigos'][col] = codigos.astype(np.int32)
+        indice['valores'][col] = valores
+
+    for col in colunas_ordenacao:
+        if col not in df.columns:
+            continue
+        try:
+            chaves, _ = pd.factorize(df[col], sort=True)
+        except TypeError:
+            # Colunas com tipos mistos são ordenadas pela representação textual
+            chaves, _ = pd.factorize(df[col].astype(str), sort=True)
+        indice['ordens'][col] = np.argsort(chaves, kind='stable')
+
+    if coluna_horas and coluna_horas in df.columns:
+        indice['horas'] = pd.to_numeric(df[coluna_horas], errors='coerce').fillna(0).to_numpy(dtype=np.float64)
+
+    return indice
+
+
+def obter_indice(df, chave, colunas_filtro, versao, coluna_horas=None, armazenamento=None):
+    """Reaproveita o índice enquanto a versão dos dados não mudar.
+
+    Por padrão o índice fica na sessão; passe `armazenamento` para guardá-lo junto aos dados compartilhados.
+    """
+    armazenamento = st.session_state if armazenamento is None else armazenamento
+    chave_estado = f"_explorador_indice_{chave}"
+    guardado = armazenamento.get(chave_estado)
+    if guardado is None or guardado[0] != versao:
+        guardado = (versao, indexar_resultados(df, colunas_filtro, coluna_horas=coluna_horas))
+        armazenamento[chave_estado] = guardado
+    return guardado[1]
+
+
+def montar_mascara(indice, filtros):
+    """Combina os filtros {coluna: valores selecionados} em uma máscara booleana."""
+    mascara = np.ones(indice['total'], dtype=bool)
+    for col, selecionados in filtros.items():
+        if not selecionados or col not in indice['codigos']:
+            continue
+        valores = indice['valores'][col]
+        permitidos = np.zeros(len(valores), dtype=bool)
+        posicoes = valores.get_indexer([str(v) for v in selecionados])
+        permitidos[posicoes[posicoes >= 0]] = True
+        mascara &= permitidos[indice['codigos'][col]]
+    return mascara
+
+
+def valores_disponiveis(indice, coluna, mascara=None):
+    """Lista os valores da coluna presentes nas linhas da máscara, sem materializar o recorte."""
+    if coluna not in indice['codigos']:
+        return []
+    valores = indice['valores'][coluna]
+    if mascara is None:
+        return list(valores)
+    contagem = np.bincount(indice['codigos'][coluna][mascara], minlength=len(valores))
+    return list(valores[contagem > 0])
+
+
+def resumir(indice, mascara):
+    """Caminho rápido: quantidade de linhas e total de horas da máscara."""
+    quantidade = int(np.count_nonzero(mascara))
+    horas = float(indice['horas'][mascara].sum()) if indice['horas'] is not None else None
+    return quantidade, horas
+
+
+def contar_por(indice, coluna, mascara):
+    """Contagem por valor de uma coluna indexada dentro da máscara."""
+    valores = indice['valores'][coluna]
+    contagem = np.bincount(indice['codigos'][coluna][mascara], minlength=len(valores))
+    return pd.Series(contagem, index=valores, name='Quantidade').loc[lambda s: s > 0]
+
+
+def posicoes_ordenadas(indice, mascara, coluna=None, crescente=True):
+    """Posições das linhas filtradas, na ordem pedida, sem reordenar o DataFrame."""
+    if coluna is None or coluna not in indice['ordens']:
+        posicoes = np.flatnonzero(mascara)
+    else:
+        ordem = indice['ordens'][coluna]
+        posicoes = ordem[mascara[ordem]]
+    return posicoes if crescente else posicoes[::-1]
+
+
+def exibir_pagina(df, indice, mascara, chave, transformar=None, permitir_download=False, nome_download="resultados"):
+    """Renderiza controles de ordenação e paginação e mostra somente a página atual."""
+    quantidade = int(np.count_nonzero(mascara))
+
+    col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
+    with col1:
+        coluna_ordem = st.selectbox(
+            "↕️ Ordenar por:", ["(original)"] + list(indice['ordens'].keys()), key=f"{chave}_ordem"
+        )
+    with col2:
+        crescente = st.radio("Ordem:", ["Crescente", "Decrescente"], key=f"{chave}_sentido", horizontal=True) == "Crescente"
+    with col3:
+        tamanho = st.selectbox("Linhas por página:", TAMANHOS_PAGINA, index=1, key=f"{chave}_tamanho")
+    total_paginas = max(1, -(-quantidade // tamanho))
+    chave_pagina = f"{chave}_pagina"
+    # Volta para a primeira página quando o filtro reduz o total de páginas
+    if st.session_state.get(chave_pagina, 1) > total_paginas:
+        st.session_state[chave_pagina] = 1
+    with col4:
+        pagina = st.number_input("Página:", min_value=1, max_value=total_paginas, step=1, key=chave_pagina)
+
+    posicoes = posicoes_ordenadas(indice, mascara, None if coluna_ordem == "(original)" else coluna_ordem, crescente)
+    inicio = (int(pagina) - 1) * tamanho
+    df_pagina = df.iloc[posicoes[inicio:inicio + tamanho]]
+    if transformar is not None and not df_pagina.empty:
+        df_pagina = transformar(df_pagina.copy())
+
+    st.dataframe(df_pagina, use_container_width=True, hide_index=True)
+    st.caption(f"Página {int(pagina)} de {total_paginas} · {quantidade:,} linhas filtradas")
+
+    if permitir_download:
+        st.download_button(
+            "📥 Download do recorte filtrado",
+            lambda: df.iloc[posicoes].to_csv(index=False, encoding='utf-8-sig'),
+            file_name=f"{nome_download}.csv",
+            mime="text/csv",
+            key=f"{chave}_download"
+        )
+
+    return df_pagina
+
+
+def obter_indice_busca(df, chave, versao, caminho=None, armazenamento=None, total=None, recorte=None):
+    """Usa o índice de busca persistido pela análise ou o constrói em memória para a versão dos dados.
+
+    Com `recorte` (chave dos filtros que produziram df), df é parte de uma tabela de `total` linhas:
+    o índice salvo da tabela completa serve a todos os recortes (ver filtrar_por_busca); sem ele,
+    o índice é construído só para o recorte.
+    """
+    armazenamento = st.session_state if armazenamento is None else armazenamento
+    total = len(df) if total is None else total
+    chave_estado = f"_explorador_busca_{chave}"
+    guardado = armazenamento.get(chave_estado)
+    if guardado is None or guardado[0] != versao or guardado[2] not in (None, recorte):
+        indice, dono = None, None
+        if caminho and os.path.exists(caminho):
+            indice = carregar_indice_busca(caminho)
+            if indice is not None and indice['total'] != total:
+                indice = None  # Índice de outra execução (ou versão): reconstruir
+        if indice is None:
+            indice, dono = construir_indice_busca(df['Código']), recorte
+        guardado = (versao, indice, dono)
+        armazenamento[chave_estado] = guardado
+    return guardado[1]
+
+
+def filtrar_por_busca(df, indice_busca, chave, linhas=None):
+    """Caixa de busca no código; retorna a máscara das linhas encontradas ou None sem consulta.
+
+    `linhas` segue indice_busca.buscar (df é um recorte da tabela do índice).
+    """
+    col1, col2 = st.columns([4, 1])
+    with col1:
+        consulta = st.text_input("🔎 Buscar no código:", key=f"{chave}_busca", placeholder="ex.: $P(CCLI ou IBSRIC")
+    with col2:
+        regex = st.checkbox("Regex", key=f"{chave}_regex", help="Interpreta a busca como expressão regular")
+
+    if not consulta:
+        return None
+    try:
+        posicoes = buscar(indice_busca, df['Código'].to_numpy(), consulta, regex=regex, linhas=linhas)
+    except re.error as e:
+        st.error(f"❌ Expressão inválida: {e}")
+        return None
+    mascara = np.zeros(len(df), dtype=bool)
+    mascara[posicoes] = True
+    return mascara
+
+
+def obter_recorte(pasta, chave, esquema, filtros, versao, armazenamento=None):
+    """Linhas das partições que passam nos `filtros` (particoes), lidas do disco uma vez por filtro.
+
+    Guarda os RECORTES_EM_MEMORIA recortes usados mais recentemente. Retorna (df, linhas no relatório).
+    """
+    from particoes import carregar_particoes
+    armazenamento = st.session_state if armazenamento is None else armazenamento
+    chave_estado = f"_explorador_recortes_{chave}"
+    guardado = armazenamento.get(chave_estado)
+    if guardado is None or guardado[0] != versao:
+        guardado = (versao, {})
+        armazenamento[chave_estado] = guardado
+    recortes = guardado[1]
+    filtro = chave_recorte(filtros)
+    recorte = recortes.pop(filtro, None)
+    if recorte is None:
+        recorte = carregar_particoes(pasta, esquema, filtros)
+    recortes[filtro] = recorte  # O mais recente fica no fim
+    while len(recortes) > RECORTES_EM_MEMORIA:
+        recortes.pop(next(iter(recortes)), None)
+    return recorte
+
+
+def chave_recorte(filtros):
+    """Chave imutável de um conjunto de filtros {coluna: valores}."""
+    return tuple(sorted((coluna, tuple(sorted(map(str, valores)))) for coluna, valores in filtros.items() if valores))
+
+
+def obter_indice_contexto_salvo(caminho, armazenamento=None):
+    """Índice de contexto gravado pela análise (indice_contexto), recarregado quando o arquivo muda; None se não existe."""
+    if not os.path.exists(caminho):
+        return None
+    from indice_contexto import carregar_indice_contexto
+    armazenamento = st.session_state if armazenamento is None else armazenamento
+    versao = os.path.getmtime(caminho)
+    guardado = armazenamento.get("_explorador_contexto")
+    if guardado is None or guardado[0] != versao:
+        guardado = (versao, carregar_indice_contexto(caminho))
+        armazenamento["_explorador_contexto"] = guardado
+    return guardado[1]
+
+
+def exibir_contexto(df_pagina, indice_contexto, chave, linhas=5):
+    """Trecho do código-fonte ao redor de um ponto da página atual, lido do fonte mapeado em memória."""
+    from indice_contexto import janela
+    if df_pagina.empty:
+        return
+    with st.expander("📄 Contexto no código-fonte"):
+        pontos = list(dict.fromkeys(zip(df_pagina['Arquivo'].astype(str), df_pagina['Localizador'].astype(str))))
+        arquivo, localizador = st.selectbox(
+            "Ponto:", pontos, format_func=lambda p: f"{p[0]}({p[1]})", key=f"{chave}_contexto"
+        )
+        encontrado = janela(indice_contexto, arquivo, localizador, linhas, linhas)
+        if encontrado is None:
+            st.caption("Fonte ou rótulo não encontrado na pasta de fontes exportada.")
+            return
+        primeira, trecho, alvo = encontrado
+        st.code("\n".join(
+            f"{'▶' if i == alvo else ' '} {primeira + i:>6}  {linha}" for i, linha in enumerate(trecho)
+        ), language=None)
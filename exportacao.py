@@ -0,0 +1,100 @@
+# 📦 Exportação completa dos resultados
+# Gera o pacote uma única vez por versão do resultado, em disco e comprimido em fluxo.
+
+import io
+import os
+import tempfile
+import threading
+import zipfile
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+PASTA_EXPORTACOES = os.environ.get(
+    "CNPJ_EXPORT_DIR", os.path.join(tempfile.gettempdir(), "cnpj_exportacoes")
+)
+# Linhas convertidas por vez: limita o pico de memória durante a exportação
+LINHAS_POR_PARTE = 50_000
+# Pacotes mantidos em disco (os mais antigos são removidos)
+LIMITE_EXPORTACOES = 20
+
+FORMATOS = {
+    'csv': {'extensao': 'csv', 'compressao': zipfile.ZIP_DEFLATED},
+    # Parquet já é comprimido internamente: o ZIP apenas agrupa os arquivos
+    'parquet': {'extensao': 'parquet', 'compressao': zipfile.ZIP_STORED},
+}
+
+_trava_exportacao = threading.Lock()
+
+
+def caminho_exportacao(chave, formato):
+    """Caminho do pacote de uma versão de resultado em um formato."""
+    return os.path.join(PASTA_EXPORTACOES, f"{chave}_{formato}.zip")
+
+
+def _escrever_csv(df, destino):
+    """Escreve o DataFrame em CSV (UTF-8 com BOM) por partes."""
+    texto = io.TextIOWrapper(destino, encoding='utf-8-sig', newline='')
+    for inicio in range(0, max(len(df), 1), LINHAS_POR_PARTE):
+        df.iloc[inicio:inicio + LINHAS_POR_PARTE].to_csv(texto, index=False, header=inicio == 0)
+    texto.flush()
+    texto.detach()
+
+
+def _escrever_parquet(df, destino):
+    """Escreve o DataFrame em Parquet, um grupo de linhas por parte."""
+    # O esquema vem da tabela inteira: uma parte só com vazios não muda o tipo da coluna
+    esquema = pa.Schema.from_pandas(df, preserve_index=False)
+    with pq.ParquetWriter(destino, esquema, compression='zstd') as escritor:
+        for inicio in range(0, len(df), LINHAS_POR_PARTE):
+            parte = df.iloc[inicio:inicio + LINHAS_POR_PARTE]
+            escritor.write_table(pa.Table.from_pandas(parte, schema=esquema, preserve_index=False))
+
+
+def gerar_pacote(tabelas, destino, formato):
+    """Comprime {nome: DataFrame} em um ZIP, em fluxo, sem montar o arquivo em memória."""
+    config = FORMATOS[formato]
+    escrever = _escrever_csv if formato == 'csv' else _escrever_parquet
+    temporario = f"{destino}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with zipfile.ZipFile(temporario, 'w', compression=config['compressao']) as pacote:
+            for nome, df in tabelas.items():
+                with pacote.open(f"{nome}.{config['extensao']}", 'w', force_zip64=True) as membro:
+                    escrever(df, membro)
+        # Troca atômica: quem lê nunca vê um pacote pela metade
+        os.replace(temporario, destino)
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+
+
+def _limpar_antigos():
+    """Remove os pacotes mais antigos acima de LIMITE_EXPORTACOES."""
+    pacotes = [
+        os.path.join(PASTA_EXPORTACOES, nome)
+        for nome in os.listdir(PASTA_EXPORTACOES) if nome.endswith('.zip')
+    ]
+    pacotes.sort(key=os.path.getmtime, reverse=True)
+    for antigo in pacotes[LIMITE_EXPORTACOES:]:
+        try:
+            os.remove(antigo)
+        except OSError:
+            pass  # Outro processo já removeu
+
+
+def obter_exportacao(tabelas, chave, formato):
+    """Caminho do pacote da versão `chave`, gerado apenas na primeira solicitação."""
+    destino = caminho_exportacao(chave, formato)
+    if os.path.exists(destino):
+        return destino
+    with _trava_exportacao:
+        if not os.path.exists(destino):
+            os.makedirs(PASTA_EXPORTACOES, exist_ok=True)
+            gerar_pacote(tabelas, destino, formato)
+            _limpar_antigos()
+    return destino
+
+
+def ler_exportacao(tabelas, chave, formato):
+    """Bytes do pacote para o botão de download (gerado sob demanda)."""
+    with open(obter_exportacao(tabelas, chave, formato), 'rb') as arquivo:
+        return arquivo.read()
@@ -0,0 +1,110 @@
+# 🔌 Formatos de entrada da análise
+# Cada formato é uma função que recebe uma linha (sem espaços nas pontas) e devolve
+# (arquivo, localizador, código), None quando a linha não está no formato, ou PULAR para
+# linhas de controle da ferramenta (cabeçalhos, separadores, eventos sem resultado).
+#
+#   findstudio:    arquivo(localizador)[complemento]: código
+#   grep:          arquivo:linha:código                       (grep -rn)
+#   ripgrep-json:  {"type": "match", "data": {...}}           (rg --json)
+
+import re
+import json
+import base64
+from itertools import chain, islice
+
+# Linha reconhecida, mas sem ponto de código (não vira veredito)
+PULAR = ()
+
+# Linhas examinadas para descobrir o formato da entrada
+LINHAS_DETECCAO = 50
+
+
+def extrair_findstudio(linha):
+    """findStudio: `arquivo(loc1)[loc2]: código`, por busca de delimitadores (sem regex).
+
+    Equivale a `^(.*?)\\((.*?)\\)(.*?):\\s*(.*)`: arquivo até o primeiro '(', localizador até o
+    ')' seguinte mais o que houver até o próximo ':', e o código no restante.
+    """
+    if "Searching for" in linha:
+        return PULAR
+    abre = linha.find('(')
+    if abre < 0:
+        return None
+    fecha = linha.find(')', abre + 1)
+    if fecha < 0:
+        return None
+    dois_pontos = linha.find(':', fecha + 1)
+    if dois_pontos < 0:
+        return None
+    localizador = linha[abre + 1:fecha].strip() + linha[fecha + 1:dois_pontos].strip()
+    return linha[:abre].strip(), localizador, linha[dois_pontos + 1:].strip()
+
+
+_GREP_CAMINHO_COM_DOIS_PONTOS = re.compile(r"^(.+?):(\d+):(.*)$")
+
+
+def extrair_grep(linha):
+    """grep -rn: `arquivo:número da linha:código` (o número da linha é o localizador)."""
+    if linha == '--' or linha.startswith(('Binary file ', 'grep: ')):
+        return PULAR
+    partes = linha.split(':', 2)
+    if len(partes) == 3 and partes[1].isdigit():
+        arquivo, numero, codigo = partes
+    else:
+        # Caminho com ':' (ex.: C:\fontes\x.int:12:código)
+        encontrado = _GREP_CAMINHO_COM_DOIS_PONTOS.match(linha)
+        if not encontrado:
+            return None
+        arquivo, numero, codigo = encontrado.groups()
+    if not arquivo:
+        return None
+    return arquivo.strip(), numero, codigo.strip()
+
+
+def _texto_rg(campo):
+    """Campo de texto do ripgrep: {'text': ...} ou {'bytes': base64} quando não é UTF-8."""
+    if 'text' in campo:
+        return campo['text']
+    return base64.b64decode(campo['bytes']).decode('utf-8', errors='replace')
+
+
+def extrair_ripgrep_json(linha):
+    """rg --json: um evento JSON por linha; só os eventos 'match' trazem código."""
+    if not linha.startswith('{'):
+        return None
+    try:
+        evento = json.loads(linha)
+        if evento.get('type') != 'match':
+            return PULAR
+        dados = evento['data']
+        return _texto_rg(dados['path']), str(dados['line_number']), _texto_rg(dados['lines']).strip()
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+# Ordem de preferência na detecção: do formato mais específico ao mais permissivo
+FORMATOS = {
+    'ripgrep-json': extrair_ripgrep_json,
+    'grep': extrair_grep,
+    'findstudio': extrair_findstudio,
+}
+FORMATO_PADRAO = 'findstudio'
+
+
+def detectar_formato(amostra):
+    """Formato de um conjunto de linhas: o primeiro que reconhece a maioria das linhas com conteúdo."""
+    linhas = [linha.strip() for linha in amostra if linha.strip()]
+    for nome, extrair in FORMATOS.items():
+        resultados = [extrair(linha) for linha in linhas]
+        validos = [r for r in resultados if r is not None]
+        com_codigo = [r for r in validos if r is not PULAR]
+        if com_codigo and len(validos) * 2 > len(linhas):
+            return nome
+    return FORMATO_PADRAO
+
+
+def separar_amostra(registros, tamanho=LINHAS_DETECCAO):
+    """Lê as primeiras linhas de um iterável para a detecção; retorna (amostra, iterável completo)."""
+    registros = iter(registros)
+    amostra = list(islice(registros, tamanho))
+    return amostra, chain(amostra, registros)
@@ -0,0 +1,202 @@
+# 🗂️ Histórico de execuções da análise
+# Cada execução do main.py vira um snapshot imutável (Parquet) registrado em um manifesto;
+# o diff entre dois snapshots é um hash join sobre a chave (Arquivo, Localizador, hash do Código).
+
+import os
+import json
+import threading
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+PASTA_EXECUCOES = os.environ.get("CNPJ_RUNS_DIR", "execucoes")
+ARQUIVO_MANIFESTO = "manifesto.json"
+
+# Colunas guardadas em cada snapshot (Resultado: 'Ajuste' ou 'Descarte')
+COLUNAS_SNAPSHOT = ['Arquivo', 'Localizador', 'Código', 'Resultado', 'Categoria', 'Padrão']
+# Colunas que definem a classificação de um ponto: mudou alguma delas, o ponto foi reclassificado
+COLUNAS_CLASSIFICACAO = ['Resultado', 'Categoria', 'Padrão']
+# Linhas por grupo do Parquet: o diff lê o texto apenas dos grupos que contêm pontos alterados
+LINHAS_POR_GRUPO = 65_536
+
+_trava_manifesto = threading.Lock()
+
+
+def _hash_linhas(df, colunas):
+    """Hash de 64 bits por linha sobre as colunas indicadas (vetorizado)."""
+    return pd.util.hash_pandas_object(df[colunas].astype('string'), index=False).to_numpy()
+
+
+def montar_snapshot(df_ajustes, df_descartados):
+    """Tabela única do snapshot, com as chaves já calculadas.
+
+    'chave' identifica o ponto (Arquivo, Localizador, hash do Código) e 'assinatura' a sua
+    classificação; ambas são uint64 para que o diff não precise comparar texto.
+    """
+    partes = []
+    if df_ajustes is not None and not df_ajustes.empty:
+        partes.append(df_ajustes.assign(Resultado='Ajuste'))
+    if df_descartados is not None and not df_descartados.empty:
+        partes.append(df_descartados.assign(
+            Resultado='Descarte', Categoria=df_descartados['Regra de Descarte'], Padrão=None
+        ))
+    if not partes:
+        snapshot = pd.DataFrame({coluna: pd.Series(dtype='string') for coluna in COLUNAS_SNAPSHOT})
+    else:
+        snapshot = pd.concat([p[COLUNAS_SNAPSHOT] for p in partes], ignore_index=True).astype('string')
+
+    snapshot['hash_codigo'] = _hash_linhas(snapshot, ['Código'])
+    chaves = snapshot[['Arquivo', 'Localizador']].assign(hash_codigo=snapshot['hash_codigo'])
+    snapshot['chave'] = pd.util.hash_pandas_object(chaves, index=False).to_numpy()
+    snapshot['assinatura'] = _hash_linhas(snapshot, COLUNAS_CLASSIFICACAO)
+    # A mesma linha de código pode aparecer repetida na extração: vale a primeira ocorrência
+    return snapshot.drop_duplicates('chave', ignore_index=True)
+
+
+def carregar_manifesto(pasta=PASTA_EXECUCOES):
+    """Lista das execuções registradas, da mais antiga para a mais recente."""
+    caminho = os.path.join(pasta, ARQUIVO_MANIFESTO)
+    if not os.path.exists(caminho):
+        return []
+    with open(caminho, encoding='utf-8') as arquivo:
+        return json.load(arquivo)
+
+
+def _salvar_manifesto(execucoes, pasta):
+    """Grava o manifesto de forma atômica."""
+    caminho = os.path.join(pasta, ARQUIVO_MANIFESTO)
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, 'w', encoding='utf-8') as arquivo:
+        json.dump(execucoes, arquivo, ensure_ascii=False, indent=2)
+    os.replace(temporario, caminho)
+
+
+def registrar_execucao(df_ajustes, df_descartados, metricas, pasta=PASTA_EXECUCOES):
+    """Grava o snapshot da execução e o registra no manifesto; retorna o id da execução.
+
+    `metricas` ({Métrica: Valor}) guarda o sumário da precificação para o delta entre execuções.
+    """
+    snapshot = montar_snapshot(df_ajustes, df_descartados)
+    os.makedirs(pasta, exist_ok=True)
+
+    with _trava_manifesto:
+        execucoes = carregar_manifesto(pasta)
+        base = datetime.now().strftime('%Y%m%d_%H%M%S')
+        ids = {e['id'] for e in execucoes}
+        id_execucao, sufixo = base, 1
+        while id_execucao in ids or os.path.exists(os.path.join(pasta, f"{id_execucao}.parquet")):
+            sufixo += 1
+            id_execucao = f"{base}_{sufixo}"
+
+        # Snapshots nunca são sobrescritos: grava em temporário e renomeia
+        destino = os.path.join(pasta, f"{id_execucao}.parquet")
+        temporario = f"{destino}.{os.getpid()}.tmp"
+        pq.write_table(
+            pa.Table.from_pandas(snapshot, preserve_index=False), temporario,
+            compression='zstd', row_group_size=LINHAS_POR_GRUPO
+        )
+        os.replace(temporario, destino)
+
+        execucoes.append({
+            'id': id_execucao,
+            'data': datetime.now().isoformat(timespec='seconds'),
+            'arquivo': f"{id_execucao}.parquet",
+            'pontos': int((snapshot['Resultado'] == 'Ajuste').sum()),
+            'descartes': int((snapshot['Resultado'] == 'Descarte').sum()),
+            'metricas': {metrica: int(valor) for metrica, valor in metricas.items() if pd.notna(valor)},
+        })
+        _salvar_manifesto(execucoes, pasta)
+    return id_execucao
+
+
+def ler_snapshot(id_execucao, colunas=None, pasta=PASTA_EXECUCOES, posicoes=None):
+    """Lê (apenas as colunas pedidas de) um snapshot registrado.
+
+    Com `posicoes`, lê somente os grupos de linhas que as contêm e devolve as linhas nessa ordem.
+    """
+    caminho = os.path.join(pasta, f"{id_execucao}.parquet")
+    if posicoes is None:
+        return pq.read_table(caminho, columns=colunas).to_pandas()
+
+    arquivo = pq.ParquetFile(caminho)
+    tamanhos = np.array([arquivo.metadata.row_group(g).num_rows for g in range(arquivo.num_row_groups)])
+    inicios = np.concatenate([[0], np.cumsum(tamanhos)])
+    grupo_da_linha = np.searchsorted(inicios, posicoes, side='right') - 1
+    grupos, ordem = np.unique(grupo_da_linha, return_inverse=True)
+    tabela = arquivo.read_row_groups(grupos.tolist(), columns=colunas)
+
+    # Posição no arquivo -> posição na tabela formada apenas pelos grupos lidos
+    deslocamentos = np.concatenate([[0], np.cumsum(tamanhos[grupos])[:-1]])
+    locais = posicoes - inicios[grupo_da_linha] + deslocamentos[ordem]
+    return tabela.take(pa.array(locais, type=pa.int64())).to_pandas()
+
+
+def comparar_chaves(chaves_a, assinaturas_a, chaves_b, assinaturas_b):
+    """Hash join entre dois snapshots.
+
+    Retorna as posições (em A ou B) dos pontos adicionados (só em B), removidos (só em A)
+    e reclassificados (em ambos, com assinatura diferente), como
+    {'adicionados': pos_b, 'removidos': pos_a, 'reclassificados': (pos_a, pos_b)}.
+    """
+    # get_indexer monta uma tabela hash sobre A e sonda com B: O(n), sem ordenar
+    posicoes = pd.Index(chaves_a).get_indexer(chaves_b)
+    em_a = posicoes >= 0
+    pos_b_comuns = np.flatnonzero(em_a)
+    pos_a_comuns = posicoes[em_a]
+
+    presentes_em_b = np.zeros(len(chaves_a), dtype=bool)
+    presentes_em_b[pos_a_comuns] = True
+    mudou = assinaturas_a[pos_a_comuns] != assinaturas_b[pos_b_comuns]
+
+    return {
+        'adicionados': np.flatnonzero(~em_a),
+        'removidos': np.flatnonzero(~presentes_em_b),
+        'reclassificados': (pos_a_comuns[mudou], pos_b_comuns[mudou]),
+    }
+
+
+def delta_precificacao(execucao_a, execucao_b):
+    """Diferença das métricas do sumário de precificação entre duas execuções do manifesto."""
+    metricas_a, metricas_b = execucao_a.get('metricas', {}), execucao_b.get('metricas', {})
+    linhas = []
+    for metrica in dict.fromkeys([*metricas_a, *metricas_b]):
+        antes, depois = metricas_a.get(metrica), metricas_b.get(metrica)
+        linhas.append({
+            'Métrica': metrica, 'Antes': antes, 'Depois': depois,
+            'Delta': None if antes is None or depois is None else depois - antes,
+        })
+    return pd.DataFrame(linhas, columns=['Métrica', 'Antes', 'Depois', 'Delta']).astype(
+        {'Métrica': 'string', 'Antes': 'Int64', 'Depois': 'Int64', 'Delta': 'Int64'}
+    )
+
+
+def comparar_execucoes(id_a, id_b, pasta=PASTA_EXECUCOES):
+    """Diff completo entre duas execuções registradas.
+
+    Lê só as chaves para o join e busca as demais colunas apenas das linhas que mudaram.
+    Retorna {'adicionados', 'removidos', 'reclassificados', 'precificacao'} como DataFrames.
+    """
+    colunas_join = ['chave', 'assinatura']
+    a = ler_snapshot(id_a, colunas_join, pasta)
+    b = ler_snapshot(id_b, colunas_join, pasta)
+    diff = comparar_chaves(
+        a['chave'].to_numpy(), a['assinatura'].to_numpy(), b['chave'].to_numpy(), b['assinatura'].to_numpy()
+    )
+
+    pos_a, pos_b = diff['reclassificados']
+    antes = ler_snapshot(id_a, COLUNAS_CLASSIFICACAO, pasta, pos_a)
+    depois = ler_snapshot(id_b, COLUNAS_SNAPSHOT, pasta, pos_b)
+    reclassificados = depois[['Arquivo', 'Localizador', 'Código']].assign(
+        **{f"{coluna} (antes)": antes[coluna] for coluna in COLUNAS_CLASSIFICACAO},
+        **{f"{coluna} (depois)": depois[coluna] for coluna in COLUNAS_CLASSIFICACAO},
+    )
+
+    execucoes = {e['id']: e for e in carregar_manifesto(pasta)}
+    return {
+        'adicionados': ler_snapshot(id_b, COLUNAS_SNAPSHOT, pasta, diff['adicionados']),
+        'removidos': ler_snapshot(id_a, COLUNAS_SNAPSHOT, pasta, diff['removidos']),
+        'reclassificados': reclassificados,
+        'precificacao': delta_precificacao(execucoes.get(id_a, {}), execucoes.get(id_b, {})),
+    }
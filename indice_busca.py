@@ -0,0 +1,184 @@
+# 🔎 Índice invertido de trigramas sobre a coluna Código
+# Permite buscas por fragmento ou regex simples sem varrer a tabela inteira com str.contains.
+
+import re
+import numpy as np
+
+# Quantidade de linhas processadas por bloco na construção (limita o pico de memória)
+LINHAS_POR_BLOCO = 200_000
+# Muda quando a normalização do texto muda: índices salvos de outra versão são reconstruídos
+VERSAO_INDICE = 2
+
+# Caracteres que encerram um trecho literal dentro de uma expressão regular
+METACARACTERES = set('.^$*+?{}[]()|\\')
+QUANTIFICADORES_OPCIONAIS = ('?', '*', '{')
+
+
+def _dobrar(texto):
+    """Bytes UTF-8 do texto sem distinção de maiúsculas (casefold: 'AÇÃO' e 'ação' viram os mesmos bytes)."""
+    return texto.casefold().encode('utf-8', errors='ignore')
+
+
+def _normalizar(textos):
+    """Converte textos para bytes UTF-8 sem distinção de maiúsculas, uma linha por texto."""
+    return _dobrar('\n'.join(str(t).replace('\n', ' ') for t in textos))
+
+
+def _trigramas_bytes(dados):
+    """Retorna (trigramas, posições) válidos de um buffer, sem atravessar quebras de linha."""
+    buf = np.frombuffer(dados, dtype=np.uint8)
+    if len(buf) < 3:
+        return np.empty(0, dtype=np.uint32), np.empty(0, dtype=np.int64)
+    eh_quebra = buf == 10
+    validos = ~(eh_quebra[:-2] | eh_quebra[1:-1] | eh_quebra[2:])
+    trigramas = (buf[:-2].astype(np.uint32) << 16) | (buf[1:-1].astype(np.uint32) << 8) | buf[2:].astype(np.uint32)
+    posicoes = np.flatnonzero(validos)
+    return trigramas[posicoes], posicoes
+
+
+def construir_indice_busca(codigos):
+    """Constrói o índice invertido trigrama -> linhas para uma sequência de códigos."""
+    codigos = list(codigos)
+    blocos = []
+    for inicio in range(0, len(codigos), LINHAS_POR_BLOCO):
+        dados = _normalizar(codigos[inicio:inicio + LINHAS_POR_BLOCO])
+        trigramas, posicoes = _trigramas_bytes(dados)
+        quebras = np.flatnonzero(np.frombuffer(dados, dtype=np.uint8) == 10)
+        linhas = np.searchsorted(quebras, posicoes, side='right') + inicio
+        # Pares (trigrama, linha) codificados em um único inteiro de 64 bits
+        blocos.append((trigramas.astype(np.uint64) << np.uint64(32)) | linhas.astype(np.uint64))
+
+    pares = np.sort(np.concatenate(blocos)) if blocos else np.empty(0, dtype=np.uint64)
+    if len(pares):
+        pares = pares[np.concatenate(([True], pares[1:] != pares[:-1]))]
+    chaves = (pares >> np.uint64(32)).astype(np.uint32)
+    inicios = np.flatnonzero(np.concatenate(([True], chaves[1:] != chaves[:-1]))) if len(chaves) else np.empty(0, dtype=np.int64)
+    return {
+        'total': len(codigos),
+        'trigramas': chaves[inicios],
+        'inicios': np.append(inicios, len(pares)).astype(np.int64),
+        'linhas': (pares & np.uint64(0xFFFFFFFF)).astype(np.int32),
+    }
+
+
+def salvar_indice_busca(indice, caminho):
+    """Persiste o índice em formato .npz ao lado dos resultados."""
+    np.savez(caminho, versao=np.int64(VERSAO_INDICE), total=np.int64(indice['total']), trigramas=indice['trigramas'],
+             inicios=indice['inicios'], linhas=indice['linhas'])
+
+
+def carregar_indice_busca(caminho):
+    """Carrega um índice salvo por salvar_indice_busca (None se for de outra versão)."""
+    with np.load(caminho) as dados:
+        if 'versao' not in dados or int(dados['versao']) != VERSAO_INDICE:
+            return None
+        return {
+            'total': int(dados['total']),
+            'trigramas': dados['trigramas'],
+            'inicios': dados['inicios'],
+            'linhas': dados['linhas'],
+        }
+
+
+def _postagens(indice, trigrama):
+    """Linhas que contêm o trigrama (vazio se o trigrama não existir)."""
+    pos = np.searchsorted(indice['trigramas'], trigrama)
+    if pos >= len(indice['trigramas']) or indice['trigramas'][pos] != trigrama:
+        return np.empty(0, dtype=np.int32)
+    return indice['linhas'][indice['inicios'][pos]:indice['inicios'][pos + 1]]
+
+
+def _candidatos(indice, literais):
+    """Interseção das listas de trigramas de todos os trechos literais obrigatórios."""
+    trigramas = set()
+    for literal in literais:
+        t, _ = _trigramas_bytes(_dobrar(literal))
+        trigramas.update(t.tolist())
+    if not trigramas:
+        return None  # Consulta curta demais: não há como filtrar pelo índice
+
+    listas = sorted((_postagens(indice, t) for t in trigramas), key=len)
+    candidatos = listas[0]
+    for lista in listas[1:]:
+        if len(candidatos) == 0:
+            break
+        candidatos = np.intersect1d(candidatos, lista, assume_unique=True)
+    return candidatos
+
+
+def extrair_literais(padrao):
+    """Extrai os trechos literais obrigatórios de uma regex simples (fora de grupos e alternâncias)."""
+    if '|' in padrao.replace('\\|', ''):
+        return []  # Alternância: nenhum trecho é garantidamente obrigatório
+
+    literais, atual, profundidade, i = [], '', 0, 0
+    while i < len(padrao):
+        c = padrao[i]
+        proximo = padrao[i + 1] if i + 1 < len(padrao) else ''
+        if c == '\\' and proximo:
+            i += 2
+            if proximo.isalnum():
+                # Classes como \b, \d, \w encerram o trecho literal
+                literais.append(atual)
+                atual = ''
+                continue
+            caractere = proximo
+        elif c == '[':
+            fim = padrao.find(']', i + 2)
+            literais.append(atual)
+            atual = ''
+            i = len(padrao) if fim < 0 else fim + 1
+            continue
+        elif c == '{':
+            # Quantificador {n,m}: o conteúdo não é texto (o caractere anterior já saiu do trecho)
+            fim = padrao.find('}', i + 1)
+            literais.append(atual)
+            atual = ''
+            i = len(padrao) if fim < 0 else fim + 1
+            continue
+        elif c in '()':
+            profundidade += 1 if c == '(' else -1
+            literais.append(atual)
+            atual = ''
+            i += 1
+            continue
+        elif c in METACARACTERES:
+            literais.append(atual)
+            atual = ''
+            i += 1
+            continue
+        else:
+            caractere = c
+            i += 1
+        if profundidade == 0:
+            if i < len(padrao) and padrao[i] in QUANTIFICADORES_OPCIONAIS:
+                # O caractere seguido de ?, * ou {n,m} pode não aparecer no texto
+                literais.append(atual)
+                atual = ''
+            else:
+                atual += caractere
+    literais.append(atual)
+    return [l for l in literais if l]
+
+
+def buscar(indice, codigos, consulta, regex=False, linhas=None):
+    """Retorna as posições (ordenadas) das linhas cujo código corresponde à consulta.
+
+    A busca ignora maiúsculas/minúsculas. Sem regex, a consulta é tratada como fragmento literal.
+    Quando `codigos` é um recorte da tabela indexada, `linhas` traz (em ordem crescente) a linha
+    do índice de cada código, e as posições retornadas são as do recorte.
+    """
+    if not consulta:
+        return np.arange(len(codigos))
+    padrao = consulta if regex else re.escape(consulta)
+    compilado = re.compile(padrao, re.IGNORECASE)
+
+    candidatos = _candidatos(indice, extrair_literais(padrao) if regex else [consulta])
+    if candidatos is None:
+        candidatos = np.arange(len(codigos))
+    elif linhas is not None:
+        posicoes = np.searchsorted(linhas, candidatos)
+        presentes = posicoes < len(linhas)
+        presentes[presentes] = linhas[posicoes[presentes]] == candidatos[presentes]
+        candidatos = posicoes[presentes]
+    return np.array([i for i in candidatos if compilado.search(str(codigos[i]))], dtype=np.int64)
@@ -0,0 +1,191 @@
+# 📄 Índice de linhas do código-fonte exportado
+# Guarda, para cada fonte, o deslocamento em bytes do início de cada linha e a linha de cada rótulo.
+# Com ele, o contexto de um ponto (Arquivo, Localizador) é lido direto do arquivo mapeado em memória,
+# sem reler nem percorrer o fonte: rótulo -> linha -> faixa de bytes.
+
+import os
+import re
+import mmap
+import numpy as np
+
+# Extensões consideradas fontes na pasta exportada
+EXTENSOES_FONTES = ('.int', '.mac', '.inc', '.cls')
+
+# Localizador do findStudio (`ROTULO+deslocamento[complemento]`) ou número da linha (grep, .zip)
+LOCALIZADOR = re.compile(r"^(?P<rotulo>[%\w]*?)(?:\+(?P<deslocamento>\d+))?(?:\[.*\])?$")
+# Rótulo M: identificador na coluna 1; em classes, o nome do método
+ROTULO = re.compile(rb"(?:(?:Class)?Method\s+)?([%\w]+)")
+# Caracteres que, na coluna 1, indicam linha sem rótulo
+SEM_ROTULO = np.frombuffer(b' \t;\r\n/{}', dtype=np.uint8)
+
+
+def listar_fontes(raiz):
+    """Caminhos relativos dos fontes sob `raiz`, em ordem."""
+    fontes = []
+    for pasta, subpastas, arquivos in os.walk(raiz):
+        subpastas.sort()
+        for nome in sorted(arquivos):
+            if nome.lower().endswith(EXTENSOES_FONTES):
+                fontes.append(os.path.relpath(os.path.join(pasta, nome), raiz))
+    return fontes
+
+
+def assinatura_fontes(raiz, fontes=None):
+    """Quantidade, tamanho total e última modificação dos fontes (muda quando a exportação muda)."""
+    fontes = listar_fontes(raiz) if fontes is None else fontes
+    estados = [os.stat(os.path.join(raiz, f)) for f in fontes]
+    return np.array([len(estados), sum(e.st_size for e in estados), max((e.st_mtime_ns for e in estados), default=0)],
+                    dtype=np.int64)
+
+
+def _indexar_fonte(caminho):
+    """(inícios das linhas + tamanho do arquivo, {rótulo: linha}) de um fonte."""
+    with open(caminho, 'rb') as arquivo:
+        dados = arquivo.read()
+    buf = np.frombuffer(dados, dtype=np.uint8)
+    inicios = np.concatenate(([0], np.flatnonzero(buf == 10) + 1)).astype(np.int64)
+    if inicios[-1] == len(dados):
+        inicios = inicios[:-1]  # Última linha terminada em '\n': não há linha depois dela
+    inicios = np.append(inicios, len(dados))
+
+    rotulos = {}
+    com_rotulo = inicios[:-1][~np.isin(buf[inicios[:-1]], SEM_ROTULO)]
+    for linha, inicio in zip(np.searchsorted(inicios, com_rotulo).tolist(), com_rotulo.tolist()):
+        encontrado = ROTULO.match(dados, inicio, min(inicio + 200, len(dados)))
+        if encontrado:
+            rotulos.setdefault(encontrado.group(1).decode('utf-8', errors='ignore'), linha)
+    return inicios, rotulos
+
+
+def construir_indice_contexto(raiz):
+    """Índice de todos os fontes sob `raiz` (uma leitura de cada arquivo)."""
+    fontes = listar_fontes(raiz)
+    inicios, rotulos = [], []
+    for fonte in fontes:
+        inicios_fonte, rotulos_fonte = _indexar_fonte(os.path.join(raiz, fonte))
+        inicios.append(inicios_fonte)
+        rotulos.append(rotulos_fonte)
+    return _montar(raiz, fontes, inicios, rotulos, assinatura_fontes(raiz, fontes))
+
+
+def _montar(raiz, fontes, inicios, rotulos, assinatura, rotulos_salvos=None):
+    por_nome = {}
+    for posicao, fonte in enumerate(fontes):
+        nome = os.path.basename(fonte)
+        por_nome.setdefault(nome, posicao)
+        por_nome.setdefault(nome.lower(), posicao)
+    return {
+        'raiz': raiz, 'fontes': fontes, 'inicios': inicios, 'rotulos': rotulos,
+        'rotulos_salvos': rotulos_salvos, 'assinatura': assinatura, 'por_nome': por_nome, 'mapas': {},
+    }
+
+
+def salvar_indice_contexto(indice, caminho):
+    """Persiste o índice em .npz (linhas e rótulos de todos os fontes concatenados, com os limites de cada um)."""
+    rotulos = [_rotulos(indice, posicao) for posicao in range(len(indice['fontes']))]
+    # Gravado à parte e substituído de uma vez: o dashboard pode estar lendo o índice anterior
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, 'wb') as arquivo:
+        np.savez(
+            arquivo,
+            raiz=np.array(os.path.abspath(indice['raiz'])),
+            fontes=np.array(indice['fontes'], dtype=str),
+            assinatura=indice['assinatura'],
+            inicios=np.concatenate(indice['inicios']) if indice['inicios'] else np.empty(0, dtype=np.int64),
+            limites=np.cumsum([0] + [len(i) for i in indice['inicios']]).astype(np.int64),
+            rotulos_limites=np.cumsum([0] + [len(r) for r in rotulos]).astype(np.int64),
+            rotulos_nome=np.array([nome for r in rotulos for nome in r], dtype=str),
+            rotulos_linha=np.array([linha for r in rotulos for linha in r.values()], dtype=np.int32),
+        )
+    os.replace(temporario, caminho)
+
+
+def carregar_indice_contexto(caminho):
+    """Carrega um índice salvo por salvar_indice_contexto."""
+    with np.load(caminho) as dados:
+        todos, limites = dados['inicios'], dados['limites']
+        fontes = dados['fontes'].tolist()
+        inicios = [todos[limites[i]:limites[i + 1]] for i in range(len(fontes))]
+        # Os rótulos de cada fonte viram dicionário só na primeira consulta a ele (_rotulos)
+        salvos = (dados['rotulos_limites'], dados['rotulos_nome'], dados['rotulos_linha'])
+        return _montar(str(dados['raiz']), fontes, inicios, [None] * len(fontes), dados['assinatura'], salvos)
+
+
+def obter_indice_contexto(raiz, caminho, log=print):
+    """Índice salvo em `caminho` se ainda corresponde aos fontes de `raiz`; senão, reconstrói e salva."""
+    if os.path.exists(caminho):
+        try:
+            indice = carregar_indice_contexto(caminho)
+            if indice['raiz'] == os.path.abspath(raiz) and np.array_equal(indice['assinatura'], assinatura_fontes(raiz)):
+                return indice
+        except Exception as e:
+            log(f"AVISO: índice de contexto '{caminho}' ilegível, reconstruindo: {e}")
+    indice = construir_indice_contexto(raiz)
+    salvar_indice_contexto(indice, caminho)
+    log(f"Índice de contexto salvo em: {caminho} ({len(indice['fontes'])} fontes)")
+    return indice
+
+
+def _rotulos(indice, posicao):
+    """{rótulo: linha} de um fonte."""
+    rotulos = indice['rotulos'][posicao]
+    if rotulos is None:
+        limites, nomes, linhas = indice['rotulos_salvos']
+        inicio, fim = limites[posicao], limites[posicao + 1]
+        rotulos = dict(zip(nomes[inicio:fim].tolist(), linhas[inicio:fim].tolist()))
+        indice['rotulos'][posicao] = rotulos
+    return rotulos
+
+
+def localizar(indice, arquivo, localizador):
+    """(posição do fonte, linha a partir de 0) do ponto, ou None se o fonte ou o rótulo não existem."""
+    posicao = indice['por_nome'].get(arquivo)
+    if posicao is None:
+        posicao = indice['por_nome'].get(str(arquivo).lower())
+    encontrado = LOCALIZADOR.match(str(localizador).strip())
+    if posicao is None or not encontrado:
+        return None
+    rotulo, deslocamento = encontrado.group('rotulo'), encontrado.group('deslocamento')
+    if rotulo.isdigit() and deslocamento is None:
+        linha = int(rotulo) - 1           # Número da linha
+    elif not rotulo:
+        linha = int(deslocamento or 1) - 1  # +N: N-ésima linha do fonte
+    else:
+        linha = _rotulos(indice, posicao).get(rotulo)
+        if linha is None:
+            return None
+        linha += int(deslocamento or 0)
+    if not 0 <= linha < len(indice['inicios'][posicao]) - 1:
+        return None
+    return posicao, linha
+
+
+def _mapa(indice, posicao):
+    mapa = indice['mapas'].get(posicao)
+    if mapa is None:
+        with open(os.path.join(indice['raiz'], indice['fontes'][posicao]), 'rb') as arquivo:
+            mapa = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        mapa = indice['mapas'].setdefault(posicao, mapa)
+    return mapa
+
+
+def janela(indice, arquivo, localizador, antes=3, depois=3):
+    """Linhas ao redor do ponto: (número da primeira linha, [linhas], posição do ponto na lista) ou None."""
+    ponto = localizar(indice, arquivo, localizador)
+    if ponto is None:
+        return None
+    posicao, linha = ponto
+    inicios = indice['inicios'][posicao]
+    primeira, ultima = max(0, linha - antes), min(len(inicios) - 2, linha + depois)
+    texto = _mapa(indice, posicao)[inicios[primeira]:inicios[ultima + 1]].decode('utf-8', errors='ignore')
+    linhas = [l.rstrip('\r') for l in texto.split('\n')][:ultima - primeira + 1]
+    return primeira + 1, linhas, linha - primeira
+
+
+def linhas_vizinhas(indice, arquivo, localizador, quantidade=3):
+    """(linhas anteriores, linhas seguintes) ao ponto, para o contexto da classificação, ou None."""
+    encontrado = janela(indice, arquivo, localizador, quantidade, quantidade)
+    if encontrado is None:
+        return None
+    _, linhas, alvo = encontrado
+    return linhas[:alvo], linhas[alvo + 1:]
@@ -0,0 +1,335 @@
+# 🔤 Alteração incremental dos termos de busca
+# Uma análise completa guarda o corpus já lido: as linhas distintas da entrada separadas em arquivo,
+# localizador e código (na ordem da primeira ocorrência, com o número de ocorrências), um índice
+# invertido token -> linhas dos códigos e as tabelas de resultado. Quando a lista de termos muda,
+# as linhas com os termos incluídos ou removidos são localizadas pelo índice e, com as demais linhas
+# do mesmo (arquivo, localizador), reagrupadas e reclassificadas; as tabelas anteriores são corrigidas
+# só nesses pontos. O resultado é o de uma análise completa com os novos termos: os pontos ficam na
+# ordem da primeira ocorrência com termos e as linhas ignoradas são refeitas pelas ocorrências.
+
+import os
+import re
+import json
+import shutil
+import zlib
+from array import array
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from analise_cnpj import REGRAS_PADRAO, compilar_termos, classificar_agrupamento, coletar
+from formatos_entrada import FORMATOS, PULAR
+
+PASTA_CORPUS = 'analise_corpus'
+# Muda quando o conteúdo do corpus ou a classificação mudam: corpus de outra versão não é reaproveitado
+VERSAO_CORPUS = 1
+# Tokens do índice: palavras do código em minúsculas (a busca dos termos ignora maiúsculas)
+TOKEN = re.compile(r'\w+')
+
+ARQUIVO_LINHAS = 'linhas.parquet'
+ARQUIVO_TOKENS = 'tokens.npz'
+ARQUIVO_COM_TERMOS = 'com_termos.npy'
+ARQUIVO_MANIFESTO = 'manifesto.json'
+TABELAS_CORPUS = {'ajustes': 'ajustes.parquet', 'descartes': 'descartes.parquet'}
+# Colunas extras das tabelas guardadas: linha única do ponto e posição da sua primeira ocorrência com termos
+COLUNA_CHAVE = 'Chave'
+COLUNA_ORDEM = 'Ordem'
+
+
+def identificar_corpus(caminho, formato, **extras):
+    """Identidade do corpus: só o corpus da mesma entrada, formato e regras é reaproveitado."""
+    estado = os.stat(caminho)
+    identidade = {
+        'versao': VERSAO_CORPUS,
+        'entrada': (os.path.abspath(caminho), estado.st_size, estado.st_mtime_ns),
+        'formato': formato,
+        'regras': zlib.crc32(repr(REGRAS_PADRAO).encode('utf-8')),
+        **extras,
+    }
+    # Mesma forma do manifesto lido do JSON (tuplas viram listas)
+    return json.loads(json.dumps(identidade))
+
+
+def construir_corpus(registros, formato):
+    """Linhas distintas da entrada, na ordem da primeira ocorrência.
+
+    DataFrame (linha, arquivo, localizador, codigo, ocorrencias, chave), com `chave` numerando os
+    (arquivo, localizador) e -1 (sem arquivo) nas linhas de formato inválido.
+    """
+    extrair = FORMATOS[formato]
+    posicoes = {}
+    linhas, partes, ocorrencias = [], [], array('q')
+    for linha_bruta in registros:
+        linha = linha_bruta.strip()
+        if not linha:
+            continue
+        posicao = posicoes.get(linha)
+        if posicao is not None:
+            ocorrencias[posicao] += 1
+            continue
+        extraido = extrair(linha)
+        if extraido is PULAR:
+            continue
+        posicoes[linha] = len(linhas)
+        linhas.append(linha)
+        ocorrencias.append(1)
+        partes.append(extraido if extraido is not None and extraido[0] else (None, None, ''))
+    del posicoes
+
+    arquivos, localizadores, codigos = (list(coluna) for coluna in zip(*partes)) if partes else ([], [], [])
+    corpus = pd.DataFrame({
+        'linha': linhas, 'arquivo': arquivos, 'localizador': localizadores, 'codigo': codigos,
+        'ocorrencias': np.frombuffer(ocorrencias, dtype=np.int64),
+    })
+    chaves = np.full(len(corpus), -1, dtype=np.int64)
+    validas = corpus['arquivo'].notna().to_numpy()
+    if validas.any():
+        chaves[validas] = corpus[validas].groupby(['arquivo', 'localizador'], sort=False, dropna=False).ngroup()
+    corpus['chave'] = chaves
+    return corpus
+
+
+def construir_indice_tokens(codigos):
+    """Índice invertido token -> linhas: {'vocabulario', 'inicios', 'linhas'} (linhas de cada token contíguas)."""
+    vocabulario, tokens, fins = {}, array('q'), array('q')
+    for codigo in codigos:
+        for token in set(TOKEN.findall(codigo.lower())):
+            tokens.append(vocabulario.setdefault(token, len(vocabulario)))
+        fins.append(len(tokens))
+    tokens = np.frombuffer(tokens, dtype=np.int64)
+    linhas = np.repeat(np.arange(len(fins), dtype=np.int32), np.diff(np.frombuffer(fins, dtype=np.int64), prepend=0))
+    return {
+        'vocabulario': list(vocabulario),
+        'inicios': np.concatenate(([0], np.cumsum(np.bincount(tokens, minlength=len(vocabulario))))).astype(np.int64),
+        'linhas': linhas[np.argsort(tokens, kind='stable')],
+    }
+
+
+def _salvar_indice_tokens(indice, caminho):
+    # Tokens não têm quebra de linha: o vocabulário vai como um único texto
+    vocabulario = np.frombuffer('\n'.join(indice['vocabulario']).encode('utf-8'), dtype=np.uint8)
+    with open(caminho, 'wb') as arquivo:
+        np.savez(arquivo, vocabulario=vocabulario, inicios=indice['inicios'], linhas=indice['linhas'])
+
+
+def carregar_indice_tokens(caminho):
+    with np.load(caminho) as dados:
+        texto = dados['vocabulario'].tobytes().decode('utf-8')
+        return {
+            'vocabulario': texto.split('\n') if len(dados['inicios']) > 1 else [],
+            'inicios': dados['inicios'],
+            'linhas': dados['linhas'],
+        }
+
+
+def linhas_com_termo(indice, termo):
+    """Linhas candidatas a conter `termo` (superconjunto, a confirmar pela regex), ou None se o índice
+    não ajuda (termo sem letras ou dígitos).
+
+    Toda ocorrência do termo contém seu maior trecho de palavra dentro de um token da linha.
+    """
+    pedacos = TOKEN.findall(termo.lower())
+    if not pedacos:
+        return None
+    pedaco = max(pedacos, key=len)
+    inicios, linhas = indice['inicios'], indice['linhas']
+    blocos = [linhas[inicios[i]:inicios[i + 1]] for i, token in enumerate(indice['vocabulario']) if pedaco in token]
+    return np.unique(np.concatenate(blocos)) if blocos else np.empty(0, dtype=np.int32)
+
+
+def _pontos_com_chave(tabela, corpus):
+    """Tabela de resultados com a chave do corpus de cada ponto (None se vazia)."""
+    if tabela is None:
+        return None
+    chaves = corpus.loc[corpus['chave'] >= 0, ['arquivo', 'localizador', 'chave']].drop_duplicates('chave')
+    chaves.columns = ['Arquivo', 'Localizador', COLUNA_CHAVE]
+    return tabela.merge(chaves, on=['Arquivo', 'Localizador'], how='left')
+
+
+def _gravar(pasta, arquivos, manifesto):
+    """Grava o corpus em uma pasta nova e a troca de uma vez pela anterior.
+
+    `arquivos` é {nome: função que grava no caminho}; os arquivos sem função são reaproveitados da
+    pasta anterior (link físico, ou cópia).
+    """
+    temporario = f"{pasta}.{os.getpid()}.tmp"
+    shutil.rmtree(temporario, ignore_errors=True)
+    os.makedirs(temporario)
+    for nome, gravar in arquivos.items():
+        destino = os.path.join(temporario, nome)
+        if gravar is not None:
+            gravar(destino)
+        elif os.path.exists(os.path.join(pasta, nome)):
+            try:
+                os.link(os.path.join(pasta, nome), destino)
+            except OSError:
+                shutil.copyfile(os.path.join(pasta, nome), destino)
+    with open(os.path.join(temporario, ARQUIVO_MANIFESTO), 'w', encoding='utf-8') as arquivo:
+        json.dump(manifesto, arquivo, ensure_ascii=False)
+
+    antigo = f"{pasta}.{os.getpid()}.antigo"
+    if os.path.exists(pasta):
+        os.replace(pasta, antigo)
+    os.replace(temporario, pasta)
+    shutil.rmtree(antigo, ignore_errors=True)
+
+
+def _gravar_tabela(tabela):
+    # Tabela vazia: nenhum arquivo (e nada reaproveitado da pasta anterior)
+    return (lambda caminho: None) if tabela is None else lambda caminho: tabela.to_parquet(caminho, index=False)
+
+
+def salvar_corpus(pasta, identidade, termos, corpus, resultado):
+    """Grava o corpus e os resultados de uma análise completa de `termos` sobre ele.
+
+    As linhas com termos e a ordem dos pontos são deduzidas das tabelas: uma linha tem termos se
+    é o código do seu ponto (ou, com outro código no mesmo ponto, se a regex de algum termo a encontra).
+    Retorna False, sem gravar, se as tabelas não correspondem ao corpus.
+    """
+    tabelas = {nome: _pontos_com_chave(resultado[nome], corpus) for nome in TABELAS_CORPUS}
+    partes = [t for t in tabelas.values() if t is not None]
+    pontos = pd.concat(partes) if partes else pd.DataFrame({'Código': [], COLUNA_CHAVE: []})
+    if pontos[COLUNA_CHAVE].isna().any():
+        return False
+    codigo_ponto = pd.Series(pontos['Código'].to_numpy(), index=pontos[COLUNA_CHAVE].astype(np.int64).to_numpy())
+
+    esperado = corpus['chave'].map(codigo_ponto)
+    com_termos = np.array(esperado.eq(corpus['codigo']).fillna(False), dtype=bool)
+    compilados = compilar_termos(termos)
+    for i in np.flatnonzero(esperado.notna().to_numpy() & ~com_termos):
+        com_termos[i] = any(regex.search(corpus['codigo'].iat[i]) for _, _, regex in compilados)
+
+    primeira = pd.Series(np.flatnonzero(com_termos)).groupby(corpus['chave'].to_numpy()[com_termos]).min()
+    for nome, tabela in tabelas.items():
+        if tabela is not None:
+            tabela[COLUNA_CHAVE] = tabela[COLUNA_CHAVE].astype(np.int64)
+            tabela[COLUNA_ORDEM] = tabela[COLUNA_CHAVE].map(primeira)
+            # Os pontos saem da análise na ordem da primeira ocorrência com termos
+            if tabela[COLUNA_ORDEM].isna().any() or not tabela[COLUNA_ORDEM].is_monotonic_increasing:
+                return False
+
+    indice = construir_indice_tokens(corpus['codigo'])
+    arquivos = {
+        ARQUIVO_LINHAS: lambda caminho: pq.write_table(pa.Table.from_pandas(corpus, preserve_index=False), caminho),
+        ARQUIVO_TOKENS: lambda caminho: _salvar_indice_tokens(indice, caminho),
+        ARQUIVO_COM_TERMOS: lambda caminho: np.save(caminho, com_termos),
+        **{TABELAS_CORPUS[nome]: _gravar_tabela(tabela) for nome, tabela in tabelas.items()},
+    }
+    manifesto = {'identidade': identidade, 'termos': termos, 'linhas': len(corpus),
+                 'ocorrencias': int(corpus['ocorrencias'].sum())}
+    _gravar(pasta, arquivos, manifesto)
+    return True
+
+
+def carregar_manifesto(pasta):
+    """Manifesto do corpus ({'identidade', 'termos', ...}), ou None se não existe."""
+    caminho = os.path.join(pasta, ARQUIVO_MANIFESTO)
+    if not os.path.exists(caminho):
+        return None
+    with open(caminho, encoding='utf-8') as arquivo:
+        return json.load(arquivo)
+
+
+def _termos_alterados(anteriores, termos):
+    """[(termo, tipo)] incluídos, removidos ou com tipo trocado (o termo entra com os dois tipos)."""
+    return [
+        (termo, tipo)
+        for origem, outra in ((anteriores, termos), (termos, anteriores))
+        for termo, tipo in origem.items() if outra.get(termo) != tipo
+    ]
+
+
+def _linhas_ignoradas(linhas, chaves, com_termos):
+    """Mensagens das linhas ignoradas, uma por ocorrência na entrada (como analise_cnpj.coletar)."""
+    ocorrencias, textos = linhas.column('ocorrencias').to_numpy(), linhas.column('linha')
+    ignoradas = []
+    for motivo, mascara in (("Formato Inválido", chaves < 0), ("Nenhum Termo Encontrado", (chaves >= 0) & ~com_termos)):
+        posicoes = np.flatnonzero(mascara)
+        for linha, quantidade in zip(textos.take(posicoes).to_pylist(), ocorrencias[posicoes]):
+            ignoradas.extend([f"{motivo}: {linha}"] * int(quantidade))
+    return ignoradas
+
+
+def reanalisar_termos(pasta, identidade, termos, regras=None, contexto=None, log=print):
+    """Resultado da análise com `termos` a partir do corpus salvo, reclassificando só os pontos afetados.
+
+    Retorna {'ajustes', 'descartes', 'linhas_ignoradas'} como analise_cnpj.coletar, mais
+    'termos_alterados' (lista dos (termo, tipo) incluídos ou removidos; vazia se nada mudou), e
+    atualiza o corpus para os novos termos, ou None se não há corpus desta entrada (`identidade`).
+    """
+    manifesto = carregar_manifesto(pasta)
+    if manifesto is None or manifesto['identidade'] != identidade:
+        return None
+
+    linhas = pq.read_table(os.path.join(pasta, ARQUIVO_LINHAS))
+    chaves = linhas.column('chave').to_numpy()
+    com_termos = np.load(os.path.join(pasta, ARQUIVO_COM_TERMOS))
+    tabelas = {
+        nome: pd.read_parquet(os.path.join(pasta, arquivo)) if os.path.exists(os.path.join(pasta, arquivo)) else None
+        for nome, arquivo in TABELAS_CORPUS.items()
+    }
+
+    alterados = _termos_alterados(manifesto['termos'], termos)
+    if not alterados:
+        log(f"Termos inalterados desde a última análise completa: resultados reaproveitados de '{pasta}'.")
+    else:
+        log(f"{len(alterados)} termo(s) incluído(s)/removido(s) desde a última análise: "
+            f"{', '.join(sorted({termo for termo, _ in alterados}))}. Localizando pelo índice de '{pasta}'...")
+        indice = carregar_indice_tokens(os.path.join(pasta, ARQUIVO_TOKENS))
+        codigos = linhas.column('codigo')
+        afetadas = [np.empty(0, dtype=np.int64)]
+        for termo, tipo in alterados:
+            for _, _, regex in compilar_termos({termo: tipo}):
+                candidatas = linhas_com_termo(indice, termo)
+                if candidatas is None:
+                    candidatas = np.arange(len(chaves))
+                encontradas = np.array([bool(regex.search(c)) for c in codigos.take(candidatas).to_pylist()], dtype=bool)
+                afetadas.append(candidatas[encontradas] if len(candidatas) else candidatas)
+        afetadas = np.unique(np.concatenate(afetadas))
+        chaves_afetadas = np.unique(chaves[afetadas])
+        chaves_afetadas = chaves_afetadas[chaves_afetadas >= 0]
+
+        # Etapa 1 refeita para todas as linhas dos pontos afetados, na ordem do corpus
+        grupo = np.flatnonzero(np.isin(chaves, chaves_afetadas))
+        colunas = linhas.select(['arquivo', 'localizador', 'codigo']).take(grupo).to_pydict()
+        compilados = compilar_termos(termos)
+        linhas_unicas, posicoes = {}, {}
+        for i, arquivo, localizador, codigo in zip(grupo, colunas['arquivo'], colunas['localizador'], colunas['codigo']):
+            termos_encontrados = {termo: tipo for termo, tipo, regex in compilados if regex.search(codigo)}
+            com_termos[i] = bool(termos_encontrados)
+            if not termos_encontrados:
+                continue
+            chave = (arquivo, localizador)
+            if chave not in linhas_unicas:
+                linhas_unicas[chave] = (codigo, {})
+                posicoes[chave] = (chaves[i], i)
+            linhas_unicas[chave][1].update(termos_encontrados)
+
+        novos = coletar(classificar_agrupamento(linhas_unicas, regras, contexto))
+        for nome in TABELAS_CORPUS:
+            nova, anterior = novos[nome], tabelas[nome]
+            if nova is not None:
+                chave_ordem = [posicoes[chave] for chave in zip(nova['Arquivo'], nova['Localizador'])]
+                nova[COLUNA_CHAVE] = np.array([c for c, _ in chave_ordem], dtype=np.int64)
+                nova[COLUNA_ORDEM] = np.array([o for _, o in chave_ordem], dtype=np.int64)
+            if anterior is not None:
+                anterior = anterior[~anterior[COLUNA_CHAVE].isin(chaves_afetadas)]
+            partes = [t for t in (anterior, nova) if t is not None and len(t)]
+            tabelas[nome] = (pd.concat(partes).sort_values(COLUNA_ORDEM, kind='stable').reset_index(drop=True)
+                             if partes else None)
+        log(f"  - {len(afetadas)} linhas com esses termos: {len(chaves_afetadas)} linhas de código únicas "
+            f"reagrupadas e {len(linhas_unicas)} pontos reclassificados.")
+
+        arquivos = {
+            ARQUIVO_LINHAS: None, ARQUIVO_TOKENS: None,
+            ARQUIVO_COM_TERMOS: lambda caminho: np.save(caminho, com_termos),
+            **{TABELAS_CORPUS[nome]: _gravar_tabela(tabela) for nome, tabela in tabelas.items()},
+        }
+        _gravar(pasta, arquivos, {**manifesto, 'termos': termos})
+
+    return {
+        **{nome: None if tabela is None else tabela.drop(columns=[COLUNA_CHAVE, COLUNA_ORDEM])
+           for nome, tabela in tabelas.items()},
+        'linhas_ignoradas': _linhas_ignoradas(linhas, chaves, com_termos),
+        'termos_alterados': alterados,
+    }
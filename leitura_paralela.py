@@ -0,0 +1,87 @@
+# 🧵 Etapa 1 da análise em paralelo
+# A entrada de texto é mapeada em memória (mmap) e dividida em faixas de bytes que terminam em
+# quebras de linha. Cada processo mapeia o mesmo arquivo e agrupa só a sua faixa (analise_cnpj.agrupar),
+# sem que o conteúdo passe pelos processos; os agrupamentos parciais são mesclados por chave, na
+# ordem do arquivo, e o resultado é igual ao da leitura sequencial.
+
+import os
+import mmap
+from concurrent.futures import ProcessPoolExecutor
+from analise_cnpj import agrupar, mesclar_agrupamentos, classificar_agrupamento
+
+PROCESSOS = int(os.environ.get("CNPJ_PROCESSOS", str(os.cpu_count() or 1)))
+# Abaixo disso, subir os processos custa mais do que ler a entrada em sequência
+TAMANHO_MINIMO = int(os.environ.get("CNPJ_PARALELO_MB", "64")) * 1024 * 1024
+# Faixas por processo: faixas menores equilibram a carga quando os trechos têm densidades diferentes
+FAIXAS_POR_PROCESSO = 4
+# Cada faixa é decodificada em blocos deste tamanho (também terminados em quebra de linha)
+TAMANHO_BLOCO = 4 * 1024 * 1024
+
+
+def usar_paralelo(caminho, processos=PROCESSOS):
+    """Se a entrada (texto, não .zip) é grande o bastante para dividir entre processos."""
+    return processos > 1 and os.path.getsize(caminho) >= max(TAMANHO_MINIMO, 1)
+
+
+def faixas_alinhadas(mapa, partes, inicio=0, fim=None):
+    """Divide o mapeamento, de `inicio` a `fim` (padrão: o fim do arquivo), em até `partes` faixas
+    [início, fim) que terminam logo após um '\\n'."""
+    tamanho = len(mapa) if fim is None else fim
+    faixas, primeiro = [], inicio
+    for parte in range(1, partes):
+        alvo = max(inicio, primeiro + (tamanho - primeiro) * parte // partes)
+        quebra = mapa.find(b'\n', alvo, tamanho)
+        if quebra < 0:
+            break
+        if quebra + 1 > inicio:
+            faixas.append((inicio, quebra + 1))
+            inicio = quebra + 1
+    if inicio < tamanho:
+        faixas.append((inicio, tamanho))
+    return faixas
+
+
+def linhas_da_faixa(mapa, inicio, fim):
+    """Linhas de uma faixa, decodificadas como no open() em modo texto (UTF-8, quebras universais)."""
+    while inicio < fim:
+        limite = min(inicio + TAMANHO_BLOCO, fim)
+        if limite < fim:
+            quebra = mapa.rfind(b'\n', inicio, limite)
+            limite = quebra + 1 if quebra >= 0 else (mapa.find(b'\n', limite, fim) + 1 or fim)
+        texto = mapa[inicio:limite].decode('utf-8', errors='ignore')
+        if '\r' in texto:
+            texto = texto.replace('\r\n', '\n').replace('\r', '\n')
+        yield from texto.split('\n')
+        inicio = limite
+
+
+def agrupar_faixa(caminho, inicio, fim, termos, formato):
+    """Etapa 1 de uma faixa da entrada (executada nos processos trabalhadores)."""
+    with open(caminho, 'rb') as arquivo, mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+        return agrupar(linhas_da_faixa(mapa, inicio, fim), termos, formato)
+
+
+def agrupar_faixas(caminho, faixas, termos, formato, processos=PROCESSOS):
+    """Agrupamentos parciais das faixas, na ordem do arquivo, com até `processos` processos."""
+    if processos <= 1 or len(faixas) <= 1:
+        for inicio, fim in faixas:
+            yield agrupar_faixa(caminho, inicio, fim, termos, formato)
+        return
+    with ProcessPoolExecutor(max_workers=min(processos, len(faixas))) as executor:
+        yield from executor.map(
+            agrupar_faixa, *zip(*[(caminho, inicio, fim, termos, formato) for inicio, fim in faixas])
+        )
+
+
+def analisar_arquivo(caminho, termos, formato, regras=None, processos=PROCESSOS, contexto=None):
+    """Como analise_cnpj.analisar sobre as linhas de `caminho`, com a Etapa 1 dividida entre processos.
+
+    Gera os mesmos vereditos, na mesma ordem: primeiro as linhas ignoradas, depois as linhas únicas.
+    """
+    with open(caminho, 'rb') as arquivo, mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+        faixas = faixas_alinhadas(mapa, processos * FAIXAS_POR_PROCESSO)
+
+    linhas_unicas, ignoradas = mesclar_agrupamentos(agrupar_faixas(caminho, faixas, termos, formato, processos))
+
+    yield from ignoradas
+    yield from classificar_agrupamento(linhas_unicas, regras, contexto)
@@ -1,7 +1,19 @@
-import re
+import io
 import csv
 import os
-import pandas as pd
+import zipfile
+import tarfile
+import mmap
+import argparse
+from analise_cnpj import analisar, agrupar, coletar, classificar_arquivo, mesclar_agrupamentos
+from formatos_entrada import detectar_formato, separar_amostra
+from leitura_paralela import PROCESSOS, FAIXAS_POR_PROCESSO, usar_paralelo, analisar_arquivo, faixas_alinhadas, agrupar_faixas
+from compressao import abrir_binario, detectar_compressao, eh_tar
+from retomada import ARQUIVO_CHECKPOINT, identificar_entrada, trechos_texto, trechos_linhas, analisar_com_retomada
+from amostragem import AMOSTRA_PADRAO, SEMENTE_PADRAO, ARQUIVO_ESTIMATIVA, amostrar, montar_estimativa, salvar_estimativa
+# Os módulos de relatório, histórico, corpus, parciais e precificação (pandas/pyarrow) são importados
+# nas funções que os usam: a leitura e a classificação (ex.: fatias de --parcial, serviço HTTP) não
+# pagam a importação do pandas antes de ler a primeira linha
 
 # --- CONFIGURAÇÃO ---
 
@@ -16,316 +28,160 @@ ARQUIVO_SAIDA_PRECIFICACAO = 'analise_precificacao_proposta.xlsx'
 ARQUIVO_SAIDA_DESCARTES_EXTRACAO = 'analise_descartes_extracao_simples.xlsx'
 ARQUIVO_SAIDA_RESUMO = 'analise_resumo_criticos_oficiais.xlsx'
 
+# Índices de busca textual sobre a coluna Código (mesma ordem das linhas dos relatórios)
+ARQUIVO_INDICE_AJUSTES = 'analise_ajustes_criticos_busca.npz'
+ARQUIVO_INDICE_DESCARTES = 'analise_descartes_busca.npz'
+
+# Tabelas de detalhe particionadas por Classificação/Prefixo (lidas por partição no Explorador)
+PASTA_PARTICOES_AJUSTES = 'analise_ajustes_criticos_particoes'
+PASTA_PARTICOES_DESCARTES = 'analise_descartes_particoes'
+
 # 3. Arquivo com os termos de busca a serem analisados
 ARQUIVO_TERMOS = 'CNPJ 1.csv'
 
-# --- ATIVIDADES BASE DO PROJETO ---
-# Esforços fixos para atividades que independem da contagem de pontos de código,
-# refletindo o escopo completo do projeto de adequação ao CNPJ alfanumérico.
-ATIVIDADES_BASE_PROJETO = {
-    "GERENCIAMENTO_PROJETO": {
-        "nome": "Gerenciamento e Planejamento",
-        "esforco_dev": 120, "esforco_testes": 0,
-        "descricao": "Coordenação, planejamento e acompanhamento das entregas do projeto."
-    },
-    "ANALISE_ARQUITETURA": {
-        "nome": "Análise e Arquitetura da Solução (Especificação funcional)",
-        "esforco_dev": 160, "esforco_testes": 0,
-        "descricao": "Definição da arquitetura da solução, especificação funcional e detalhamento das regras de negócio para o CNPJ alfanumérico."
-    },
-    "ANALISE_PONTOS_CRITICOS": {
-        "nome": "Análise preliminar para identificação de pontos a serem ajustados",
-        "esforco_dev": 210, "esforco_testes": 0,
-        "descricao": "Análise em bloco de todos os pontos de código impactados para categorização e definição das estratégias de refatoração."
-    },
-    "SOLUCAO_CENTRAL": {
-        "nome": "Desenvolvimento da Solução Central para tratamento de código",
-        "esforco_dev": 80, "esforco_testes": 40,
-        "descricao": "Criação e testes unitários das funções centrais de validação, formatação e cálculo de DV."
-    },
-    "REFATORACAO_ROTINAS": {
-        "nome": "Refatoração e ajustes de rotinas identificadas",
-        "esforco_dev": 560, "esforco_testes": 240,
-        "descricao": "Refatoração de todas as rotinas e pontos de código impactados, aplicando a solução central."
-    },
-    "AJUSTE_SUBROTINA_IBSRIC": {
-        "nome": "Ajustes de subrotinas de validação (IBSRIC)",
-        "esforco_dev": 40, "esforco_testes": 20,
-        "descricao": "Refatoração específica do conjunto de sub-rotinas de validação (IBSRIC) para utilizar a nova solução central."
-    },
-    "AJUSTE_CODIGO_BARRAS": {
-        "nome": "Ajustes de código de barras do DANFE",
-        "esforco_dev": 60, "esforco_testes": 20,
-        "descricao": "Implementação da migração do padrão de código de barras de CODE-128C para CODE-128A."
-    },
-    "AJUSTE_CHAVE_NFE": {
-        "nome": "Ajustes de chave de acesso NFe",
-        "esforco_dev": 100, "esforco_testes": 40,
-        "descricao": "Ajuste na lógica de geração e validação da chave de acesso de Documentos Fiscais Eletrônicos."
-    },
-    "TESTES_IMPLANTACAO": {
-        "nome": "Testes Finais e Implantação (Homologação e Go-Live)",
-        "esforco_dev": 80, "esforco_testes": 100,
-        "descricao": "Ciclo completo de testes integrados, suporte à homologação (UAT), apoio ao go-live e atividades de implantação em produção."
-    }
-}
+# 4. (Opcional) Pasta com o código-fonte exportado: dá o contexto de cada ponto (indice_contexto)
+PASTA_FONTES = os.environ.get("CNPJ_FONTES", "fontes")
+ARQUIVO_INDICE_CONTEXTO = 'analise_contexto_fontes.npz'
+# Linhas vizinhas consultadas para montar o comando completo de um ponto
+LINHAS_CONTEXTO = 3
 
-# --- CATEGORIAS PARA AJUSTE DE CÓDIGO ---
-# Custo marginal por ponto de código, representando o esforço mecânico de substituição.
-# Esta seção é mantida para a classificação dos pontos no relatório de detalhamento, mas não é mais usada para o cálculo do esforço.
-CATEGORIAS_AJUSTE_CODIGO = {
-    "REFATORACAO_PONTUAL": {
-        "nome": "Refatoração e ajustes de rotinas identificadas",
-        "descricao": "Substituição do código legado por chamadas à nova solução central.",
-        "esforco_dev_por_ponto": 0.0,  # Não utilizado para cálculo
-        "esforco_testes_por_ponto": 0.0, # Não utilizado para cálculo
-        "observacao": "Custo agora definido como um bloco fixo em ATIVIDADES_BASE_PROJETO."
-    }
+# As premissas da precificação (frentes de trabalho, taxas por ponto e buffer) ficam em precificacao.py
+# As regras de descarte e de ajuste crítico ficam na biblioteca analise_cnpj (REGRAS_PADRAO)
+
+# Valores tratados como vazios no CSV de termos (os mesmos do pandas.read_csv)
+VALORES_VAZIOS = {
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN', '<NA>', 'N/A',
+    'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
 }
 
-# --- REGRAS DE DESCARTE DE ALTA CONFIANÇA ---
-# Se uma linha corresponder a qualquer uma destas regras, será descartada.
-REGRAS_DESCARTE_CONFIANCA = [
-    # Regra unificada para comentários que será verificada com uma exceção
-    ("Comentário", r"^\s*(;+|//)"),
-    # Novas regras para descartar definições de classes (.cls) que não são código executável
-    ("Definição de Classe (Property, Parameter, etc.)", r"^\s*(Property|Parameter|Index|Method|Class|Relationship|Query|Trigger|ForeignKey)\s+"),
-    ("Definição de Mapeamento XML/Storage", r"^\s*<(Sql|Data|Storage|Index|Stream|Map|Routine)"),
-    ("Definição de Bloco XData", r"^\s*(XData|Import|Include)\s+"),
-    # Movida para cima para ter prioridade sobre regras mais genéricas
-    ("Extração Simples de Substring", r"(\$E|\$EXTRACT)\s*\(\s*\bVARIAVEL\b"),
-    ("String Literal", r'".*\bVARIAVEL\b.*"'),
-    # Novas regras para descartar usos simples em SQL que não representam risco
-    ("Uso como Alias em SQL", r"\bAS\s+'?\bVARIAVEL\b'?,?"),
-    ("Comparação Simples em SQL", r"(WHERE|ON)\s+.*\s*\bVARIAVEL\b\s*(=|LIKE)\s*.*|SET\s+.*\s*\bVARIAVEL\b\s*="),
-    # Regra aprimorada para ser mais específica e evitar descartar atribuições que usam a variável
-    ("Atribuição Simples (de variável)", r"^\s*(S|Set)\s+\w+\s*=\s*\bVARIAVEL\b\s*($|;|,|!)"),
-    # Regra aprimorada para permitir atribuições complexas (com funções, métodos, etc.)
-    ("Atribuição Simples (para variável)", r"^\s*(S|Set)\s+\bVARIAVEL\b\s*=\s*.*($|;|,|!)"),
-    # Regra expandida para cobrir atribuições em lista, como S ALT=0,CCLI=""
-    ('Set para Vazio', r'^\s*(S|Set)\s+.*\bVARIAVEL\b\s*=\s*""|,\s*\bVARIAVEL\b\s*=\s*""'),
-    # Nova regra, focada apenas na comparação
-    ("Comparação com Vazio", r"if\s+'?\bVARIAVEL\b'?\s*=\s*\"\""),
-    # Nova regra para comparação com strings fixas
-    ('Comparação com String Fixa', r'^\s*(I|If)\s+\'?\bVARIAVEL\b\'?\s*=\s*".*"'),
-    ("Uso como Parâmetro Simples", r"(\(|,)\s*\bVARIAVEL\b\s*(\)|,)"),
-    ("Parâmetro em Chamada de Método/Função", r"(##class\(|##super\(|\$\$\w+\^)\([^)]*\bVARIAVEL\b[^)]*\)"),
-    ("Chamada de Rotina (Do)", r"^\s*Do\s+.*\^.*\bVARIAVEL\b"),
-    ("Uso em $ORDER", r"\$O\s*\(.*\bVARIAVEL\b"),
-    # Nova regra para o comando Kill
-    ("Comando Kill", r"^\s*(K|Kill)\s+.*?\bVARIAVEL\b"),
-    # Regra aprimorada para incluir a abreviação 'N' e ser mais precisa
-    ("Declaração New", r"^\s*(N|New)\s+.*?\bVARIAVEL\b"),
-    ("Verificação de Existência ($D, $G)", r"(if\s+\$G|\$D)\(.*\bVARIAVEL\b"),
-]
-
-# --- REGRAS PARA IDENTIFICAR AJUSTES CRÍTICOS ---
-# Todas as linhas não descartadas serão testadas contra estas regras.
-REGRAS_AJUSTE_CRITICO = [
-    # --- VALIDAÇÃO E ENTRADA ---
-    (
-        "Máscara Numérica Explícita", r"\?\d*N", "REFATORACAO_PONTUAL",
-        "Máscara que força entrada numérica - precisa aceitar alfanumérico."
-    ),
-    (
-        "Validação de Comprimento", r"\$L(ENGTH)?\s*\(\s*\bVARIAVEL\b.*\)\s*[=<>]\s*(11|14)", "REFATORACAO_PONTUAL",
-        "Validação de tamanho fixo - precisa ser flexibilizada."
-    ),
-    (
-        "Conversão/Operação Numérica", r"(\$NUMBER|\$ZSTRIP)\s*\(\s*\bVARIAVEL\b|\bVARIAVEL\b\s*[\+\-\*\/]\s*\d+|\d+\s*[\+\-\*\/]\s*\bVARIAVEL\b", "REFATORACAO_PONTUAL",
-        "Conversão para número ou operação aritmética - falhará com alfanumérico."
-    ),
-    # --- LÓGICA DE NEGÓCIO ---
-    (
-        "Padding com Soma", r"(1000000\d{6,}\s*\+\s*\bVARIAVEL\b|\bVARIAVEL\b\s*\+\s*1000000\d{6,})", "REFATORACAO_PONTUAL",
-        "Técnica de padding com soma para ordenação/comparação - incompatível com alfanumérico."
-    ),
-    (
-        "Extração com Lógica Numérica ($E, $EXTRACT)", r"(\$E|\$EXTRACT)\s*\((?=[^)]*\+)[^)]*\bVARIAVEL\b[^)]*\)", "REFATORACAO_PONTUAL",
-        "Extração de substring combinada com soma, indicando manipulação numérica."
-    ),
-    (
-        "Parsing com $PIECE", r"\$P(IECE)?\s*\(\s*\bVARIAVEL\b", "REFATORACAO_PONTUAL",
-        "Parsing da variável - pode ser afetado se o delimitador for um número."
-    ),
-    # --- FORMATAÇÃO E EXIBIÇÃO ---
-    (
-        "Formatação Manual para Exibição", r'(\bVARIAVEL\b\s*_\s*""[\\.\\/\\-]"")|W(RITE)?\s+.*\bVARIAVEL\b', "REFATORACAO_PONTUAL",
-        "Formatação manual para exibição - deve ser substituída por função central."
-    ),
-    # --- INTEGRAÇÃO E REVISÃO MANUAL ---
-    (
-        "Uso em Contexto de Integração", r"(HTTP|REST|SOAP|XML|JSON|EXPORT|IMPORT|FTP|FILE).*\bVARIAVEL\b", "REFATORACAO_PONTUAL",
-        "Uso em contexto de integração. Requer análise manual da compatibilidade."
-    ),
-    # --- ESTRUTURA DE DADOS ---
-    (
-        "Uso em Operação de Banco", r"&(SQL|sql)\(.*\bVARIAVEL\b.*\)|(SELECT|INSERT|UPDATE|DELETE|WHERE|ORDER\s+BY).*\bVARIAVEL\b", "REFATORACAO_PONTUAL",
-        "Operação de banco - verificar tipos de dados, índices e performance da consulta."
-    ),
-]
-
-
-def carregar_termos_busca(caminho_csv):
+
+def carregar_termos_busca(caminho_csv, log=print):
     """Carrega os termos de busca e seus tipos de um arquivo CSV."""
     if not os.path.exists(caminho_csv):
-        print(f"ERRO: Arquivo de termos '{caminho_csv}' não encontrado.")
+        log(f"ERRO: Arquivo de termos '{caminho_csv}' não encontrado.")
         return {}
     try:
-        df = pd.read_csv(caminho_csv, sep=';', usecols=['termo', 'tipo'], encoding='utf-8', on_bad_lines='skip')
-        df.dropna(inplace=True)
-        df['termo'] = df['termo'].astype(str).str.strip()
-        df['tipo'] = df['tipo'].astype(str).str.strip()
-        termos_dict = dict(zip(df['termo'], df['tipo']))
-        print(f"{len(termos_dict)} termos de busca únicos carregados de {caminho_csv}")
+        # Leitura com o módulo csv (sem pandas): linhas com campos a mais ou sem termo/tipo são ignoradas
+        with open(caminho_csv, newline='', encoding='utf-8-sig') as arquivo:
+            leitor = csv.reader(arquivo, delimiter=';')
+            cabecalho = next(leitor, [])
+            if 'termo' not in cabecalho or 'tipo' not in cabecalho:
+                raise ValueError("o arquivo precisa das colunas 'termo' e 'tipo'")
+            col_termo, col_tipo = cabecalho.index('termo'), cabecalho.index('tipo')
+            termos_dict = {}
+            for campos in leitor:
+                if len(campos) > len(cabecalho) or max(col_termo, col_tipo) >= len(campos):
+                    continue
+                termo, tipo = campos[col_termo], campos[col_tipo]
+                if termo in VALORES_VAZIOS or tipo in VALORES_VAZIOS:
+                    continue
+                termos_dict[termo.strip()] = tipo.strip()
+        log(f"{len(termos_dict)} termos de busca únicos carregados de {caminho_csv}")
         return termos_dict
     except Exception as e:
-        print(f"ERRO ao ler o arquivo de termos '{caminho_csv}': {e}")
+        log(f"ERRO ao ler o arquivo de termos '{caminho_csv}': {e}")
         return {}
 
 
-def extrair_info_linha(linha):
-    """Extrai o nome do arquivo, localizador e o código da linha de entrada."""
-    # Regex aprimorada para lidar com formatos como:
-    # arquivo(loc1): codigo
-    # arquivo(loc1)[loc2]: codigo
-    match = re.match(r"^(.*?)\((.*?)\)(.*?):\s*(.*)", linha)
-    if match:
-        arquivo, loc_parens, loc_brackets, codigo = match.groups()
-        # Combina as partes do localizador para criar um identificador único
-        localizador = loc_parens.strip() + loc_brackets.strip()
-        return arquivo.strip(), localizador, codigo.strip()
-    return None, None, None
-
-
-def classificar_arquivo(nome_arquivo):
-    """Adiciona classificação 'Oficiais', 'Scripts' ou 'Não Oficiais'."""
-    prefixos_oficiais = [
-        'dd', 'gap', 'i', 'audit', 'autobasi', 'basico', 'br', 'cbpi', 'csp',
-        'estoque', 'faturamento', 'fiscal', 'frete', 'gem', 'ipi', 'ipp',
-        'mnemonic', 'precos', 'sistema', 'supervisao', 'tropical', 'tti'
-    ]
-    nome_arquivo_lower = nome_arquivo.lower()
-    if nome_arquivo_lower.startswith('aba'):
-        return 'Scripts'
-    if any(nome_arquivo_lower.startswith(p) for p in prefixos_oficiais):
-        return 'Oficiais'
-    return 'Não Oficiais'
-
-
-def checar_descarte(codigo, var_alvo):
-    """Verifica se a linha deve ser ignorada com base nas regras de descarte de alta confiança."""
-    for motivo, regex in REGRAS_DESCARTE_CONFIANCA:
-        regex_var = regex.replace('VARIAVEL', re.escape(var_alvo))
-        if re.search(regex_var, codigo, re.IGNORECASE):
-            return motivo
-    return None
-
-
-def analisar_ponto_critico(codigo, var_alvo):
-    """Aplica as regras de ajuste crítico e retorna a primeira correspondência."""
-    # Primeiro, verifica regras que não dependem da variável (globais)
-    for nome, regex, categoria, just in REGRAS_AJUSTE_CRITICO:
-        if 'VARIAVEL' not in regex:
-            if re.search(regex, codigo, re.IGNORECASE):
-                return nome, categoria, just, regex
-
-    # Depois, verifica regras vinculadas à variável
-    for nome, regex, categoria, just in REGRAS_AJUSTE_CRITICO:
-        if 'VARIAVEL' in regex:
-            regex_var = regex.replace('VARIAVEL', re.escape(var_alvo))
-            if re.search(regex_var, codigo, re.IGNORECASE):
-                return nome, categoria, just, regex_var
-
-    # Se nenhuma regra crítica corresponder, classifica para revisão manual
-    return "Revisão Manual Necessária", "REFATORACAO_PONTUAL", "Não corresponde a nenhum padrão de ajuste ou descarte conhecido.", "N/A"
-
-
-def gerar_relatorio_precificacao_realista(df_ajustes):
-    """Gera relatório de precificação realista baseado em blocos de trabalho com esforço fixo."""
-
-    # --- INÍCIO DA LÓGICA DE CÁLCULO ---
-    total_dev = 0
-    total_testes = 0
-    summary_atividades = []
-
-    # 1. Adicionar Atividades Base do Projeto
-    for _, config in ATIVIDADES_BASE_PROJETO.items():
-        esforco_dev = config["esforco_dev"]
-        esforco_testes = config["esforco_testes"]
-        total_dev += esforco_dev
-        total_testes += esforco_testes
-        summary_atividades.append({
-            "Frente de Trabalho": config["nome"],
-            "Tipo": "Frente de Trabalho",
-            "Pontos Identificados": "N/A",
-            "Esforço Dev (h)": esforco_dev,
-            "Esforço Testes (h)": esforco_testes,
-            "Total (h)": esforco_dev + esforco_testes,
-            "Observação": config["descricao"],
-        })
-
-    # Apenas para fins de relatório, contamos os pontos oficiais
+def calcular_precificacao(df_ajustes, cenarios=None):
+    """Calcula as tabelas da precificação realista.
+
+    Retorna {'sumario', 'estimativa', 'pontos_oficiais'} e as tabelas da simulação Monte Carlo do
+    esforço em `cenarios` cenários (padrão: simulacao_esforco.CENARIOS_PADRAO): {'simulacao',
+    'simulacao_frentes', 'histograma'}.
+    """
+    import pandas as pd
+    from esquemas import aplicar_esquema, ESQUEMA_PONTOS_OFICIAIS
+    from simulacao_esforco import CENARIOS_PADRAO
+    from precificacao import contar_pontos, estimar, simular
+    cenarios = CENARIOS_PADRAO if cenarios is None else cenarios
+
+    # Esforço pelas premissas padrão sobre as contagens da análise (precificacao.py)
+    contagens = contar_pontos(df_ajustes)
+    tabelas = {**estimar(contagens), **simular(contagens, cenarios=cenarios)}
+
+    # Apenas para fins de relatório, listamos os pontos oficiais
     df_oficiais = pd.DataFrame()
     if not df_ajustes.empty:
         df_oficiais = df_ajustes[df_ajustes['Classificação'] == 'Oficiais'].copy()
-    
-    # 3. Gerar Sumário Executivo
-    total_geral = total_dev + total_testes
-    summary_executivo = [
-        {"Métrica": "Esforço Desenvolvimento", "Valor": f"{total_dev}h"},
-        {"Métrica": "Esforço Testes QA", "Valor": f"{total_testes}h"},
-        {"Métrica": "Total Estimado", "Valor": f"{total_geral}h"},
-        {"Métrica": "Estimativa com Buffer (15%)", "Valor": f"{round(total_geral * 1.15)}h"},
-        {"Métrica": "Pontos Críticos (Oficiais)", "Valor": len(df_oficiais)},
-        {"Métrica": "Rotinas Oficiais Impactadas", "Valor": df_oficiais['Arquivo'].nunique() if not df_oficiais.empty else 0},
-    ]
-
-    # 4. Salvar o relatório em Excel com múltiplas abas
+    tabelas['pontos_oficiais'] = (
+        aplicar_esquema(df_oficiais, ESQUEMA_PONTOS_OFICIAIS).reset_index(drop=True) if not df_oficiais.empty else None
+    )
+    return tabelas
+
+
+def gerar_relatorio_precificacao_realista(df_ajustes, log=print):
+    """Gera relatório de precificação realista baseado em blocos de trabalho com esforço fixo.
+
+    Retorna (métricas do sumário executivo {Métrica: Valor}, abas do relatório como DataFrames).
+    """
+    import pandas as pd
+    from precificacao import BUFFER_PADRAO
+    tabelas = calcular_precificacao(df_ajustes)
+    metricas = dict(zip(tabelas['sumario']['Métrica'], tabelas['sumario']['Valor']))
+
+    # Salvar o relatório em Excel com múltiplas abas
     try:
-        df_summary = pd.DataFrame(summary_atividades)
         with pd.ExcelWriter(ARQUIVO_SAIDA_PRECIFICACAO, engine='openpyxl') as writer:
-            pd.DataFrame(summary_executivo).to_excel(writer, sheet_name='1_Summary_Executivo', index=False)
-            df_summary.to_excel(writer, sheet_name='2_Estimativa_Detalhada', index=False)
-            if not df_oficiais.empty:
-                df_oficiais_detalhe = df_oficiais[['Arquivo', 'Localizador', 'Categoria', 'Padrão', 'Justificativa', 'Código']]
-                df_oficiais_detalhe.to_excel(writer, sheet_name='3_Detalhe_Pontos_Oficiais', index=False)
-        print(f"Relatório de precificação salvo em: {ARQUIVO_SAIDA_PRECIFICACAO}")
-        print(f"   -> Total Estimado: {round(total_geral)}h | Com Buffer (15%): {round(total_geral * 1.15)}h")
+            tabelas['sumario'].to_excel(writer, sheet_name='1_Summary_Executivo', index=False)
+            tabelas['estimativa'].to_excel(writer, sheet_name='2_Estimativa_Detalhada', index=False)
+            if tabelas['pontos_oficiais'] is not None:
+                tabelas['pontos_oficiais'].to_excel(writer, sheet_name='3_Detalhe_Pontos_Oficiais', index=False)
+            tabelas['simulacao'].to_excel(writer, sheet_name='4_Simulacao_Percentis', index=False)
+            tabelas['simulacao_frentes'].to_excel(writer, sheet_name='5_Simulacao_Frentes', index=False)
+            tabelas['histograma'].to_excel(writer, sheet_name='6_Simulacao_Histograma', index=False)
+        log(f"Relatório de precificação salvo em: {ARQUIVO_SAIDA_PRECIFICACAO}")
+        log(f"   -> Total Estimado: {metricas['Total Estimado']}h | Com Buffer ({BUFFER_PADRAO:.0%}): "
+            f"{metricas[f'Estimativa com Buffer ({BUFFER_PADRAO:.0%})']}h")
+        total = tabelas['simulacao'].set_index('Métrica').loc['Total Estimado']
+        log(f"   -> Simulação ({tabelas['histograma']['Cenários'].sum():,} cenários): "
+            f"P50 {total['P50 (h)']}h | P80 {total['P80 (h)']}h | P95 {total['P95 (h)']}h".replace(',', '.'))
     except Exception as e:
-        print(f"ERRO ao salvar relatório de precificação: {e}")
+        log(f"ERRO ao salvar relatório de precificação: {e}")
 
+    abas = {
+        'sumario': tabelas['sumario'], 'detalhes': tabelas['estimativa'], 'pontos': tabelas['pontos_oficiais'],
+        'simulacao': tabelas['simulacao'], 'simulacao_frentes': tabelas['simulacao_frentes'],
+        'histograma': tabelas['histograma'],
+    }
+    return metricas, {aba: df for aba, df in abas.items() if df is not None}
 
-def gerar_relatorio_resumo(df_ajustes, nome_arquivo):
-    """Gera um relatório de resumo de pontos críticos por programa oficial."""
-    if df_ajustes.empty:
-        print("\nNenhum dado para gerar o relatório de resumo.")
-        return
 
-    df_oficiais = df_ajustes[df_ajustes['Classificação'] == 'Oficiais'].copy()
+def calcular_resumo(df_ajustes):
+    """Resumo de pontos críticos por programa oficial (None se não houver rotinas oficiais)."""
+    from esquemas import aplicar_esquema, ESQUEMA_RESUMO
+    df_oficiais = df_ajustes[df_ajustes['Classificação'] == 'Oficiais']
     if df_oficiais.empty:
-        print("\nNenhuma rotina oficial encontrada para o resumo de pontos críticos.")
-        return
+        return None
 
     # Agrupar por arquivo e tipo, contar os pontos
     df_resumo = df_oficiais.groupby(['Arquivo', 'Tipo Programa']).size().reset_index(name='Pontos Críticos')
     
     # Ordenar por quantidade de pontos críticos
-    df_resumo = df_resumo.sort_values(by='Pontos Críticos', ascending=False)
+    return aplicar_esquema(df_resumo.sort_values(by='Pontos Críticos', ascending=False), ESQUEMA_RESUMO).reset_index(drop=True)
+
+
+def gerar_relatorio_resumo(df_ajustes, nome_arquivo, log=print):
+    """Gera um relatório de resumo de pontos críticos por programa oficial."""
+    if df_ajustes.empty:
+        log("\nNenhum dado para gerar o relatório de resumo.")
+        return
+
+    df_resumo = calcular_resumo(df_ajustes)
+    if df_resumo is None:
+        log("\nNenhuma rotina oficial encontrada para o resumo de pontos críticos.")
+        return
     
     try:
         df_resumo.to_excel(nome_arquivo, index=False, engine='openpyxl')
-        print(f"Relatório de resumo salvo em: {nome_arquivo}")
+        log(f"Relatório de resumo salvo em: {nome_arquivo}")
     except Exception as e:
-        print(f"ERRO ao salvar o arquivo de resumo '{nome_arquivo}': {e}")
+        log(f"ERRO ao salvar o arquivo de resumo '{nome_arquivo}': {e}")
 
 
-def salvar_excel(df, nome_arquivo, colunas_ordem):
-    """Função auxiliar para salvar DataFrames em Excel com formatação."""
-    if df.empty:
-        print(f"\nNenhum item para salvar em '{nome_arquivo}'.")
-        return
-
+def preparar_relatorio(df, esquema):
+    """Ordena e completa a tabela de detalhe e a converte para o esquema do relatório."""
+    from esquemas import aplicar_esquema
     df_copy = df.copy()
     df_copy['Prefixo'] = df_copy['Arquivo'].str[:3].str.upper()
     df_copy['Classificação'] = df_copy['Arquivo'].apply(classificar_arquivo)
@@ -336,212 +192,461 @@ def salvar_excel(df, nome_arquivo, colunas_ordem):
     else:
         df_copy = df_copy.sort_values(by=['Arquivo', 'Localizador'])
 
-    colunas_presentes = df_copy.columns.tolist()
-    colunas_finais = [col for col in colunas_ordem if col in colunas_presentes]
-    df_final = df_copy[colunas_finais]
+    return aplicar_esquema(df_copy, esquema).reset_index(drop=True)
+
+
+def salvar_excel(df, nome_arquivo, esquema, log=print):
+    """Função auxiliar para salvar DataFrames em Excel no esquema da tabela."""
+    if df.empty:
+        log(f"\nNenhum item para salvar em '{nome_arquivo}'.")
+        return
+
+    df_final = preparar_relatorio(df, esquema)
 
     try:
         df_final.to_excel(nome_arquivo, index=False, engine='openpyxl')
-        print(f"Relatório salvo em: {nome_arquivo}")
+        log(f"Relatório salvo em: {nome_arquivo}")
     except Exception as e:
-        print(f"ERRO ao salvar o arquivo '{nome_arquivo}': {e}")
-
+        log(f"ERRO ao salvar o arquivo '{nome_arquivo}': {e}")
+    return df_final
 
-def main():
-    print("--- INICIANDO ANÁLISE DE IMPACTO DE CNPJ ALFANUMÉRICO (v5 - com tipo de termo) ---")
 
-    termos_busca = carregar_termos_busca(ARQUIVO_TERMOS)
-    if not termos_busca:
+def salvar_indice_codigo(df, nome_arquivo, log=print):
+    """Constrói e salva o índice de busca da coluna Código, na ordem das linhas do relatório."""
+    if df is None or df.empty:
         return
+    from indice_busca import construir_indice_busca, salvar_indice_busca
+    try:
+        salvar_indice_busca(construir_indice_busca(df['Código']), nome_arquivo)
+        log(f"Índice de busca salvo em: {nome_arquivo}")
+    except Exception as e:
+        log(f"ERRO ao salvar o índice de busca '{nome_arquivo}': {e}")
 
-    print(f"Analisando o arquivo: {ARQUIVO_ENTRADA}")
-    if not os.path.exists(ARQUIVO_ENTRADA):
-        print(f"ERRO: Arquivo de entrada não encontrado em '{ARQUIVO_ENTRADA}'")
+
+def salvar_tabela_particionada(df, pasta, log=print):
+    """Grava a tabela do relatório particionada por Classificação/Prefixo (particoes)."""
+    if df is None or df.empty:
         return
+    from particoes import salvar_particoes
+    try:
+        salvar_particoes(df, pasta)
+        log(f"Tabela particionada salva em: {pasta}/")
+    except Exception as e:
+        log(f"ERRO ao salvar a tabela particionada '{pasta}': {e}")
+
+
+def iterar_entrada(caminho):
+    """Linhas de resultado de busca a analisar.
+
+    Aceita a saída de texto de uma ferramenta de busca (findStudio, `grep -rn` ou `rg --json`,
+    ver formatos_entrada) ou um pacote com o código-fonte (.zip ou tar); neste caso, cada linha de
+    cada fonte vira `fonte(número da linha): código`, no formato do findStudio. Texto e tar podem
+    estar comprimidos (.gz, .xz, .zst) e são descomprimidos em fluxo (compressao).
+    """
+    if zipfile.is_zipfile(caminho):
+        with zipfile.ZipFile(caminho) as pacote:
+            for info in pacote.infolist():
+                if info.is_dir():
+                    continue
+                with pacote.open(info) as fonte:
+                    texto = io.TextIOWrapper(fonte, encoding='utf-8', errors='ignore')
+                    for numero, linha in enumerate(texto, start=1):
+                        yield f"{os.path.basename(info.filename)}({numero}): {linha}"
+    elif eh_tar(caminho):
+        with abrir_binario(caminho) as binario, tarfile.open(fileobj=binario, mode='r|') as pacote:
+            for membro in pacote:
+                if not membro.isfile():
+                    continue
+                # Membro de um tar lido em fluxo não é pesquisável (exigido pelo TextIOWrapper): cada
+                # fonte é lida inteira, uma de cada vez
+                with pacote.extractfile(membro) as fonte:
+                    texto = io.TextIOWrapper(io.BytesIO(fonte.read()), encoding='utf-8', errors='ignore')
+                    for numero, linha in enumerate(texto, start=1):
+                        yield f"{os.path.basename(membro.name)}({numero}): {linha}"
+    else:
+        with io.TextIOWrapper(abrir_binario(caminho), encoding='utf-8', errors='ignore') as f_in:
+            yield from f_in
+
+
+def preparar_contexto(pasta_fontes, log=print):
+    """Consulta das linhas vizinhas de cada ponto no fonte exportado, ou None sem a pasta de fontes."""
+    if not pasta_fontes or not os.path.isdir(pasta_fontes):
+        return None
+    from indice_contexto import obter_indice_contexto, linhas_vizinhas
+    try:
+        indice = obter_indice_contexto(pasta_fontes, ARQUIVO_INDICE_CONTEXTO, log)
+    except Exception as e:
+        log(f"AVISO: contexto do código-fonte indisponível: {e}")
+        return None
+    log(f"Contexto do código-fonte: {len(indice['fontes'])} fontes em '{pasta_fontes}'")
+    return lambda arquivo, localizador: linhas_vizinhas(indice, arquivo, localizador, LINHAS_CONTEXTO)
+
+
+def assinatura_contexto(pasta_fontes, contexto):
+    """Assinatura da pasta de fontes guardada com os resultados, ou None sem contexto."""
+    if contexto is None:
+        return None
+    from indice_contexto import assinatura_fontes
+    return assinatura_fontes(pasta_fontes).tolist()
+
+
+def executar_analise(arquivo_entrada, arquivo_termos, log=print, processos=PROCESSOS, pasta_fontes=PASTA_FONTES,
+                     checkpoint=None, retomar=False, corpus=None, incremental=True, indexar=False):
+    """Executa a análise completa sem gravar relatórios (cliente da biblioteca analise_cnpj).
+
+    Retorna {'ajustes', 'descartes', 'linhas_ignoradas'} (tabelas None quando vazias), ou None se
+    os termos ou a entrada não puderem ser lidos. Mensagens de progresso vão para `log`. Entradas de
+    texto grandes têm a leitura dividida entre até `processos` processos (leitura_paralela). Com a
+    pasta de fontes exportados, as linhas sem padrão conhecido são reavaliadas pelo comando completo.
+    Com `checkpoint`, o progresso é gravado nesse log (retomada) e, com `retomar`, uma análise
+    interrompida da mesma entrada continua de onde parou. Com `corpus`, se a pasta guarda o corpus
+    desta entrada (indice_termos) e só a lista de termos mudou desde então, só os pontos com os
+    termos incluídos ou removidos são reclassificados (a menos que `incremental` seja False). Com
+    `indexar`, a análise completa grava nessa pasta o corpus e seu índice de tokens, o que relê a
+    entrada uma segunda vez.
+    """
+    termos_busca = carregar_termos_busca(arquivo_termos, log)
+    if not termos_busca:
+        return None
+
+    log(f"Analisando o arquivo: {arquivo_entrada}")
+    if not os.path.exists(arquivo_entrada):
+        log(f"ERRO: Arquivo de entrada não encontrado em '{arquivo_entrada}'")
+        return None
+
+    contexto = preparar_contexto(pasta_fontes, log)
+
+    # Leitura, busca de termos e classificação em uma única passada sobre a entrada
+    entrada = iterar_entrada(arquivo_entrada)
+    amostra, linhas = separar_amostra(entrada)
+    formato = detectar_formato(amostra)
+    compressao = detectar_compressao(arquivo_entrada)
+    log(f"Formato da entrada: {formato}" + (f" (comprimida: {compressao})" if compressao else ""))
+    # Só texto sem compressão pode ser mapeado em memória e dividido em faixas
+    texto_simples = compressao is None and not zipfile.is_zipfile(arquivo_entrada) and not eh_tar(arquivo_entrada)
+    paralelo = texto_simples and usar_paralelo(arquivo_entrada, processos)
+    fontes = assinatura_contexto(pasta_fontes, contexto)
+    if corpus:
+        from indice_termos import identificar_corpus, reanalisar_termos
+        identidade_corpus = identificar_corpus(arquivo_entrada, formato, fontes=fontes)
+        resultado = reanalisar_termos(corpus, identidade_corpus, termos_busca, contexto=contexto, log=log) if incremental else None
+        if resultado is not None:
+            entrada.close()
+            registrar_resumo(resultado, log)
+            return resultado
+    if checkpoint:
+        identidade = identificar_entrada(arquivo_entrada, termos_busca, formato, fontes=fontes)
+        if texto_simples:
+            entrada.close()
+            trechos = trechos_texto(arquivo_entrada, termos_busca, formato, processos if paralelo else 1)
+        else:
+            trechos = trechos_linhas(linhas, termos_busca, formato)
+        log(f"Lendo, buscando termos e classificando cada linha de código única (pontos de retomada em '{checkpoint}')...")
+        vereditos = analisar_com_retomada(checkpoint, identidade, trechos, retomar, contexto=contexto, log=log)
+    elif paralelo:
+        entrada.close()
+        log(f"Lendo, buscando termos e classificando cada linha de código única ({processos} processos)...")
+        vereditos = analisar_arquivo(arquivo_entrada, termos_busca, formato, processos=processos, contexto=contexto)
+    else:
+        log("Lendo, buscando termos e classificando cada linha de código única...")
+        vereditos = analisar(linhas, termos_busca, formato=formato, contexto=contexto)
+    resultado = coletar(vereditos)
+    if corpus and indexar:
+        indexar_corpus(corpus, identidade_corpus, termos_busca, arquivo_entrada, formato, resultado, log)
+    registrar_resumo(resultado, log)
+    return resultado
+
+
+def indexar_corpus(pasta, identidade, termos_busca, arquivo_entrada, formato, resultado, log=print):
+    """Guarda o corpus da entrada e os resultados para a próxima alteração de termos (indice_termos)."""
+    from indice_termos import construir_corpus, salvar_corpus
+    log(f"Indexando o corpus da entrada para alterações incrementais de termos em '{pasta}'...")
+    try:
+        corpus = construir_corpus(iterar_entrada(arquivo_entrada), formato)
+        if not salvar_corpus(pasta, identidade, termos_busca, corpus, resultado):
+            log("AVISO: os resultados não correspondem ao corpus lido; o índice de termos não foi gravado.")
+    except Exception as e:
+        log(f"ERRO ao indexar o corpus da entrada: {e}")
+
 
-    # Etapa 1: Ler o arquivo de entrada e agrupar por linha de código única
-    linhas_unicas = {}
-    linhas_ignoradas = []
-    print("Etapa 1: Lendo, buscando termos e agrupando linhas de código únicas...")
-    with open(ARQUIVO_ENTRADA, 'r', encoding='utf-8', errors='ignore') as f_in:
-        for linha_bruta in f_in:
-            linha_strip = linha_bruta.strip()
-            if "Searching for" in linha_strip or not linha_strip:
-                continue
-
-            arquivo, num_linha, codigo_original = extrair_info_linha(linha_strip)
-            if not arquivo:
-                linhas_ignoradas.append(f"Formato Inválido: {linha_strip}")
-                continue
-
-            codigo_para_analise = codigo_original # Analisar a linha inteira
-            
-            termos_encontrados_na_linha = {} # {termo: tipo}
-            for termo, tipo in termos_busca.items():
-                regex = ''
-                # Sub-rotinas são buscadas como palavras completas para evitar falsos positivos
-                if tipo == 'sub-rotina':
-                    regex = r'\b' + re.escape(termo) + r'\b'
-                # Variáveis e texto-livre podem ser parte de outra string
-                elif tipo in ['variavel', 'texto-livre']:
-                    regex = re.escape(termo)
-                
-                if regex and re.search(regex, codigo_para_analise, re.IGNORECASE):
-                    termos_encontrados_na_linha[termo] = tipo
-            
-            if not termos_encontrados_na_linha:
-                linhas_ignoradas.append(f"Nenhum Termo Encontrado: {linha_strip}")
-                continue
-
-            chave = (arquivo, num_linha)
-            if chave not in linhas_unicas:
-                linhas_unicas[chave] = {'code': codigo_original, 'terms': {}}
-            
-            linhas_unicas[chave]['terms'].update(termos_encontrados_na_linha)
-
-    print(f"  - {len(linhas_unicas)} linhas de código únicas encontradas para análise.")
-    print(f"  - {len(linhas_ignoradas)} linhas ignoradas (formato inválido ou sem termos).")
+def registrar_resumo(resultado, log=print):
+    """Totais da análise no `log`."""
+    total_ajustes = 0 if resultado['ajustes'] is None else len(resultado['ajustes'])
+    total_descartes = 0 if resultado['descartes'] is None else len(resultado['descartes'])
+    log(f"\nAnálise concluída.")
+    log(f"  - Total de linhas únicas analisadas: {total_ajustes + total_descartes}")
+    log(f"  - {len(resultado['linhas_ignoradas'])} linhas ignoradas (formato inválido ou sem termos).")
+    log(f"  - Pontos de ajuste crítico identificados: {total_ajustes}")
+    log(f"  - Itens descartados: {total_descartes}")
+
+
+def executar_estimativa(arquivo_entrada, arquivo_termos, fracao=AMOSTRA_PADRAO, log=print,
+                        pasta_fontes=PASTA_FONTES, semente=SEMENTE_PADRAO):
+    """Estimativa preliminar: classifica só uma amostra estratificada das rotinas (amostragem).
+
+    Grava e retorna a estimativa dos pontos e das rotinas oficiais impactadas, com intervalos de
+    95%, ou None se os termos ou a entrada não puderem ser lidos. Não gera os relatórios.
+    """
+    termos_busca = carregar_termos_busca(arquivo_termos, log)
+    if not termos_busca:
+        return None
+
+    log(f"Estimando por amostra ({fracao:.0%} das rotinas de cada estrato): {arquivo_entrada}")
+    if not os.path.exists(arquivo_entrada):
+        log(f"ERRO: Arquivo de entrada não encontrado em '{arquivo_entrada}'")
+        return None
+
+    contexto = preparar_contexto(pasta_fontes, log)
+    amostra, linhas = separar_amostra(iterar_entrada(arquivo_entrada))
+    formato = detectar_formato(amostra)
+    log(f"Formato da entrada: {formato}")
+    linhas_amostra, populacao, sorteadas = amostrar(linhas, formato, fracao, semente)
+    resultado = coletar(analisar(linhas_amostra, termos_busca, formato=formato, contexto=contexto))
+
+    estimativa = montar_estimativa(resultado, populacao, sorteadas, fracao, semente, len(linhas_amostra))
+    log(f"\nAmostra: {estimativa['rotinas_amostra']} de {estimativa['rotinas_entrada']} rotinas "
+        f"({estimativa['estratos']} estratos Prefixo × Tipo Programa), {len(linhas_amostra)} linhas classificadas.")
+    for nome, valor in estimativa['metricas'].items():
+        log(f"  - {nome}: ~{valor['estimativa']} (IC 95%: {valor['ic_inferior']} a {valor['ic_superior']})")
+    try:
+        salvar_estimativa(estimativa, ARQUIVO_ESTIMATIVA)
+        log(f"Estimativa salva em: {ARQUIVO_ESTIMATIVA}")
+    except Exception as e:
+        log(f"ERRO ao salvar a estimativa: {e}")
+    return estimativa
+
+
+def executar_parcial(entradas, arquivo_termos, destino, parte=1, partes=1, log=print, processos=PROCESSOS,
+                     pasta_fontes=PASTA_FONTES):
+    """Analisa uma fatia das `entradas` e grava o resultado parcial em `destino` (resultados_parciais).
+
+    Com `partes` > 1, cada entrada (texto sem compressão) é dividida em `partes` faixas de bytes
+    terminadas em quebra de linha e só a faixa `parte` (1 a `partes`) é lida. Retorna o parcial, ou
+    None se os termos ou uma entrada não puderem ser lidos.
+    """
+    termos_busca = carregar_termos_busca(arquivo_termos, log)
+    if not termos_busca:
+        return None
+
+    contexto = preparar_contexto(pasta_fontes, log)
+    fontes = assinatura_contexto(pasta_fontes, contexto)
+    info_entradas, fatias, agrupamentos = {}, [], []
+    for arquivo_entrada in entradas:
+        nome = os.path.basename(arquivo_entrada)
+        if not os.path.exists(arquivo_entrada):
+            log(f"ERRO: Arquivo de entrada não encontrado em '{arquivo_entrada}'")
+            return None
+        if nome in info_entradas:
+            log(f"ERRO: Mais de uma entrada com o nome '{nome}'; os parciais identificam as entradas pelo nome.")
+            return None
+
+        entrada = iterar_entrada(arquivo_entrada)
+        amostra, linhas = separar_amostra(entrada)
+        formato = detectar_formato(amostra)
+        texto_simples = (detectar_compressao(arquivo_entrada) is None and not zipfile.is_zipfile(arquivo_entrada)
+                         and not eh_tar(arquivo_entrada))
+        log(f"Analisando a fatia {parte}/{partes} de: {arquivo_entrada} (formato: {formato})")
+        if texto_simples and os.path.getsize(arquivo_entrada) == 0:
+            # Arquivo vazio não pode ser mapeado em memória: a fatia não tem linhas
+            entrada.close()
+            inicio = 0
+            linhas_unicas, ignoradas = {}, []
+        elif texto_simples:
+            entrada.close()
+            with open(arquivo_entrada, 'rb') as arquivo, mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+                faixas = faixas_alinhadas(mapa, partes)
+                inicio, fim = faixas[parte - 1] if parte <= len(faixas) else (len(mapa), len(mapa))
+                usados = processos if usar_paralelo(arquivo_entrada, processos) else 1
+                subfaixas = faixas_alinhadas(mapa, usados * FAIXAS_POR_PROCESSO, inicio, fim) if fim > inicio else []
+            linhas_unicas, ignoradas = mesclar_agrupamentos(
+                agrupar_faixas(arquivo_entrada, subfaixas, termos_busca, formato, usados)
+            )
+        elif partes > 1:
+            log(f"ERRO: '{arquivo_entrada}' é comprimida ou um pacote: só pode ser dividida por lista de entradas.")
+            return None
+        else:
+            inicio = 0
+            linhas_unicas, ignoradas = agrupar(linhas, termos_busca, formato)
+        info_entradas[nome] = {'tamanho': os.path.getsize(arquivo_entrada), 'formato': formato, 'partes': partes}
+        fatias.append([nome, parte, partes])
+        agrupamentos.append((nome, inicio, linhas_unicas, ignoradas))
+
+    from resultados_parciais import identificar_parcial, montar_parcial, salvar_parcial
+    parcial = montar_parcial(identificar_parcial(termos_busca, fontes), info_entradas, fatias, agrupamentos,
+                             contexto=contexto)
+    salvar_parcial(parcial, destino)
+    resumo = parcial['metadados']['resumo']
+    log(f"Resultado parcial salvo em: {destino} ({len(parcial['pontos'])} linhas únicas: {resumo['pontos']})")
+    return parcial
+
+
+def executar_mesclagem(caminhos, log=print, pasta_fontes=PASTA_FONTES):
+    """Mescla os resultados parciais gravados por executar_parcial (em qualquer ordem).
+
+    Retorna o parcial mesclado, ou None se os parciais não puderem ser mesclados.
+    """
+    from resultados_parciais import carregar_parcial, mesclar_parciais, fatias_faltantes
+    try:
+        parciais = [carregar_parcial(caminho) for caminho in caminhos]
+        # Linhas únicas repetidas entre fatias são reclassificadas com o mesmo contexto dos parciais
+        fontes = parciais[0]['metadados']['identidade']['fontes']
+        contexto = preparar_contexto(pasta_fontes, log) if fontes is not None else None
+        if fontes is not None and (contexto is None or assinatura_contexto(pasta_fontes, contexto) != fontes):
+            log(f"ERRO: os parciais foram classificados com outra pasta de fontes; mescle com a mesma '{pasta_fontes}'.")
+            return None
+        parcial = mesclar_parciais(parciais, contexto=contexto)
+    except (OSError, ValueError) as e:
+        log(f"ERRO ao mesclar os resultados parciais: {e}")
+        return None
+
+    log(f"{len(caminhos)} resultados parciais mesclados: {len(parcial['pontos'])} linhas únicas "
+        f"({parcial['metadados']['resumo']['pontos']})")
+    faltantes = fatias_faltantes(parcial)
+    if faltantes:
+        log("AVISO: fatias ainda não mescladas: " + ", ".join(f"'{nome}' {parte}/{partes}" for nome, parte, partes in faltantes))
+    return parcial
+
+
+def gerar_relatorios(resultado, log=print):
+    """Grava os relatórios Excel, os índices de busca e o histórico a partir do resultado da análise.
+
+    Retorna as tabelas no formato lido pelos dashboards (servico_dados), já nos esquemas.
+    """
+    from esquemas import ESQUEMA_AJUSTES, ESQUEMA_DESCARTES
+    from paineis import ARQUIVO_PAINEIS, montar_paineis, salvar_paineis
+    from historico_execucoes import registrar_execucao
+    df_ajustes, df_descartados, metricas = resultado['ajustes'], resultado['descartes'], {}
+    dados = {}
 
     # Salvar o relatório de linhas ignoradas
-    if linhas_ignoradas:
+    if resultado['linhas_ignoradas']:
         try:
             with open('analise_linhas_ignoradas.txt', 'w', encoding='utf-8') as f:
-                for linha in sorted(linhas_ignoradas):
+                for linha in sorted(resultado['linhas_ignoradas']):
                     f.write(f"{linha}\n")
-            print("Arquivo com linhas ignoradas salvo em: analise_linhas_ignoradas.txt")
+            log("Arquivo com linhas ignoradas salvo em: analise_linhas_ignoradas.txt")
         except Exception as e:
-            print(f"ERRO ao salvar o arquivo de linhas ignoradas: {e}")
-
-    # Etapa 2: Classificar cada linha de código única
-    print("Etapa 2: Classificando cada linha...")
-    resultados_ajustes = []
-    resultados_descartados = []
-
-    for (arquivo, num_linha), data in linhas_unicas.items():
-        codigo_original = data['code']
-        termos_encontrados = data['terms'] # É um dict {termo: tipo}
-        codigo_para_analise = codigo_original # Usar a linha inteira para análise
-        
-        # Constrói a string de variáveis para o relatório
-        variaveis_str = ", ".join(sorted(termos_encontrados.keys()))
-        foi_classificada = False
-
-        # --- LÓGICA DE CLASSIFICAÇÃO REESTRUTURADA ---
-        
-        # Etapa 1: Descartar comentários (prioridade máxima e sem exceções)
-        if re.match(r"^\s*(;+|//)", codigo_para_analise):
-            resultados_descartados.append({
-                "Arquivo": arquivo, "Linha": num_linha, "Variável": variaveis_str,
-                "Regra de Descarte": "Comentário", "Código": codigo_original
-            })
-            continue
-
-        # Etapa 2: Descartar rotinas não oficiais ou scripts
-        classificacao_arquivo = classificar_arquivo(arquivo)
-        if classificacao_arquivo in ['Não Oficiais', 'Scripts']:
-            motivo = "Rotina de Script" if classificacao_arquivo == 'Scripts' else "Rotina Não Oficial"
-            resultados_descartados.append({
-                "Arquivo": arquivo, "Linha": num_linha, "Variável": variaveis_str,
-                "Regra de Descarte": motivo, "Código": codigo_original
-            })
-            continue
-            
-        # Etapa 3: Se não foi descartada, aplicar outras regras e classificações
-        
-        # Separa os termos encontrados por tipo para aplicar lógicas distintas
-        vars_na_linha = [t for t, tipo in termos_encontrados.items() if tipo == 'variavel']
-        subs_na_linha = [t for t, tipo in termos_encontrados.items() if tipo == 'sub-rotina']
-
-        # 3.1: Lógica para Sub-rotinas
-        if subs_na_linha:
-            resultados_ajustes.append({
-                "Arquivo": arquivo, "Linha": num_linha, "Variável": variaveis_str,
-                "Categoria": "CHAMADA_SUBROTINA", "Padrão": "Chamada de Sub-rotina",
-                "Justificativa": f"Chamada à(s) sub-rotina(s): {', '.join(sorted(subs_na_linha))}.", 
-                "Código": codigo_original
-            })
-            foi_classificada = True
-        
-        # 3.2: Lógica para Variáveis (se houver e não tiver sido classificada como sub-rotina)
-        if vars_na_linha and not foi_classificada:
-            vars_regex_linha = r'\b(' + '|'.join(re.escape(v) for v in vars_na_linha) + r')\b'
-            
-            # Aplicar regras de DESCARTE restantes
-            for motivo, regex in REGRAS_DESCARTE_CONFIANCA:
-                if motivo == "Comentário": continue # Já foi tratado
-                
-                regex_com_vars = regex.replace('VARIAVEL', vars_regex_linha)
-                if re.search(regex_com_vars, codigo_para_analise, re.IGNORECASE):
-                    resultados_descartados.append({
-                        "Arquivo": arquivo, "Linha": num_linha, "Variável": variaveis_str,
-                        "Regra de Descarte": motivo, "Código": codigo_original
-                    })
-                    foi_classificada = True
-                    break
-            if foi_classificada: continue
-
-            # Aplicar regras de AJUSTE CRÍTICO
-            for nome, regex, categoria, just in REGRAS_AJUSTE_CRITICO:
-                regex_com_vars = regex.replace('VARIAVEL', vars_regex_linha)
-                if re.search(regex_com_vars, codigo_para_analise, re.IGNORECASE):
-                    resultados_ajustes.append({
-                        "Arquivo": arquivo, "Linha": num_linha, "Variável": variaveis_str,
-                        "Categoria": categoria, "Padrão": nome, "Justificativa": just, "Código": codigo_original
-                    })
-                    foi_classificada = True
-                    break
-            if foi_classificada: continue
-
-        # Etapa 4: Padrão final -> Revisão Manual
-        if not foi_classificada:
-            justificativa = "Termo de texto-livre encontrado." if not vars_na_linha else "Não corresponde a nenhum padrão de ajuste ou descarte conhecido."
-            resultados_ajustes.append({
-                "Arquivo": arquivo, "Linha": num_linha, "Variável": variaveis_str,
-                "Categoria": "REFATORACAO_PONTUAL", "Padrão": "Revisão Manual Necessária", 
-                "Justificativa": justificativa,
-                "Código": codigo_original
-            })
-
-    print(f"\nAnálise concluída.")
-    print(f"  - Total de linhas únicas analisadas: {len(linhas_unicas)}")
-    print(f"  - Pontos de ajuste crítico identificados: {len(resultados_ajustes)}")
-    print(f"  - Itens descartados: {len(resultados_descartados)}")
+            log(f"ERRO ao salvar o arquivo de linhas ignoradas: {e}")
 
     # Gerar Relatório de Ajustes Críticos
-    if resultados_ajustes:
-        df_ajustes = pd.DataFrame(resultados_ajustes)
-        df_ajustes['Tipo Programa'] = df_ajustes['Arquivo'].str.split('.').str[-1]
-        df_ajustes['Prefixo'] = df_ajustes['Arquivo'].str[:3].str.upper()
-        df_ajustes['Classificação'] = df_ajustes['Arquivo'].apply(classificar_arquivo)
-        colunas_ajustes = [
-            "Arquivo", "Tipo Programa", "Prefixo", "Classificação", "Linha", "Variável",
-            "Categoria", "Padrão", "Justificativa", "Código"
-        ]
-        df_ajustes.rename(columns={'Linha': 'Localizador'}, inplace=True)
-        colunas_ajustes[4] = 'Localizador'
-        salvar_excel(df_ajustes, ARQUIVO_SAIDA_AJUSTES, colunas_ajustes)
-        gerar_relatorio_precificacao_realista(df_ajustes)
-        gerar_relatorio_resumo(df_ajustes, ARQUIVO_SAIDA_RESUMO)
+    if df_ajustes is not None:
+        dados['ajustes'] = salvar_excel(df_ajustes, ARQUIVO_SAIDA_AJUSTES, ESQUEMA_AJUSTES, log)
+        salvar_indice_codigo(dados['ajustes'], ARQUIVO_INDICE_AJUSTES, log)
+        salvar_tabela_particionada(dados['ajustes'], PASTA_PARTICOES_AJUSTES, log)
+        metricas, dados['precificacao'] = gerar_relatorio_precificacao_realista(df_ajustes, log)
+        gerar_relatorio_resumo(df_ajustes, ARQUIVO_SAIDA_RESUMO, log)
 
     # Gerar Relatório de Descartes
-    if resultados_descartados:
-        df_descartados = pd.DataFrame(resultados_descartados)
-        df_descartados['Tipo Programa'] = df_descartados['Arquivo'].str.split('.').str[-1]
-        df_descartados['Prefixo'] = df_descartados['Arquivo'].str[:3].str.upper()
-        df_descartados['Classificação'] = df_descartados['Arquivo'].apply(classificar_arquivo)
-        colunas_descartes = [
-            "Arquivo", "Tipo Programa", "Prefixo", "Classificação", "Linha",
-            "Variável", "Regra de Descarte", "Código"
-        ]
-        df_descartados.rename(columns={'Linha': 'Localizador'}, inplace=True)
-        colunas_descartes[4] = 'Localizador'
-        salvar_excel(df_descartados, ARQUIVO_SAIDA_DESCARTES, colunas_descartes)
+    if df_descartados is not None:
+        dados['descartes'] = salvar_excel(df_descartados, ARQUIVO_SAIDA_DESCARTES, ESQUEMA_DESCARTES, log)
+        salvar_indice_codigo(dados['descartes'], ARQUIVO_INDICE_DESCARTES, log)
+        salvar_tabela_particionada(dados['descartes'], PASTA_PARTICOES_DESCARTES, log)
         df_descartes_oficiais = df_descartados[df_descartados['Classificação'] == 'Oficiais'].copy()
-        salvar_excel(df_descartes_oficiais, ARQUIVO_SAIDA_DESCARTES_OFICIAIS, colunas_descartes)
+        salvar_excel(df_descartes_oficiais, ARQUIVO_SAIDA_DESCARTES_OFICIAIS, ESQUEMA_DESCARTES, log)
 
         # Salvar o relatório específico de descarte por extração simples
         df_extracao_simples = df_descartados[df_descartados['Regra de Descarte'] == 'Extração Simples de Substring'].copy()
-        salvar_excel(df_extracao_simples, ARQUIVO_SAIDA_DESCARTES_EXTRACAO, colunas_descartes)
+        salvar_excel(df_extracao_simples, ARQUIVO_SAIDA_DESCARTES_EXTRACAO, ESQUEMA_DESCARTES, log)
+
+    # Painéis pré-calculados das páginas do dashboard (métricas e dados dos gráficos)
+    precificacao = dados.get('precificacao', {})
+    dados['paineis'] = montar_paineis(
+        precificacao.get('sumario'), precificacao.get('detalhes'), dados.get('ajustes'),
+        precificacao.get('simulacao'), precificacao.get('histograma')
+    )
+    try:
+        salvar_paineis(dados['paineis'], ARQUIVO_PAINEIS)
+        log(f"Painéis do dashboard salvos em: {ARQUIVO_PAINEIS}")
+    except Exception as e:
+        log(f"ERRO ao salvar os painéis do dashboard: {e}")
+
+    # Registrar a execução no histórico (snapshot imutável para comparação entre execuções); uma
+    # reanálise pelo corpus sem termos alterados repete a execução anterior e não é registrada
+    if resultado.get('termos_alterados') == []:
+        log("Termos inalterados desde a última análise: execução não registrada novamente no histórico.")
+    else:
+        try:
+            id_execucao = registrar_execucao(df_ajustes, df_descartados, metricas)
+            log(f"Execução registrada no histórico: {id_execucao}")
+        except Exception as e:
+            log(f"ERRO ao registrar a execução no histórico: {e}")
+
+    return {nome: tabela for nome, tabela in dados.items() if tabela is not None}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Análise de impacto do CNPJ alfanumérico.")
+    parser.add_argument(
+        '--amostra', nargs='?', type=float, const=AMOSTRA_PADRAO, metavar='FRAÇÃO',
+        help=f"estimativa preliminar sobre uma amostra estratificada das rotinas (padrão: {AMOSTRA_PADRAO})"
+    )
+    parser.add_argument(
+        '--retomar', action='store_true',
+        help=f"continua uma análise interrompida a partir do último ponto salvo em '{ARQUIVO_CHECKPOINT}'"
+    )
+    parser.add_argument(
+        '--completa', action='store_true',
+        help="relê toda a entrada mesmo que só os termos tenham mudado desde o corpus guardado com --indexar"
+    )
+    parser.add_argument(
+        '--indexar', action='store_true',
+        help="guarda o corpus da entrada (indice_termos.PASTA_CORPUS) para alterações incrementais de termos "
+             "(relê a entrada ao fim da análise)"
+    )
+    parser.add_argument(
+        '--parcial', metavar='ARQUIVO',
+        help="grava um resultado parcial (fatia da entrada, ou a mescla de --mesclar) em vez dos relatórios"
+    )
+    parser.add_argument(
+        '--fatia', metavar='K/N', default='1/1',
+        help="com --parcial, analisa só a K-ésima de N faixas de bytes de cada entrada (texto sem compressão)"
+    )
+    parser.add_argument(
+        '--entradas', nargs='+', metavar='ARQUIVO', default=[ARQUIVO_ENTRADA],
+        help="com --parcial, lista de entradas da fatia (padrão: a entrada configurada)"
+    )
+    parser.add_argument(
+        '--mesclar', nargs='+', metavar='PARCIAL',
+        help="mescla resultados parciais e gera os relatórios (ou outro parcial, com --parcial)"
+    )
+    args = parser.parse_args()
+
+    print("--- INICIANDO ANÁLISE DE IMPACTO DE CNPJ ALFANUMÉRICO (v5 - com tipo de termo) ---")
+
+    if args.amostra is not None:
+        if not 0 < args.amostra <= 1:
+            parser.error("--amostra deve estar entre 0 e 1")
+        executar_estimativa(ARQUIVO_ENTRADA, ARQUIVO_TERMOS, args.amostra)
+        return
+
+    if args.mesclar:
+        from resultados_parciais import salvar_parcial, resultado_do_parcial
+        parcial = executar_mesclagem(args.mesclar)
+        if parcial is None:
+            return
+        if args.parcial:
+            salvar_parcial(parcial, args.parcial)
+            print(f"Resultado parcial mesclado salvo em: {args.parcial}")
+        else:
+            gerar_relatorios(resultado_do_parcial(parcial))
+        return
+
+    if args.parcial:
+        try:
+            parte, partes = (int(n) for n in args.fatia.split('/'))
+        except ValueError:
+            parser.error("--fatia deve ser K/N, ex.: 2/4")
+        if not 1 <= parte <= partes:
+            parser.error("--fatia K/N exige 1 <= K <= N")
+        executar_parcial(args.entradas, ARQUIVO_TERMOS, args.parcial, parte, partes)
+        return
+
+    from indice_termos import PASTA_CORPUS
+    resultado = executar_analise(ARQUIVO_ENTRADA, ARQUIVO_TERMOS, checkpoint=ARQUIVO_CHECKPOINT, retomar=args.retomar,
+                                 corpus=PASTA_CORPUS, incremental=not args.completa, indexar=args.indexar)
+    if resultado is None:
+        return
+    gerar_relatorios(resultado)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,69 @@
+# 📦 Painéis pré-calculados do dashboard
+# Métricas e dados dos gráficos de cada página são calculados uma vez, na análise (main.py),
+# e gravados em um JSON pequeno: as páginas de resumo abrem sem ler os relatórios Excel.
+
+import os
+import json
+import pandas as pd
+from esquemas import aplicar_esquema, ESQUEMA_ESTIMATIVA, ESQUEMA_PREFIXOS, ESQUEMA_SIMULACAO, ESQUEMA_HISTOGRAMA
+from precificacao import contagens_do_sumario
+
+ARQUIVO_PAINEIS = 'analise_paineis.json'
+
+# Tabelas do payload e seus esquemas
+ESQUEMAS_PAINEIS = {
+    'frentes': ESQUEMA_ESTIMATIVA, 'prefixos': ESQUEMA_PREFIXOS,
+    'simulacao': ESQUEMA_SIMULACAO, 'histograma': ESQUEMA_HISTOGRAMA,
+}
+
+
+def montar_paineis(sumario=None, detalhes=None, ajustes=None, simulacao=None, histograma=None):
+    """Payload das páginas a partir das tabelas da análise (qualquer uma pode faltar).
+
+    'metricas' ({Métrica: texto exibido}) alimenta a Visão Executiva, 'frentes' os gráficos de
+    precificação, 'prefixos' (pontos críticos por prefixo, do maior para o menor) a análise por grupo
+    e 'estatisticas' (total de pontos e de arquivos) a barra lateral. 'simulacao' (percentis) e
+    'histograma' (do total) trazem as faixas de esforço da simulação Monte Carlo, e 'contagens'
+    (pontos e rotinas oficiais) é a base da precificação com premissas editadas no dashboard.
+    """
+    paineis = {}
+    if sumario is not None:
+        paineis['metricas'] = {
+            metrica: f"{valor}h" if unidade == 'h' else str(valor)
+            for metrica, valor, unidade in sumario[['Métrica', 'Valor', 'Unidade']].itertuples(index=False)
+        }
+        paineis['contagens'] = contagens_do_sumario(sumario)
+    if detalhes is not None:
+        paineis['frentes'] = aplicar_esquema(detalhes, ESQUEMA_ESTIMATIVA)
+    if simulacao is not None:
+        paineis['simulacao'] = aplicar_esquema(simulacao, ESQUEMA_SIMULACAO)
+    if histograma is not None:
+        paineis['histograma'] = aplicar_esquema(histograma, ESQUEMA_HISTOGRAMA)
+    if ajustes is not None:
+        paineis['estatisticas'] = {'pontos': len(ajustes), 'arquivos': int(ajustes['Arquivo'].nunique())}
+        prefixos = ajustes['Prefixo'].value_counts().reset_index()
+        prefixos.columns = list(ESQUEMA_PREFIXOS)
+        paineis['prefixos'] = aplicar_esquema(prefixos, ESQUEMA_PREFIXOS)
+    return paineis
+
+
+def salvar_paineis(paineis, caminho=ARQUIVO_PAINEIS):
+    """Grava o payload (tabelas como listas de registros) de forma atômica."""
+    conteudo = {
+        nome: json.loads(valor.to_json(orient='records', force_ascii=False)) if nome in ESQUEMAS_PAINEIS else valor
+        for nome, valor in paineis.items()
+    }
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, 'w', encoding='utf-8') as arquivo:
+        json.dump(conteudo, arquivo, ensure_ascii=False)
+    os.replace(temporario, caminho)
+
+
+def carregar_paineis(caminho=ARQUIVO_PAINEIS):
+    """Lê o payload gravado, com as tabelas já nos esquemas."""
+    with open(caminho, encoding='utf-8') as arquivo:
+        conteudo = json.load(arquivo)
+    for nome, esquema in ESQUEMAS_PAINEIS.items():
+        if nome in conteudo:
+            conteudo[nome] = aplicar_esquema(pd.DataFrame(conteudo[nome], columns=list(esquema)), esquema)
+    return conteudo
@@ -0,0 +1,103 @@
+# 🗂️ Resultados particionados por Classificação/Prefixo
+# Além do Excel, as tabelas de detalhe são gravadas como um dataset Parquet particionado no estilo
+# Hive (`Classificação=Oficiais/Prefixo=FIS/parte-0.parquet`). O Explorador lê só as partições dos
+# filtros selecionados: os filtros de Classificação e Prefixo viram predicados do pyarrow, que
+# descartam as partições pelo caminho, sem abrir os arquivos, e os demais usam as estatísticas dos
+# grupos de linhas. Memória e tempo de carga acompanham o recorte exibido, não a tabela inteira.
+
+import os
+import json
+import shutil
+import pyarrow as pa
+import pyarrow.dataset as ds
+from esquemas import aplicar_esquema
+
+COLUNAS_PARTICAO = ['Classificação', 'Prefixo']
+# Posição da linha no relatório Excel (e no índice de busca salvo), para recortes na ordem original
+COLUNA_LINHA = 'Linha'
+# Linhas por grupo do Parquet: grupos menores deixam o filtro por Arquivo pular mais dados
+LINHAS_POR_GRUPO = 10_000
+MANIFESTO = '_manifesto.json'
+
+
+def _particionamento():
+    return ds.partitioning(pa.schema([(coluna, pa.string()) for coluna in COLUNAS_PARTICAO]), flavor='hive')
+
+
+def salvar_particoes(df, pasta):
+    """Grava a tabela (no esquema do relatório) particionada em `pasta`, substituindo a anterior.
+
+    O manifesto traz o total e as linhas de cada partição, para o Explorador montar os filtros sem
+    ler os dados.
+    """
+    tabela = df.copy()
+    tabela[COLUNA_LINHA] = range(len(tabela))
+    for coluna in COLUNAS_PARTICAO:
+        tabela[coluna] = tabela[coluna].fillna('')
+
+    # Gravado à parte e trocado de uma vez: o dashboard pode estar lendo o dataset anterior
+    temporario = f"{pasta}.{os.getpid()}.tmp"
+    shutil.rmtree(temporario, ignore_errors=True)
+    ds.write_dataset(
+        pa.Table.from_pandas(tabela, preserve_index=False), temporario, format='parquet',
+        partitioning=_particionamento(), basename_template='parte-{i}.parquet', use_threads=False,
+        max_rows_per_group=LINHAS_POR_GRUPO, min_rows_per_group=min(LINHAS_POR_GRUPO, 1024),
+    )
+    contagem = tabela.groupby(COLUNAS_PARTICAO, sort=True).size()
+    manifesto = {
+        'total': len(tabela),
+        'colunas': [coluna for coluna in df.columns],
+        'particoes': [dict(zip(COLUNAS_PARTICAO, chave), linhas=int(linhas)) for chave, linhas in contagem.items()],
+    }
+    with open(os.path.join(temporario, MANIFESTO), 'w', encoding='utf-8') as arquivo:
+        json.dump(manifesto, arquivo, ensure_ascii=False)
+
+    antigo = f"{pasta}.{os.getpid()}.antigo"
+    if os.path.exists(pasta):
+        os.replace(pasta, antigo)
+    os.replace(temporario, pasta)
+    shutil.rmtree(antigo, ignore_errors=True)
+
+
+def carregar_manifesto(pasta):
+    """Manifesto do dataset ({'total', 'colunas', 'particoes'}), ou None se a pasta não existe."""
+    caminho = os.path.join(pasta, MANIFESTO)
+    if not os.path.exists(caminho):
+        return None
+    with open(caminho, encoding='utf-8') as arquivo:
+        return json.load(arquivo)
+
+
+def valores_particao(manifesto, coluna, filtros=None):
+    """Valores de uma coluna de partição, opcionalmente só nas partições que passam nos `filtros`."""
+    filtros = {c: set(v) for c, v in (filtros or {}).items() if v}
+    return sorted({
+        particao[coluna] for particao in manifesto['particoes']
+        if all(particao[c] in valores for c, valores in filtros.items())
+    })
+
+
+def linhas_particoes(manifesto, filtros):
+    """Linhas das partições selecionadas pelos filtros das colunas de partição."""
+    filtros = {c: set(v) for c, v in filtros.items() if v and c in COLUNAS_PARTICAO}
+    return sum(
+        particao['linhas'] for particao in manifesto['particoes']
+        if all(particao[c] in valores for c, valores in filtros.items())
+    )
+
+
+def carregar_particoes(pasta, esquema, filtros=None):
+    """Linhas que passam nos `filtros` {coluna: valores} (vazio = sem filtro), na ordem do relatório.
+
+    Retorna (DataFrame no `esquema`, posições das linhas no relatório completo).
+    """
+    dataset = ds.dataset(pasta, format='parquet', partitioning=_particionamento())
+    predicado = None
+    for coluna, valores in (filtros or {}).items():
+        if valores:
+            condicao = ds.field(coluna).isin([str(v) for v in valores])
+            predicado = condicao if predicado is None else predicado & condicao
+    tabela = dataset.to_table(filter=predicado).sort_by(COLUNA_LINHA)
+    df = tabela.to_pandas()
+    linhas = df[COLUNA_LINHA].to_numpy()
+    return aplicar_esquema(df, esquema), linhas
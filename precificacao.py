@@ -0,0 +1,198 @@
+# 🧮 Precificação da proposta
+# Premissas (horas por frente de trabalho, horas por ponto oficial e buffer) e o cálculo da estimativa
+# sobre as contagens já materializadas pela análise (pontos e rotinas oficiais). A estimativa é só
+# aritmética sobre essas contagens: mudar uma premissa não relê nem reclassifica o código, e a
+# simulação Monte Carlo (simulacao_esforco) só precisa ser refeita quando as horas mudam.
+
+import pandas as pd
+from esquemas import (
+    aplicar_esquema, ESQUEMA_SUMARIO, ESQUEMA_ESTIMATIVA, ESQUEMA_SIMULACAO, ESQUEMA_SIMULACAO_FRENTES,
+    ESQUEMA_HISTOGRAMA
+)
+from simulacao_esforco import CENARIOS_PADRAO, CAMPOS_CATEGORIA, simular_esforco, resumir_simulacao
+
+# --- ATIVIDADES BASE DO PROJETO ---
+# Esforços fixos para atividades que independem da contagem de pontos de código,
+# refletindo o escopo completo do projeto de adequação ao CNPJ alfanumérico.
+# "incerteza" traz os multiplicadores otimista e pessimista do esforço nominal (mais provável),
+# usados na simulação Monte Carlo da proposta (simulacao_esforco.py).
+ATIVIDADES_BASE_PROJETO = {
+    "GERENCIAMENTO_PROJETO": {
+        "nome": "Gerenciamento e Planejamento",
+        "esforco_dev": 120, "esforco_testes": 0,
+        "incerteza": {"otimista": 0.9, "pessimista": 1.3},
+        "descricao": "Coordenação, planejamento e acompanhamento das entregas do projeto."
+    },
+    "ANALISE_ARQUITETURA": {
+        "nome": "Análise e Arquitetura da Solução (Especificação funcional)",
+        "esforco_dev": 160, "esforco_testes": 0,
+        "incerteza": {"otimista": 0.85, "pessimista": 1.5},
+        "descricao": "Definição da arquitetura da solução, especificação funcional e detalhamento das regras de negócio para o CNPJ alfanumérico."
+    },
+    "ANALISE_PONTOS_CRITICOS": {
+        "nome": "Análise preliminar para identificação de pontos a serem ajustados",
+        "esforco_dev": 210, "esforco_testes": 0,
+        "incerteza": {"otimista": 0.8, "pessimista": 1.6},
+        "descricao": "Análise em bloco de todos os pontos de código impactados para categorização e definição das estratégias de refatoração."
+    },
+    "SOLUCAO_CENTRAL": {
+        "nome": "Desenvolvimento da Solução Central para tratamento de código",
+        "esforco_dev": 80, "esforco_testes": 40,
+        "incerteza": {"otimista": 0.85, "pessimista": 1.5},
+        "descricao": "Criação e testes unitários das funções centrais de validação, formatação e cálculo de DV."
+    },
+    "REFATORACAO_ROTINAS": {
+        "nome": "Refatoração e ajustes de rotinas identificadas",
+        "esforco_dev": 560, "esforco_testes": 240,
+        "incerteza": {"otimista": 0.8, "pessimista": 1.8},
+        "descricao": "Refatoração de todas as rotinas e pontos de código impactados, aplicando a solução central."
+    },
+    "AJUSTE_SUBROTINA_IBSRIC": {
+        "nome": "Ajustes de subrotinas de validação (IBSRIC)",
+        "esforco_dev": 40, "esforco_testes": 20,
+        "incerteza": {"otimista": 0.8, "pessimista": 1.5},
+        "descricao": "Refatoração específica do conjunto de sub-rotinas de validação (IBSRIC) para utilizar a nova solução central."
+    },
+    "AJUSTE_CODIGO_BARRAS": {
+        "nome": "Ajustes de código de barras do DANFE",
+        "esforco_dev": 60, "esforco_testes": 20,
+        "incerteza": {"otimista": 0.8, "pessimista": 1.6},
+        "descricao": "Implementação da migração do padrão de código de barras de CODE-128C para CODE-128A."
+    },
+    "AJUSTE_CHAVE_NFE": {
+        "nome": "Ajustes de chave de acesso NFe",
+        "esforco_dev": 100, "esforco_testes": 40,
+        "incerteza": {"otimista": 0.8, "pessimista": 1.7},
+        "descricao": "Ajuste na lógica de geração e validação da chave de acesso de Documentos Fiscais Eletrônicos."
+    },
+    "TESTES_IMPLANTACAO": {
+        "nome": "Testes Finais e Implantação (Homologação e Go-Live)",
+        "esforco_dev": 80, "esforco_testes": 100,
+        "incerteza": {"otimista": 0.85, "pessimista": 1.6},
+        "descricao": "Ciclo completo de testes integrados, suporte à homologação (UAT), apoio ao go-live e atividades de implantação em produção."
+    }
+}
+
+# Incerteza comum a todas as frentes por categoria de esforço: desvio-padrão do log do fator de
+# produtividade da equipe (lognormal de mediana 1). 0.10 ≈ ±10% em dois terços dos cenários.
+INCERTEZA_CATEGORIAS_ESFORCO = {"Dev": 0.10, "Testes": 0.15}
+
+# --- CATEGORIAS PARA AJUSTE DE CÓDIGO ---
+# Custo marginal por ponto oficial, representando o esforço mecânico de substituição. Com taxa
+# zero (padrão) o custo fica no bloco fixo de ATIVIDADES_BASE_PROJETO; com taxa positiva (por exemplo,
+# nas premissas editadas no dashboard) entra na estimativa como uma frente "Ajuste de Código".
+CATEGORIAS_AJUSTE_CODIGO = {
+    "REFATORACAO_PONTUAL": {
+        "nome": "Refatoração e ajustes de rotinas identificadas",
+        "descricao": "Substituição do código legado por chamadas à nova solução central.",
+        "esforco_dev_por_ponto": 0.0,
+        "esforco_testes_por_ponto": 0.0,
+        "observacao": "Custo agora definido como um bloco fixo em ATIVIDADES_BASE_PROJETO."
+    }
+}
+
+
+# Margem para imprevistos sobre o total estimado
+BUFFER_PADRAO = 0.15
+
+# Contagens da análise usadas no preço -> métrica do sumário executivo que as guarda
+METRICAS_CONTAGENS = {'pontos_oficiais': 'Pontos Críticos (Oficiais)', 'rotinas_oficiais': 'Rotinas Oficiais Impactadas'}
+
+
+def premissas_padrao():
+    """Premissas editáveis: {'atividades': {frente: horas}, 'taxas': {categoria: horas por ponto}, 'buffer'}."""
+    return {
+        'atividades': {
+            chave: {campo: config[campo] for campo in CAMPOS_CATEGORIA.values()}
+            for chave, config in ATIVIDADES_BASE_PROJETO.items()
+        },
+        'taxas': {
+            chave: {campo: config[campo] for campo in ('esforco_dev_por_ponto', 'esforco_testes_por_ponto')}
+            for chave, config in CATEGORIAS_AJUSTE_CODIGO.items()
+        },
+        'buffer': BUFFER_PADRAO,
+    }
+
+
+def contar_pontos(df_ajustes):
+    """Contagens materializadas da análise: {'pontos_oficiais', 'rotinas_oficiais'}."""
+    if df_ajustes.empty:
+        return {'pontos_oficiais': 0, 'rotinas_oficiais': 0}
+    df_oficiais = df_ajustes[df_ajustes['Classificação'] == 'Oficiais']
+    return {'pontos_oficiais': len(df_oficiais), 'rotinas_oficiais': int(df_oficiais['Arquivo'].nunique())}
+
+
+def contagens_do_sumario(sumario):
+    """As mesmas contagens, lidas do sumário executivo já gravado."""
+    valores = dict(zip(sumario['Métrica'], sumario['Valor']))
+    return {chave: int(valores[metrica]) for chave, metrica in METRICAS_CONTAGENS.items() if metrica in valores}
+
+
+def montar_frentes(contagens, premissas):
+    """Frentes de trabalho com o esforço das premissas, no formato de ATIVIDADES_BASE_PROJETO.
+
+    As atividades base mantêm nome, descrição e incerteza; cada categoria com taxa por ponto
+    positiva vira uma frente "Ajuste de Código" com taxa × pontos oficiais (sem incerteza própria).
+    """
+    frentes = {
+        chave: {**ATIVIDADES_BASE_PROJETO[chave], **horas, 'tipo': 'Frente de Trabalho', 'pontos': None}
+        for chave, horas in premissas['atividades'].items()
+    }
+    pontos = contagens.get('pontos_oficiais', 0)
+    for chave, taxas in premissas['taxas'].items():
+        if taxas['esforco_dev_por_ponto'] <= 0 and taxas['esforco_testes_por_ponto'] <= 0:
+            continue
+        categoria = CATEGORIAS_AJUSTE_CODIGO[chave]
+        frentes[chave] = {
+            'nome': f"{categoria['nome']} (por ponto oficial)", 'descricao': categoria['descricao'],
+            'esforco_dev': round(taxas['esforco_dev_por_ponto'] * pontos),
+            'esforco_testes': round(taxas['esforco_testes_por_ponto'] * pontos),
+            'tipo': 'Ajuste de Código', 'pontos': pontos,
+        }
+    return frentes
+
+
+def estimar(contagens, premissas=None):
+    """Estimativa determinística sobre as contagens: {'sumario', 'estimativa'} (não sorteia cenários)."""
+    premissas = premissas or premissas_padrao()
+    frentes = montar_frentes(contagens, premissas)
+    estimativa = pd.DataFrame([
+        {
+            "Frente de Trabalho": config["nome"],
+            "Tipo": config["tipo"],
+            "Pontos Identificados": config["pontos"],
+            "Esforço Dev (h)": config["esforco_dev"],
+            "Esforço Testes (h)": config["esforco_testes"],
+            "Total (h)": config["esforco_dev"] + config["esforco_testes"],
+            "Observação": config["descricao"],
+        }
+        for config in frentes.values()
+    ], columns=list(ESQUEMA_ESTIMATIVA))
+
+    total_dev = int(estimativa["Esforço Dev (h)"].sum())
+    total_testes = int(estimativa["Esforço Testes (h)"].sum())
+    total_geral = total_dev + total_testes
+    buffer = premissas['buffer']
+    sumario = [
+        {"Métrica": "Esforço Desenvolvimento", "Valor": total_dev, "Unidade": "h"},
+        {"Métrica": "Esforço Testes QA", "Valor": total_testes, "Unidade": "h"},
+        {"Métrica": "Total Estimado", "Valor": total_geral, "Unidade": "h"},
+        {"Métrica": f"Estimativa com Buffer ({buffer:.0%})", "Valor": round(total_geral * (1 + buffer)), "Unidade": "h"},
+        {"Métrica": METRICAS_CONTAGENS['pontos_oficiais'], "Valor": contagens.get('pontos_oficiais', 0), "Unidade": "pontos"},
+        {"Métrica": METRICAS_CONTAGENS['rotinas_oficiais'], "Valor": contagens.get('rotinas_oficiais', 0), "Unidade": "rotinas"},
+    ]
+    return {
+        'sumario': aplicar_esquema(pd.DataFrame(sumario), ESQUEMA_SUMARIO),
+        'estimativa': aplicar_esquema(estimativa, ESQUEMA_ESTIMATIVA),
+    }
+
+
+def simular(contagens, premissas=None, cenarios=CENARIOS_PADRAO):
+    """Faixas de esforço (P50/P80/P95) das frentes das premissas: {'simulacao', 'simulacao_frentes', 'histograma'}."""
+    frentes = montar_frentes(contagens, premissas or premissas_padrao())
+    tabelas = resumir_simulacao(frentes, simular_esforco(frentes, INCERTEZA_CATEGORIAS_ESFORCO, cenarios))
+    return {
+        'simulacao': aplicar_esquema(tabelas['simulacao'], ESQUEMA_SIMULACAO),
+        'simulacao_frentes': aplicar_esquema(tabelas['simulacao_frentes'], ESQUEMA_SIMULACAO_FRENTES),
+        'histograma': aplicar_esquema(tabelas['histograma'], ESQUEMA_HISTOGRAMA),
+    }
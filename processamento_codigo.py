@@ -0,0 +1,362 @@
+# ⚙️ Processamento de código-fonte do Dashboard Interativo
+# Funções sem dependência do Streamlit, importáveis pelos processos de trabalho
+
+import re
+import os
+import codecs
+import hashlib
+import zipfile
+import numpy as np
+import pandas as pd
+from array import array
+from concurrent.futures import as_completed
+from typing import Dict, List, Any
+from indice_contexto import EXTENSOES_FONTES
+
+# Tamanho dos blocos lidos do upload (o conteúdo nunca é decodificado de uma vez)
+TAMANHO_BLOCO = 4 * 1024 * 1024
+LIMITE_CODIGO = 80
+# Arquivos de código aceitos no upload avulso e dentro dos ZIP: texto e fontes exportados
+EXTENSOES_CODIGO = ('.txt',) + EXTENSOES_FONTES
+COLUNAS_CATEGORICAS = ['Arquivo', 'Variável', 'Categoria', 'Motivo']
+
+ESTIMATIVAS_CATEGORIA = {
+    'Validação/Entrada': 0.8,
+    'Formatação/Exibição': 0.5,
+    'Lógica de Negócio': 1.8,
+    'Integrações Externas': 2.8,
+    'Estrutura de Dados': 0.9
+}
+
+def iterar_blocos(arquivo, tamanho_bloco: int = TAMANHO_BLOCO, progresso=None):
+    """Decodifica o arquivo em blocos de linhas inteiras (sem a quebra final) sem carregar o conteúdo inteiro"""
+    decodificador = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+    total_bytes = getattr(arquivo, 'size', None)
+    lidos = 0
+    resto = ''
+    
+    arquivo.seek(0)
+    while True:
+        bloco = arquivo.read(tamanho_bloco)
+        if not bloco:
+            break
+        lidos += len(bloco)
+        texto = resto + decodificador.decode(bloco)
+        corte = texto.rfind('\n')
+        if corte >= 0:
+            yield texto[:corte]
+            resto = texto[corte + 1:]
+        else:
+            resto = texto
+        if progresso:
+            progresso(lidos, total_bytes)
+    
+    # Mesma semântica de conteudo.split('\n'): o trecho após a última quebra também é uma linha
+    yield resto + decodificador.decode(b'', final=True)
+
+def iterar_linhas(arquivo, tamanho_bloco: int = TAMANHO_BLOCO, progresso=None):
+    """Gera as linhas do arquivo, bloco a bloco"""
+    for bloco in iterar_blocos(arquivo, tamanho_bloco, progresso):
+        yield from bloco.split('\n')
+
+def novo_buffer(colunas: Dict[str, str]) -> Dict[str, Any]:
+    """Cria buffers colunares: array tipado para números, listas para texto e categorias"""
+    return {
+        coluna: array(tipo) if tipo not in ('texto', 'categoria') else []
+        for coluna, tipo in colunas.items()
+    }
+
+def anexar(buffer: Dict[str, Any], *valores):
+    """Acrescenta uma linha aos buffers colunares (valores na ordem das colunas)"""
+    for destino, valor in zip(buffer.values(), valores):
+        destino.append(valor)
+
+def buffer_para_dataframe(buffer: Dict[str, Any]) -> pd.DataFrame:
+    """Converte os buffers em DataFrame sem passar por listas de dicionários"""
+    colunas = {}
+    for coluna, destino in buffer.items():
+        if isinstance(destino, array):
+            colunas[coluna] = np.frombuffer(destino, dtype=destino.typecode) if len(destino) else np.empty(0, dtype=destino.typecode)
+        elif coluna in COLUNAS_CATEGORICAS:
+            colunas[coluna] = pd.Categorical(destino)
+        else:
+            colunas[coluna] = destino
+    return pd.DataFrame(colunas)
+
+def resumir_codigo(linha_limpa: str) -> str:
+    """Trunca o código exibido nos resultados"""
+    return linha_limpa[:LIMITE_CODIGO] + '...' if len(linha_limpa) > LIMITE_CODIGO else linha_limpa
+
+def novos_buffers(extras: Dict[str, str] = None) -> tuple:
+    """Buffers de (pontos, não classificados, descartados), com colunas extras à esquerda"""
+    extras = extras or {}
+    return (
+        novo_buffer({**extras, 'Linha': 'q', 'Código': 'texto', 'Variável': 'categoria', 'Categoria': 'categoria', 'Estimativa (h)': 'd'}),
+        novo_buffer({**extras, 'Linha': 'q', 'Código': 'texto', 'Variável': 'categoria'}),
+        novo_buffer({**extras, 'Linha': 'q', 'Código': 'texto', 'Motivo': 'categoria'})
+    )
+
+def processar_codigo(linhas) -> tuple:
+    """Processa as linhas de código em fluxo e identifica pontos CNPJ.
+    
+    Retorna (pontos, nao_classificados, descartados, total_linhas) com os resultados em DataFrames.
+    """
+    buffers = novos_buffers()
+    total_linhas = varrer_linhas(linhas, buffers)
+    return tuple(buffer_para_dataframe(b) for b in buffers) + (total_linhas,)
+
+# === MOTOR DE VARREDURA (COMPILADO UMA VEZ POR PROCESSO) ===
+# A ordem das listas define a prioridade: vale o primeiro identificador/regra/palavra que casar
+IDENTIFICADORES_CNPJ = ['cnpj', 'CNPJ', 'Cgc', 'cgc', 'CGC', 'CadNacPesJur', 'cadNacPesJur', 'CADNACPESJUR']
+
+# Regra de descarte, motivo exibido (mesmo texto das versões anteriores) e literal,
+# em maiúsculas, presente em toda linha que a regra aceita
+REGRAS_DESCARTE = [
+    (r'^\s*\*', '^*', '*'), (r'^\s*//', '^//', '//'), (r'^\s*REM\s', '^REMs', 'REM'),
+    (r'STRING\s*\(', 'STRING(', 'STRING'), (r'WRITE\s*\(', 'WRITE(', 'WRITE'),
+    (r'DISPLAY\s', 'DISPLAYs', 'DISPLAY'), (r'EXHIBIT\s', 'EXHIBITs', 'EXHIBIT')
+]
+
+PALAVRAS_CATEGORIA = [
+    ('Validação/Entrada', ['VALIDATE', 'CHECK', 'IF', 'WHEN', 'PERFORM']),
+    ('Formatação/Exibição', ['DISPLAY', 'WRITE', 'MOVE', 'STRING']),
+    ('Lógica de Negócio', ['COMPUTE', 'ADD', 'EVALUATE', 'SEARCH']),
+    ('Integrações Externas', ['EXEC', 'SQL', 'SELECT', 'CICS', 'DB2']),
+    ('Estrutura de Dados', ['REDEFINES', 'OCCURS', 'PIC', 'VALUE'])
+]
+
+# Identificadores são palavras inteiras e distintas: as ocorrências nunca se sobrepõem,
+# então percorrê-las em sequência encontra todas, e o grupo nomeado diz qual casou
+PADRAO_CNPJ = re.compile(
+    r'\b(?:' + '|'.join(f'(?P<c{n}>{re.escape(p)})' for n, p in enumerate(IDENTIFICADORES_CNPJ)) + r')\b'
+)
+PRIORIDADE_CNPJ = {f'c{n}': n for n in range(len(IDENTIFICADORES_CNPJ))}
+
+# Cada regra vira um lookahead a partir do início da linha; a alternância testa na ordem da lista
+PADRAO_DESCARTE = re.compile(
+    '|'.join(
+        f'(?={"" if regra.startswith("^") else ".*?"}{regra.lstrip("^")})(?P<d{n}>)'
+        for n, (regra, _, _) in enumerate(REGRAS_DESCARTE)
+    ),
+    re.IGNORECASE | re.DOTALL
+)
+MOTIVO_DESCARTE = {f'd{n}': motivo for n, (_, motivo, _) in enumerate(REGRAS_DESCARTE)}
+
+# Tabela palavra -> categoria, na ordem de prioridade das categorias
+CATEGORIA_PALAVRA = [(palavra, categoria) for categoria, palavras in PALAVRAS_CATEGORIA for palavra in palavras]
+
+# Pré-filtro por bloco: uma linha ASCII sem estes literais não é descartada nem cita CNPJ
+LITERAIS_DESCARTE = sorted({literal.encode() for _, _, literal in REGRAS_DESCARTE})
+LITERAIS_CNPJ = sorted({p.upper().encode() for p in IDENTIFICADORES_CNPJ})
+
+# Versão das regras na chave do cache de resultados, derivada das próprias regras: qualquer
+# mudança em padrões, motivos, categorias, estimativas ou arquivos aceitos invalida o cache
+VERSAO_REGRAS = hashlib.sha256(repr((
+    PADRAO_CNPJ.pattern, PADRAO_CNPJ.flags, PADRAO_DESCARTE.pattern, PADRAO_DESCARTE.flags, MOTIVO_DESCARTE,
+    CATEGORIA_PALAVRA, ESTIMATIVAS_CATEGORIA, LITERAIS_DESCARTE, LITERAIS_CNPJ, LIMITE_CODIGO, EXTENSOES_CODIGO
+)).encode()).hexdigest()
+
+def identificar_variavel(linha: str) -> str:
+    """Identificador CNPJ de maior prioridade presente na linha (ou None)"""
+    melhor = None
+    ocorrencia = PADRAO_CNPJ.search(linha)
+    while ocorrencia:
+        prioridade = PRIORIDADE_CNPJ[ocorrencia.lastgroup]
+        if melhor is None or prioridade < melhor:
+            melhor = prioridade
+            if melhor == 0:
+                break
+        ocorrencia = PADRAO_CNPJ.search(linha, ocorrencia.end())
+    return None if melhor is None else IDENTIFICADORES_CNPJ[melhor]
+
+def categorizar_linha(linha: str) -> str:
+    """Categoriza linha de código"""
+    linha_upper = linha.upper()
+    for palavra, categoria in CATEGORIA_PALAVRA:
+        if palavra in linha_upper:
+            return categoria
+    return None
+
+def registrar_linha(buffers: tuple, i: int, linha_limpa: str, extras: tuple, verificar_descarte: bool = True):
+    """Classifica uma linha não vazia e a acrescenta ao buffer correspondente"""
+    pontos, nao_classificados, descartados = buffers
+    
+    # Verificar descarte
+    if verificar_descarte:
+        descarte = PADRAO_DESCARTE.match(linha_limpa)
+        if descarte:
+            anexar(descartados, *extras, i, resumir_codigo(linha_limpa), MOTIVO_DESCARTE[descarte.lastgroup])
+            return
+    
+    # Procurar CNPJ
+    variavel = identificar_variavel(linha_limpa)
+    if not variavel:
+        return
+    categoria = categorizar_linha(linha_limpa)
+    
+    if categoria:
+        anexar(pontos, *extras, i, resumir_codigo(linha_limpa), variavel, categoria, ESTIMATIVAS_CATEGORIA.get(categoria, 1.0))
+    else:
+        anexar(nao_classificados, *extras, i, resumir_codigo(linha_limpa), variavel)
+
+def varrer_linhas(linhas, buffers: tuple, **extras) -> int:
+    """Classifica as linhas, acrescentando os resultados aos buffers; retorna o total de linhas"""
+    extras = tuple(extras.values())
+    i = 0
+    for i, linha in enumerate(linhas, 1):
+        linha_limpa = linha.strip()
+        if linha_limpa:
+            registrar_linha(buffers, i, linha_limpa, extras)
+    return i
+
+def _linhas_com(literais: List[bytes], texto: bytes, quebras: np.ndarray) -> np.ndarray:
+    """Índices (ordenados, sem repetição) das linhas do texto que contêm algum dos literais"""
+    posicoes = [
+        ocorrencia.start()
+        for literal in literais
+        for ocorrencia in re.finditer(re.escape(literal), texto)
+    ]
+    return np.unique(np.searchsorted(quebras, np.array(posicoes, dtype=np.int64)))
+
+def linhas_candidatas(bloco: str) -> tuple:
+    """Quebras de linha do bloco, linhas que podem gerar resultado e quais delas podem ser descartadas"""
+    # Cada caractere não ASCII vira um único '?': as posições continuam alinhadas com o texto,
+    # e essas linhas passam sempre pelas regex (IGNORECASE também casa alguns caracteres Unicode)
+    maiusculas = bloco.encode('ascii', 'replace').upper()
+    quebras = np.flatnonzero(np.frombuffer(maiusculas, dtype=np.uint8) == 10)
+    
+    nao_ascii = [] if bloco.isascii() else [b'?']
+    com_descarte = _linhas_com(LITERAIS_DESCARTE + nao_ascii, maiusculas, quebras)
+    com_cnpj = _linhas_com(LITERAIS_CNPJ, maiusculas, quebras)
+    candidatas = np.union1d(com_descarte, com_cnpj)
+    return quebras, candidatas, np.isin(candidatas, com_descarte)
+
+def varrer_blocos(blocos, buffers: tuple, **extras) -> int:
+    """Como varrer_linhas, mas só as linhas candidatas de cada bloco chegam às regex"""
+    extras = tuple(extras.values())
+    total = 0
+    for bloco in blocos:
+        quebras, candidatas, pode_descartar = linhas_candidatas(bloco)
+        limites = np.concatenate(([-1], quebras, [len(bloco)]))
+        for indice, inicio, fim, verificar_descarte in zip(
+            candidatas.tolist(), (limites[candidatas] + 1).tolist(), limites[candidatas + 1].tolist(), pode_descartar.tolist()
+        ):
+            linha_limpa = bloco[inicio:fim].strip()
+            if linha_limpa:
+                registrar_linha(buffers, total + indice + 1, linha_limpa, extras, verificar_descarte)
+        total += len(quebras) + 1
+    return total
+
+# === PROCESSAMENTO DE MÚLTIPLOS ARQUIVOS ===
+# Arquivos pequenos são agrupados em lotes para diluir o custo de envio aos processos
+TAMANHO_LOTE = 8 * 1024 * 1024
+ARQUIVOS_POR_LOTE = 200
+
+def eh_membro_codigo(info: zipfile.ZipInfo) -> bool:
+    """Membro de ZIP com código: ignora pastas, __MACOSX/, arquivos ocultos e outras extensões"""
+    *pastas, nome = info.filename.split('/')
+    return (not info.is_dir() and '__MACOSX' not in pastas and not nome.startswith('.')
+            and nome.lower().endswith(EXTENSOES_CODIGO))
+
+def listar_entradas(caminhos: List[tuple]) -> List[tuple]:
+    """Expande uploads (TXT ou ZIP) em entradas (caminho, membro, nome, tamanho)"""
+    entradas = []
+    for caminho, nome in caminhos:
+        if zipfile.is_zipfile(caminho):
+            with zipfile.ZipFile(caminho) as arquivo_zip:
+                for info in arquivo_zip.infolist():
+                    if eh_membro_codigo(info):
+                        entradas.append((caminho, info.filename, f"{nome}/{info.filename}", info.file_size))
+        else:
+            entradas.append((caminho, None, nome, os.path.getsize(caminho)))
+    return entradas
+
+def montar_lotes(entradas: List[tuple]) -> List[List[tuple]]:
+    """Ordena do maior para o menor e agrupa arquivos pequenos em lotes"""
+    lotes, atual, tamanho_atual = [], [], 0
+    for entrada in sorted(entradas, key=lambda e: e[3], reverse=True):
+        if entrada[3] >= TAMANHO_LOTE:
+            lotes.append([entrada])
+            continue
+        atual.append(entrada)
+        tamanho_atual += entrada[3]
+        if tamanho_atual >= TAMANHO_LOTE or len(atual) >= ARQUIVOS_POR_LOTE:
+            lotes.append(atual)
+            atual, tamanho_atual = [], 0
+    if atual:
+        lotes.append(atual)
+    return lotes
+
+def processar_lote(lote: List[tuple], progresso=None) -> tuple:
+    """Processa um lote de entradas; cada membro de ZIP é lido em fluxo, sem extração para disco.
+    
+    Retorna (pontos, nao_classificados, descartados, linhas_por_arquivo) do lote inteiro.
+    """
+    buffers = novos_buffers({'Arquivo': 'categoria'})
+    linhas_por_arquivo = {}
+    zips_abertos = {}
+    lidos_antes = 0
+    try:
+        for caminho, membro, nome, tamanho in lote:
+            progresso_arquivo = None
+            if progresso:
+                progresso_arquivo = lambda lidos, _total, base=lidos_antes: progresso(base + lidos)
+            if membro is None:
+                with open(caminho, 'rb') as arquivo:
+                    total = varrer_blocos(iterar_blocos(arquivo, progresso=progresso_arquivo), buffers, Arquivo=nome)
+            else:
+                if caminho not in zips_abertos:
+                    zips_abertos[caminho] = zipfile.ZipFile(caminho)
+                with zips_abertos[caminho].open(membro) as arquivo:
+                    total = varrer_blocos(iterar_blocos(arquivo, progresso=progresso_arquivo), buffers, Arquivo=nome)
+            linhas_por_arquivo[nome] = total
+            lidos_antes += tamanho
+    finally:
+        for arquivo_zip in zips_abertos.values():
+            arquivo_zip.close()
+    return tuple(buffer_para_dataframe(b) for b in buffers) + (linhas_por_arquivo,)
+
+def combinar_resultados(resultados: List[tuple]) -> tuple:
+    """Junta os resultados dos lotes em ordem de arquivo, independente da ordem de conclusão"""
+    if not resultados:
+        # Envio sem arquivos de código: tabelas vazias com as colunas de sempre
+        resultados = [tuple(buffer_para_dataframe(b) for b in novos_buffers({'Arquivo': 'categoria'})) + ({},)]
+    
+    linhas_por_arquivo = {}
+    for resultado in resultados:
+        linhas_por_arquivo.update(resultado[3])
+    
+    combinados = []
+    for posicao in range(3):
+        df = pd.concat([r[posicao] for r in resultados], ignore_index=True)
+        df = df.sort_values('Arquivo', kind='stable', key=lambda c: c.astype(str)).reset_index(drop=True)
+        for coluna in COLUNAS_CATEGORICAS:
+            if coluna in df.columns:
+                df[coluna] = df[coluna].astype(str).astype('category')
+        combinados.append(df)
+    return combinados[0], combinados[1], combinados[2], dict(sorted(linhas_por_arquivo.items()))
+
+def processar_em_paralelo(entradas: List[tuple], executor=None, progresso=None) -> tuple:
+    """Processa as entradas em um pool de processos, maiores arquivos primeiro"""
+    total_bytes = sum(e[3] for e in entradas) or 1
+    lidos = 0
+    resultados = []
+    
+    lotes = montar_lotes(entradas)
+    if executor is None or len(lotes) == 1:
+        # Um único lote: processar aqui mesmo evita o custo de enviar dados aos processos
+        for lote in lotes:
+            base = lidos
+            resultados.append(processar_lote(lote, progresso and (lambda l, base=base: progresso(min(base + l, total_bytes), total_bytes))))
+            lidos += sum(e[3] for e in lote)
+            if progresso:
+                progresso(lidos, total_bytes)
+    else:
+        futuros = {executor.submit(processar_lote, lote): lote for lote in lotes}
+        for futuro in as_completed(futuros):
+            resultados.append(futuro.result())
+            lidos += sum(e[3] for e in futuros[futuro])
+            if progresso:
+                progresso(lidos, total_bytes)
+    
+    return combinar_resultados(resultados)
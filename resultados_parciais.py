@@ -0,0 +1,185 @@
+# 🧩 Resultados parciais mescláveis (análise distribuída)
+# Cada máquina analisa uma fatia da entrada (uma faixa de bytes de um texto ou uma lista de
+# entradas) e grava um resultado parcial autodescritivo: um Parquet com as linhas únicas agrupadas
+# e seus vereditos, as linhas ignoradas (com o número de ocorrências) e, nos metadados, os termos,
+# as fatias cobertas e os totais. Cada linha única guarda a posição da sua primeira ocorrência
+# (entrada, início da fatia, ordem na fatia): na mescla, o código é o da menor posição e os termos
+# são unidos, como na leitura sequencial, e só as linhas cujos termos mudaram são reclassificadas.
+# A mescla de parciais gera outro parcial, ordenado pela posição: é associativa e não depende da
+# ordem dos parciais, e a mescla de todas as fatias de uma entrada é igual à análise completa.
+
+import os
+import json
+import zlib
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from analise_cnpj import (
+    Veredito, RESULTADO_AJUSTE, RESULTADO_IGNORADA, REGRAS_PADRAO, classificar_agrupamento, classificar_arquivo, coletar
+)
+
+# Muda quando o conteúdo do parcial muda: parciais de outra versão não são mesclados
+VERSAO_PARCIAL = 1
+METADADOS_PARCIAL = b'cnpj_parcial'
+
+COLUNAS_POSICAO = ['entrada', 'inicio', 'ordem']
+CAMPOS_VEREDITO = list(Veredito._fields)
+COLUNAS_PONTOS = COLUNAS_POSICAO + ['termos'] + CAMPOS_VEREDITO
+COLUNAS_IGNORADAS = ['motivo', 'codigo', 'ocorrencias']
+
+
+def identificar_parcial(termos, fontes=None):
+    """Identidade da análise: só parciais dos mesmos termos, regras e fontes são mesclados."""
+    identidade = {
+        'versao': VERSAO_PARCIAL,
+        'termos': sorted(termos.items()),
+        'regras': zlib.crc32(repr(REGRAS_PADRAO).encode('utf-8')),
+        'fontes': fontes,
+    }
+    return json.loads(json.dumps(identidade))
+
+
+def resumir(pontos, ignoradas):
+    """Totais do parcial (recalculados a cada mescla): pontos por resultado e classificação, ignoradas por motivo."""
+    ajustes = pontos[pontos['resultado'] == RESULTADO_AJUSTE]
+    classificacoes = ajustes['arquivo'].map({arquivo: classificar_arquivo(arquivo) for arquivo in ajustes['arquivo'].unique()})
+    return {
+        'pontos': {str(k): int(v) for k, v in pontos['resultado'].value_counts().sort_index().items()},
+        'ajustes_por_classificacao': {
+            str(k): int(v) for k, v in classificacoes.value_counts().sort_index().items()
+        },
+        'rotinas_com_ajuste': int(ajustes['arquivo'].nunique()),
+        'ignoradas': {str(k): int(v) for k, v in ignoradas.groupby('motivo')['ocorrencias'].sum().items()},
+    }
+
+
+def _ordenar(pontos, ignoradas):
+    pontos = pontos.sort_values(COLUNAS_POSICAO, kind='stable').reset_index(drop=True)[COLUNAS_PONTOS]
+    ignoradas = (ignoradas.groupby(['motivo', 'codigo'], sort=True)['ocorrencias'].sum().reset_index()
+                 if len(ignoradas) else pd.DataFrame(columns=COLUNAS_IGNORADAS))
+    return pontos, ignoradas.astype({'ocorrencias': 'int64'})
+
+
+def montar_parcial(identidade, entradas, fatias, agrupamentos, regras=None, contexto=None):
+    """Resultado parcial da análise de uma ou mais fatias.
+
+    `entradas` é {nome: {'tamanho', 'formato', 'partes'}}, `fatias` a lista [nome, parte, partes]
+    coberta e `agrupamentos` a lista (nome da entrada, início da fatia, linhas únicas, vereditos das
+    ignoradas) da Etapa 1 de cada fatia. As linhas únicas são classificadas aqui (Etapa 2).
+    """
+    pontos, ignoradas = [], []
+    for entrada, inicio, linhas_unicas, vereditos_ignoradas in agrupamentos:
+        vereditos = classificar_agrupamento(linhas_unicas, regras, contexto)
+        for ordem, (veredito, (_, termos_encontrados)) in enumerate(zip(vereditos, linhas_unicas.values())):
+            pontos.append((entrada, inicio, ordem, json.dumps(termos_encontrados, ensure_ascii=False), *veredito))
+        ignoradas.extend((v.motivo, v.codigo, 1) for v in vereditos_ignoradas)
+    pontos, ignoradas = _ordenar(pd.DataFrame(pontos, columns=COLUNAS_PONTOS),
+                                 pd.DataFrame(ignoradas, columns=COLUNAS_IGNORADAS))
+    metadados = {
+        'identidade': identidade,
+        'entradas': dict(sorted(entradas.items())),
+        'fatias': sorted(fatias),
+        'resumo': resumir(pontos, ignoradas),
+    }
+    return {'metadados': metadados, 'pontos': pontos, 'ignoradas': ignoradas}
+
+
+def mesclar_parciais(parciais, regras=None, contexto=None):
+    """Mescla resultados parciais em um novo parcial (associativa e independente da ordem).
+
+    Levanta ValueError se os parciais são de análises diferentes ou cobrem a mesma fatia.
+    """
+    identidade = parciais[0]['metadados']['identidade']
+    entradas, fatias = {}, set()
+    for parcial in parciais:
+        metadados = parcial['metadados']
+        if metadados['identidade'] != identidade:
+            raise ValueError("Resultados parciais de termos, regras ou fontes diferentes não podem ser mesclados.")
+        for nome, info in metadados['entradas'].items():
+            if entradas.setdefault(nome, info) != info:
+                raise ValueError(f"A entrada '{nome}' foi dividida de formas diferentes (ou mudou) entre os parciais.")
+        for nome, parte, partes in metadados['fatias']:
+            if (nome, parte, partes) in fatias:
+                raise ValueError(f"A fatia {parte}/{partes} de '{nome}' aparece em mais de um resultado parcial.")
+            fatias.add((nome, parte, partes))
+
+    pontos = pd.concat([p['pontos'] for p in parciais], ignore_index=True)
+    pontos = pontos.sort_values(COLUNAS_POSICAO, kind='stable').reset_index(drop=True)
+    repetidos = pontos.duplicated(['arquivo', 'localizador'], keep=False).to_numpy()
+    if repetidos.any():
+        # Mesma linha única em mais de uma fatia: código da primeira ocorrência e termos de todas
+        mesclados = []
+        for (arquivo, localizador), grupo in pontos[repetidos].groupby(['arquivo', 'localizador'], sort=False):
+            primeira = grupo.iloc[0].to_dict()
+            termos_encontrados = {}
+            for termos in grupo['termos']:
+                termos_encontrados.update(json.loads(termos))
+            if termos_encontrados != json.loads(primeira['termos']):
+                linha = {(arquivo, localizador): (primeira['codigo'], termos_encontrados)}
+                veredito = next(classificar_agrupamento(linha, regras, contexto))
+                primeira.update(veredito._asdict(), termos=json.dumps(termos_encontrados, ensure_ascii=False))
+            mesclados.append(primeira)
+        pontos = pd.concat([pontos[~repetidos], pd.DataFrame(mesclados, columns=COLUNAS_PONTOS)], ignore_index=True)
+
+    pontos, ignoradas = _ordenar(pontos, pd.concat([p['ignoradas'] for p in parciais], ignore_index=True))
+    metadados = {
+        'identidade': identidade,
+        'entradas': dict(sorted(entradas.items())),
+        'fatias': sorted(list(fatia) for fatia in fatias),
+        'resumo': resumir(pontos, ignoradas),
+    }
+    return {'metadados': metadados, 'pontos': pontos, 'ignoradas': ignoradas}
+
+
+def fatias_faltantes(parcial):
+    """Fatias das entradas do parcial que ainda não foram mescladas: [(nome, parte, partes)]."""
+    cobertas = {tuple(fatia) for fatia in parcial['metadados']['fatias']}
+    return [
+        (nome, parte, info['partes'])
+        for nome, info in parcial['metadados']['entradas'].items()
+        for parte in range(1, info['partes'] + 1) if (nome, parte, info['partes']) not in cobertas
+    ]
+
+
+def salvar_parcial(parcial, caminho):
+    """Grava o parcial em um único Parquet: pontos e ignoradas (coluna `tipo`) e metadados no esquema."""
+    pontos = parcial['pontos'].assign(tipo='ponto', ocorrencias=1)
+    ignoradas = parcial['ignoradas'].assign(tipo='ignorada', resultado=RESULTADO_IGNORADA)
+    tabela = pa.Table.from_pandas(pd.concat([pontos, ignoradas], ignore_index=True), preserve_index=False)
+    tabela = tabela.replace_schema_metadata({
+        METADADOS_PARCIAL: json.dumps(parcial['metadados'], ensure_ascii=False).encode('utf-8')
+    })
+    # Gravado à parte e renomeado: um parcial pela metade nunca é visto por quem mescla
+    temporario = f"{caminho}.tmp"
+    pq.write_table(tabela, temporario)
+    os.replace(temporario, caminho)
+
+
+def carregar_parcial(caminho):
+    """Lê um parcial gravado por salvar_parcial; ValueError se o arquivo não é um resultado parcial."""
+    tabela = pq.read_table(caminho)
+    metadados = (tabela.schema.metadata or {}).get(METADADOS_PARCIAL)
+    if metadados is None:
+        raise ValueError(f"'{caminho}' não é um resultado parcial da análise.")
+    metadados = json.loads(metadados)
+    if metadados['identidade'].get('versao') != VERSAO_PARCIAL:
+        raise ValueError(f"'{caminho}' é um resultado parcial de outra versão da análise.")
+    df = tabela.to_pandas()
+    eh_ponto = (df['tipo'] == 'ponto').to_numpy()
+    pontos = df[eh_ponto][COLUNAS_PONTOS].reset_index(drop=True)
+    pontos[['inicio', 'ordem']] = pontos[['inicio', 'ordem']].astype('int64')
+    ignoradas = df[~eh_ponto][COLUNAS_IGNORADAS].reset_index(drop=True).astype({'ocorrencias': 'int64'})
+    return {'metadados': metadados, 'pontos': pontos, 'ignoradas': ignoradas}
+
+
+def resultado_do_parcial(parcial):
+    """{'ajustes', 'descartes', 'linhas_ignoradas'} do parcial, como analise_cnpj.coletar (para os relatórios)."""
+    campos = parcial['pontos'][CAMPOS_VEREDITO].astype(object)
+    campos = campos.where(campos.notna(), None)
+    resultado = coletar(Veredito(*valores) for valores in campos.itertuples(index=False, name=None))
+    resultado['linhas_ignoradas'] = [
+        f"{motivo}: {codigo}"
+        for motivo, codigo, ocorrencias in parcial['ignoradas'].itertuples(index=False, name=None)
+        for _ in range(ocorrencias)
+    ]
+    return resultado
@@ -0,0 +1,176 @@
+# 💾 Pontos de retomada da análise
+# A análise grava seu progresso em um log somente de acréscimo: um cabeçalho que identifica a
+# entrada, um registro por trecho agrupado (Etapa 1: posição já lida + agrupamento parcial do trecho),
+# um marcador de fim da Etapa 1 e um registro por lote de linhas únicas classificadas (Etapa 2).
+# Os registros são gravados com marshal (tipos básicos, bem mais rápido que pickle para os agrupamentos)
+# e cada um leva tamanho e CRC; um registro incompleto (processo morto no meio da gravação) é
+# descartado na leitura. Com `retomar`, a análise continua do último registro íntegro e, como os
+# trechos são mesclados na ordem da entrada (analise_cnpj.mesclar_agrupamentos), o resultado é
+# igual ao de uma execução sem interrupção. O log é apagado ao fim da análise.
+
+import os
+import mmap
+import marshal
+import struct
+import zlib
+from itertools import islice
+from analise_cnpj import Veredito, agrupar, mesclar_agrupamentos, classificar_agrupamento
+from leitura_paralela import faixas_alinhadas, agrupar_faixas
+
+ARQUIVO_CHECKPOINT = 'analise_checkpoint.log'
+# Trechos da entrada entre pontos de retomada: bytes no texto simples, linhas nas demais entradas
+TAMANHO_TRECHO = int(os.environ.get("CNPJ_CHECKPOINT_MB", "32")) * 1024 * 1024
+LINHAS_TRECHO = 500_000
+# Linhas únicas classificadas entre pontos de retomada da Etapa 2
+LOTE_CLASSIFICACAO = 50_000
+# Muda quando o conteúdo dos registros muda: logs de outra versão não são retomados
+VERSAO_LOG = 1
+
+# Cabeçalho de cada registro: tamanho e CRC32 do conteúdo (marshal)
+CABECALHO_REGISTRO = struct.Struct('<II')
+
+
+def identificar_entrada(caminho, termos, formato, **extras):
+    """Identidade da análise no cabeçalho do log: só um log da mesma entrada e termos é retomado."""
+    estado = os.stat(caminho)
+    return {
+        'versao': (VERSAO_LOG, marshal.version),
+        'entrada': (os.path.abspath(caminho), estado.st_size, estado.st_mtime_ns),
+        'termos': sorted(termos.items()),
+        'formato': formato,
+        **extras,
+    }
+
+
+def gravar_registro(arquivo, registro):
+    """Acrescenta um registro ao log e o força para o disco."""
+    conteudo = marshal.dumps(registro)
+    arquivo.write(CABECALHO_REGISTRO.pack(len(conteudo), zlib.crc32(conteudo)))
+    arquivo.write(conteudo)
+    arquivo.flush()
+    os.fsync(arquivo.fileno())
+
+
+def ler_registros(caminho):
+    """(registros íntegros, em ordem; posição do fim do último deles no arquivo)."""
+    registros, fim = [], 0
+    with open(caminho, 'rb') as arquivo:
+        while True:
+            cabecalho = arquivo.read(CABECALHO_REGISTRO.size)
+            if len(cabecalho) < CABECALHO_REGISTRO.size:
+                break
+            tamanho, crc = CABECALHO_REGISTRO.unpack(cabecalho)
+            conteudo = arquivo.read(tamanho)
+            if len(conteudo) < tamanho or zlib.crc32(conteudo) != crc:
+                break
+            try:
+                registros.append(marshal.loads(conteudo))
+            except Exception:
+                break
+            fim = arquivo.tell()
+    return registros, fim
+
+
+def abrir_log(caminho, identidade, retomar=False, log=print):
+    """Abre o log para acréscimo; retorna (arquivo, progresso recuperado).
+
+    O progresso é {'posicao', 'parciais', 'agrupado', 'lotes'}: vazio se não há o que retomar.
+    """
+    progresso = {'posicao': 0, 'parciais': [], 'agrupado': False, 'lotes': []}
+    if retomar and os.path.exists(caminho):
+        registros, fim = ler_registros(caminho)
+        if registros and registros[0] == {'tipo': 'cabecalho', 'identidade': identidade}:
+            for registro in registros[1:]:
+                if registro['tipo'] == 'trecho':
+                    progresso['posicao'] = registro['posicao']
+                    linhas_unicas, ignoradas = registro['parcial']
+                    progresso['parciais'].append((linhas_unicas, [Veredito._make(v) for v in ignoradas]))
+                elif registro['tipo'] == 'agrupado':
+                    progresso['agrupado'] = True
+                elif registro['tipo'] == 'lote':
+                    progresso['lotes'].append([Veredito._make(v) for v in registro['vereditos']])
+            arquivo = open(caminho, 'r+b')
+            arquivo.truncate(fim)  # Descarta um registro incompleto no fim
+            arquivo.seek(fim)
+            etapa = (f"{len(progresso['lotes'])} lotes classificados" if progresso['agrupado']
+                     else f"{len(progresso['parciais'])} trechos agrupados")
+            log(f"Retomando a análise do ponto salvo em '{caminho}': {etapa}")
+            return arquivo, progresso
+        log(f"AVISO: o ponto de retomada '{caminho}' é de outra entrada ou versão; a análise recomeça do início.")
+
+    arquivo = open(caminho, 'wb')
+    gravar_registro(arquivo, {'tipo': 'cabecalho', 'identidade': identidade})
+    return arquivo, progresso
+
+
+def trechos_texto(caminho, termos, formato, processos=1):
+    """Etapa 1 de um texto simples em trechos de TAMANHO_TRECHO: função posição -> [(posição final, parcial)]."""
+    def trechos(inicio):
+        if os.path.getsize(caminho) == 0:
+            return  # Arquivo vazio não pode ser mapeado em memória: nenhum trecho a agrupar
+        with open(caminho, 'rb') as arquivo, mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+            partes = max(1, -(-(len(mapa) - inicio) // TAMANHO_TRECHO))
+            faixas = faixas_alinhadas(mapa, partes, inicio)
+        # Os processos agrupam as faixas em paralelo; os parciais chegam (e são gravados) na ordem
+        yield from zip((fim for _, fim in faixas), agrupar_faixas(caminho, faixas, termos, formato, processos))
+    return trechos
+
+
+def trechos_linhas(linhas, termos, formato):
+    """Etapa 1 de um iterável de linhas em trechos de LINHAS_TRECHO: posição (linhas já lidas) -> parciais."""
+    def trechos(inicio):
+        registros = iter(linhas)
+        for _ in islice(registros, inicio):
+            pass  # Entradas comprimidas e pacotes não têm acesso direto: as linhas já agrupadas são puladas
+        posicao = inicio
+        while True:
+            trecho = list(islice(registros, LINHAS_TRECHO))
+            if not trecho:
+                return
+            posicao += len(trecho)
+            yield posicao, agrupar(trecho, termos, formato)
+    return trechos
+
+
+def _consumir(lista):
+    while lista:
+        yield lista.pop(0)
+
+
+def analisar_com_retomada(caminho_log, identidade, trechos, retomar=False, regras=None, contexto=None, log=print):
+    """Como analise_cnpj.analisar, gravando pontos de retomada em `caminho_log`.
+
+    `trechos(posição)` gera (posição final, agrupamento parcial) da Etapa 1 a partir de uma posição
+    da entrada (trechos_texto ou trechos_linhas). Retorna a lista de vereditos, na mesma ordem.
+    """
+    arquivo, progresso = abrir_log(caminho_log, identidade, retomar, log)
+    with arquivo:
+        def novos_trechos():
+            if progresso['agrupado']:
+                return
+            for posicao, parcial in trechos(progresso['posicao']):
+                linhas_unicas, ignoradas = parcial
+                gravar_registro(arquivo, {'tipo': 'trecho', 'posicao': posicao,
+                                          'parcial': (linhas_unicas, [tuple(v) for v in ignoradas])})
+                yield parcial
+            gravar_registro(arquivo, {'tipo': 'agrupado'})
+
+        parciais = _consumir(progresso['parciais'])
+        linhas_unicas, vereditos = mesclar_agrupamentos(
+            parcial for origem in (parciais, novos_trechos()) for parcial in origem
+        )
+
+        # Etapa 2 em lotes: os já classificados vêm do log, na ordem das linhas únicas
+        itens = iter(linhas_unicas.items())
+        for lote in progresso['lotes']:
+            for _ in islice(itens, len(lote)):
+                pass
+            vereditos.extend(lote)
+        while True:
+            lote = list(classificar_agrupamento(dict(islice(itens, LOTE_CLASSIFICACAO)), regras, contexto))
+            if not lote:
+                break
+            gravar_registro(arquivo, {'tipo': 'lote', 'vereditos': [tuple(v) for v in lote]})
+            vereditos.extend(lote)
+    os.remove(caminho_log)
+    return vereditos
@@ -0,0 +1,315 @@
+# 🌐 Serviço HTTP de análise (sem Streamlit)
+# Recebe um dump do findStudio (ou .zip com o código-fonte) e a lista de termos, enfileira a análise
+# em um pool limitado de processos, transmite o progresso e devolve as tabelas em Parquet/JSON.
+#
+# Uso: python servico_analise.py [porta]
+#
+#   POST /analises                       multipart com os campos 'entrada' e 'termos' -> 202 {"id": ...}
+#   GET  /analises/<id>                  situação e tabelas disponíveis
+#   GET  /analises/<id>/progresso        mensagens da análise em fluxo (NDJSON) até o fim
+#   GET  /analises/<id>/tabelas/<nome>   tabela de resultado (?formato=parquet|json)
+
+import os
+import sys
+import json
+import time
+import uuid
+import shutil
+import tempfile
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+import pandas as pd
+
+HOST = os.environ.get("CNPJ_API_HOST", "127.0.0.1")
+PORTA = int(os.environ.get("CNPJ_API_PORT", "8765"))
+PASTA_TRABALHOS = os.environ.get("CNPJ_API_DIR", os.path.join(tempfile.gettempdir(), "cnpj_analises"))
+# Análises executadas ao mesmo tempo (processos) e análises aceitas ainda não concluídas
+TRABALHADORES = int(os.environ.get("CNPJ_API_WORKERS", str(min(4, os.cpu_count() or 1))))
+LIMITE_FILA = int(os.environ.get("CNPJ_API_QUEUE", "32"))
+# Tamanho máximo do corpo de um envio
+LIMITE_ENVIO = 1024 * 1024 * 1024
+# Intervalo de leitura do arquivo de progresso durante o fluxo
+INTERVALO_PROGRESSO = 0.2
+# Tempo (s) que um trabalho concluído fica disponível antes de ser apagado
+TEMPO_RETENCAO = 3600
+
+ARQUIVO_PROGRESSO = "progresso.log"
+ARQUIVO_RESULTADO = "resultado.json"
+
+
+# === EXECUÇÃO (processo trabalhador) ===
+def _executar_trabalho(pasta):
+    """Roda a análise de um trabalho e grava as tabelas em Parquet na pasta do trabalho."""
+    # Importado no processo trabalhador: o servidor HTTP não carrega o motor de análise
+    from main import (
+        executar_analise, preparar_relatorio, calcular_precificacao, calcular_resumo
+    )
+    from esquemas import ESQUEMA_AJUSTES, ESQUEMA_DESCARTES
+
+    with open(os.path.join(pasta, ARQUIVO_PROGRESSO), 'a', encoding='utf-8', buffering=1) as progresso:
+        def log(mensagem):
+            progresso.write(mensagem.strip('\n') + '\n')
+
+        # Cada trabalho já ocupa um processo do pool: a leitura da entrada fica sequencial. Os trabalhos
+        # trazem só a entrada e os termos (sem a pasta de fontes do servidor)
+        resultado = executar_analise(
+            os.path.join(pasta, 'entrada'), os.path.join(pasta, 'termos.csv'), log, processos=1, pasta_fontes=None
+        )
+        if resultado is None:
+            raise ValueError("Análise não executada: verifique o progresso do trabalho.")
+
+        tabelas = {}
+        if resultado['ajustes'] is not None:
+            tabelas['ajustes'] = preparar_relatorio(resultado['ajustes'], ESQUEMA_AJUSTES)
+            tabelas.update(calcular_precificacao(resultado['ajustes']))
+            tabelas['resumo'] = calcular_resumo(resultado['ajustes'])
+        if resultado['descartes'] is not None:
+            tabelas['descartes'] = preparar_relatorio(resultado['descartes'], ESQUEMA_DESCARTES)
+
+        linhas = {}
+        for nome, df in tabelas.items():
+            if df is not None:
+                df.to_parquet(os.path.join(pasta, f"{nome}.parquet"), index=False)
+                linhas[nome] = len(df)
+        log("Tabelas gravadas: " + ", ".join(f"{nome} ({n})" for nome, n in linhas.items()))
+
+    with open(os.path.join(pasta, ARQUIVO_RESULTADO), 'w', encoding='utf-8') as arquivo:
+        json.dump(linhas, arquivo, ensure_ascii=False)
+    return linhas
+
+
+# === FILA DE TRABALHOS ===
+def criar_fila(trabalhadores=TRABALHADORES, limite=LIMITE_FILA, pasta=PASTA_TRABALHOS):
+    """Estado do serviço: pool de processos e trabalhos aceitos."""
+    os.makedirs(pasta, exist_ok=True)
+    return {
+        # spawn: o servidor tem várias threads, e um fork herdaria travas em estado indefinido
+        'pool': ProcessPoolExecutor(max_workers=trabalhadores, mp_context=multiprocessing.get_context('spawn')),
+        'limite': limite,
+        'pasta': pasta,
+        'trabalhos': {},
+        'trava': threading.Lock(),
+    }
+
+
+def _limpar_expirados(fila):
+    """Remove trabalhos concluídos há mais de TEMPO_RETENCAO segundos (chamado com a trava)."""
+    limite = time.time() - TEMPO_RETENCAO
+    for id_trabalho, trabalho in list(fila['trabalhos'].items()):
+        if trabalho.get('concluido_em', limite) < limite:
+            del fila['trabalhos'][id_trabalho]
+            shutil.rmtree(trabalho['pasta'], ignore_errors=True)
+
+
+def enviar_trabalho(fila, entrada, termos):
+    """Grava os arquivos do trabalho e o enfileira; retorna o id ou None se a fila estiver cheia."""
+    # Os arquivos são gravados fora da trava: envios grandes não bloqueiam os demais
+    id_trabalho = uuid.uuid4().hex
+    pasta = os.path.join(fila['pasta'], id_trabalho)
+    os.makedirs(pasta)
+    with open(os.path.join(pasta, 'entrada'), 'wb') as arquivo:
+        arquivo.write(entrada)
+    with open(os.path.join(pasta, 'termos.csv'), 'wb') as arquivo:
+        arquivo.write(termos)
+
+    with fila['trava']:
+        _limpar_expirados(fila)
+        pendentes = sum(1 for t in fila['trabalhos'].values() if not t['futuro'].done())
+        if pendentes >= fila['limite']:
+            shutil.rmtree(pasta, ignore_errors=True)
+            return None
+        trabalho = {'pasta': pasta, 'futuro': fila['pool'].submit(_executar_trabalho, pasta)}
+        trabalho['futuro'].add_done_callback(lambda _: trabalho.update(concluido_em=time.time()))
+        fila['trabalhos'][id_trabalho] = trabalho
+    return id_trabalho
+
+
+def situacao(trabalho):
+    """Situação de um trabalho: na_fila, executando, concluida ou erro."""
+    futuro = trabalho['futuro']
+    if futuro.done():
+        erro = futuro.exception()
+        return {'status': 'erro', 'erro': str(erro)} if erro else {'status': 'concluida', 'tabelas': futuro.result()}
+    if os.path.exists(os.path.join(trabalho['pasta'], ARQUIVO_PROGRESSO)):
+        return {'status': 'executando'}
+    return {'status': 'na_fila'}
+
+
+def remover_trabalho(fila, id_trabalho):
+    """Esquece um trabalho concluído e apaga seus arquivos."""
+    with fila['trava']:
+        trabalho = fila['trabalhos'].pop(id_trabalho, None)
+    if trabalho:
+        shutil.rmtree(trabalho['pasta'], ignore_errors=True)
+
+
+def ler_multipart(tipo_conteudo, corpo):
+    """Campos de um corpo multipart/form-data: {nome: bytes}."""
+    mensagem = BytesParser(policy=HTTP).parsebytes(
+        f"Content-Type: {tipo_conteudo}\r\n\r\n".encode('latin-1') + corpo
+    )
+    campos = {}
+    for parte in mensagem.iter_parts():
+        nome = parte.get_param('name', header='content-disposition')
+        if nome:
+            campos[nome] = parte.get_payload(decode=True) or b''
+    return campos
+
+
+# === HTTP ===
+class ManipuladorAnalise(BaseHTTPRequestHandler):
+    """Rotas do serviço; a fila fica em self.server.fila."""
+
+    def log_message(self, formato, *args):
+        pass  # Sem log por requisição (o teste de carga gera milhares)
+
+    def _responder_json(self, codigo, conteudo, cabecalhos=None):
+        corpo = json.dumps(conteudo, ensure_ascii=False).encode('utf-8')
+        self.send_response(codigo)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(corpo)))
+        for chave, valor in (cabecalhos or {}).items():
+            self.send_header(chave, valor)
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def _trabalho(self, id_trabalho):
+        trabalho = self.server.fila['trabalhos'].get(id_trabalho)
+        if trabalho is None:
+            self._responder_json(404, {'erro': 'Análise não encontrada.'})
+        return trabalho
+
+    def do_POST(self):
+        if urlparse(self.path).path.rstrip('/') != '/analises':
+            return self._responder_json(404, {'erro': 'Rota não encontrada.'})
+
+        tamanho = int(self.headers.get('Content-Length') or 0)
+        if not 0 < tamanho <= LIMITE_ENVIO:
+            return self._responder_json(413 if tamanho else 411, {'erro': 'Envio vazio ou acima do limite.'})
+        tipo = self.headers.get('Content-Type', '')
+        if not tipo.startswith('multipart/form-data'):
+            return self._responder_json(415, {'erro': "Use multipart/form-data com 'entrada' e 'termos'."})
+
+        campos = ler_multipart(tipo, self.rfile.read(tamanho))
+        if 'entrada' not in campos or 'termos' not in campos:
+            return self._responder_json(400, {'erro': "Campos obrigatórios: 'entrada' e 'termos'."})
+
+        id_trabalho = enviar_trabalho(self.server.fila, campos['entrada'], campos['termos'])
+        if id_trabalho is None:
+            return self._responder_json(429, {'erro': 'Fila cheia, tente novamente.'}, {'Retry-After': '5'})
+        self._responder_json(202, {'id': id_trabalho, 'status': 'na_fila'}, {'Location': f"/analises/{id_trabalho}"})
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        partes = [p for p in url.path.split('/') if p]
+        if len(partes) < 2 or partes[0] != 'analises':
+            return self._responder_json(404, {'erro': 'Rota não encontrada.'})
+        trabalho = self._trabalho(partes[1])
+        if trabalho is None:
+            return
+
+        if len(partes) == 2:
+            return self._responder_json(200, {'id': partes[1], **situacao(trabalho)})
+        if partes[2:] == ['progresso']:
+            return self._transmitir_progresso(trabalho)
+        if len(partes) == 4 and partes[2] == 'tabelas':
+            formato = parse_qs(url.query).get('formato', ['parquet'])[0]
+            return self._enviar_tabela(trabalho, partes[3], formato)
+        self._responder_json(404, {'erro': 'Rota não encontrada.'})
+
+    def do_DELETE(self):
+        partes = [p for p in urlparse(self.path).path.split('/') if p]
+        if len(partes) != 2 or partes[0] != 'analises':
+            return self._responder_json(404, {'erro': 'Rota não encontrada.'})
+        trabalho = self._trabalho(partes[1])
+        if trabalho is None:
+            return
+        if not trabalho['futuro'].done():
+            return self._responder_json(409, {'erro': 'Análise ainda em andamento.'})
+        remover_trabalho(self.server.fila, partes[1])
+        self._responder_json(200, {'id': partes[1], 'status': 'removida'})
+
+    def _transmitir_progresso(self, trabalho):
+        """Envia cada mensagem de progresso como uma linha JSON, até o fim do trabalho."""
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson; charset=utf-8')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()  # Sem Content-Length: o fluxo termina ao fechar a conexão
+
+        caminho = os.path.join(trabalho['pasta'], ARQUIVO_PROGRESSO)
+        lidos = 0
+        try:
+            while True:
+                terminou = trabalho['futuro'].done()
+                if os.path.exists(caminho):
+                    with open(caminho, 'rb') as arquivo:
+                        arquivo.seek(lidos)
+                        novos = arquivo.read()
+                    # Só envia linhas completas; o resto fica para a próxima leitura
+                    completos = novos[:novos.rfind(b'\n') + 1]
+                    lidos += len(completos)
+                    for linha in completos.decode('utf-8', errors='replace').splitlines():
+                        self.wfile.write(json.dumps({'mensagem': linha}, ensure_ascii=False).encode('utf-8') + b'\n')
+                    self.wfile.flush()
+                if terminou:
+                    break
+                time.sleep(INTERVALO_PROGRESSO)
+            self.wfile.write(json.dumps(situacao(trabalho), ensure_ascii=False).encode('utf-8') + b'\n')
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Cliente desistiu do fluxo
+
+    def _enviar_tabela(self, trabalho, nome, formato):
+        if not trabalho['futuro'].done():
+            return self._responder_json(409, {'erro': 'Análise ainda em andamento.'})
+        caminho = os.path.join(trabalho['pasta'], f"{nome}.parquet")
+        if not os.path.exists(caminho):
+            return self._responder_json(404, {'erro': f"Tabela '{nome}' não disponível."})
+
+        if formato == 'parquet':
+            with open(caminho, 'rb') as arquivo:
+                corpo = arquivo.read()
+            tipo = 'application/vnd.apache.parquet'
+        elif formato == 'json':
+            corpo = pd.read_parquet(caminho).to_json(orient='records', force_ascii=False).encode('utf-8')
+            tipo = 'application/json; charset=utf-8'
+        else:
+            return self._responder_json(400, {'erro': "Formato deve ser 'parquet' ou 'json'."})
+
+        self.send_response(200)
+        self.send_header('Content-Type', tipo)
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+
+def criar_servidor(host=HOST, porta=PORTA, trabalhadores=TRABALHADORES, limite=LIMITE_FILA, pasta=PASTA_TRABALHOS):
+    """Servidor HTTP (uma thread por conexão) com a fila de análises anexada."""
+    servidor = ThreadingHTTPServer((host, porta), ManipuladorAnalise)
+    servidor.daemon_threads = True
+    servidor.fila = criar_fila(trabalhadores, limite, pasta)
+    return servidor
+
+
+def encerrar_servidor(servidor):
+    """Para de aceitar conexões e aguarda as análises em andamento."""
+    servidor.shutdown()
+    servidor.server_close()
+    servidor.fila['pool'].shutdown(wait=True, cancel_futures=True)
+
+
+if __name__ == "__main__":
+    porta = int(sys.argv[1]) if len(sys.argv) > 1 else PORTA
+    servidor = criar_servidor(porta=porta)
+    print(f"🌐 Serviço de análise em http://{HOST}:{porta} ({TRABALHADORES} trabalhadores, fila de {LIMITE_FILA})")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print("Encerrando...")
+    finally:
+        servidor.server_close()
+        servidor.fila['pool'].shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,215 @@
+# 🗄️ Serviço de dados compartilhado pelos dashboards
+# Uma única cópia somente leitura dos resultados por processo, lida sob demanda por tabela;
+# cada perfil recebe uma visão sem cópia.
+
+import os
+import threading
+from collections.abc import Mapping
+import numpy as np
+import pandas as pd
+import streamlit as st
+from esquemas import ler_excel, ESQUEMA_AJUSTES, ESQUEMA_DESCARTES, ESQUEMAS_PRECIFICACAO
+from paineis import ARQUIVO_PAINEIS, montar_paineis, carregar_paineis
+
+ARQUIVO_AJUSTES = 'analise_ajustes_criticos.xlsx'
+ARQUIVO_PRECIFICACAO = 'analise_precificacao_proposta.xlsx'
+ARQUIVO_DESCARTES = 'analise_descartes.xlsx'
+ARQUIVO_NAO_CLASSIFICADOS = 'analise_sem_classificacao.xlsx'
+# Manifestos das tabelas particionadas (particoes): mudam quando o dataset é regravado
+MANIFESTOS_PARTICOES = [
+    'analise_ajustes_criticos_particoes/_manifesto.json', 'analise_descartes_particoes/_manifesto.json'
+]
+
+ABAS_PRECIFICACAO = {
+    'sumario': '1_Summary_Executivo',
+    'detalhes': '2_Estimativa_Detalhada',
+    'pontos': '3_Detalhe_Pontos_Oficiais',
+    'simulacao': '4_Simulacao_Percentis',
+    'simulacao_frentes': '5_Simulacao_Frentes',
+    'histograma': '6_Simulacao_Histograma',
+}
+# Tabelas linha a linha (as que recebem amostragem por perfil)
+TABELAS_DETALHE = ['ajustes', 'descartes', 'nao_classificados']
+
+# Visão de cada perfil: fração amostrada das tabelas de detalhe e permissão de download
+PERFIS = {
+    'gp_admin': {'amostra': None, 'download': True},
+    'gp_visualizacao': {'amostra': None, 'download': False},
+    'demo': {'amostra': 0.1, 'download': False},
+}
+SEMENTE_AMOSTRA = 42
+
+
+def versao_resultados():
+    """Data de modificação dos arquivos de resultado: muda a cada nova execução do main.py."""
+    arquivos = [ARQUIVO_AJUSTES, ARQUIVO_PRECIFICACAO, ARQUIVO_DESCARTES, ARQUIVO_NAO_CLASSIFICADOS, ARQUIVO_PAINEIS,
+                *MANIFESTOS_PARTICOES]
+    return tuple(os.path.getmtime(a) if os.path.exists(a) else 0 for a in arquivos)
+
+
+def _ler_precificacao(dados):
+    """Abas do relatório de precificação ({'sumario', 'detalhes', 'pontos', 'simulacao', ...})."""
+    xls = pd.ExcelFile(ARQUIVO_PRECIFICACAO)
+    return {
+        chave: ler_excel(xls, ESQUEMAS_PRECIFICACAO[aba], sheet_name=aba)
+        for chave, aba in ABAS_PRECIFICACAO.items() if aba in xls.sheet_names
+    }
+
+
+def _ler_paineis(dados):
+    """Painéis pré-calculados pelo main.py."""
+    if os.path.exists(ARQUIVO_PAINEIS):
+        return carregar_paineis(ARQUIVO_PAINEIS)
+    # Resultados gravados antes dos painéis: calcula a partir dos relatórios
+    precificacao = dados.get('precificacao', {})
+    return montar_paineis(
+        precificacao.get('sumario'), precificacao.get('detalhes'), dados.get('ajustes'),
+        precificacao.get('simulacao'), precificacao.get('histograma')
+    )
+
+
+# Tabela -> (arquivos que a tornam disponível, leitor que recebe os próprios dados)
+LEITORES = {
+    'ajustes': ([ARQUIVO_AJUSTES], lambda dados: ler_excel(ARQUIVO_AJUSTES, ESQUEMA_AJUSTES)),
+    'precificacao': ([ARQUIVO_PRECIFICACAO], _ler_precificacao),
+    'descartes': ([ARQUIVO_DESCARTES], lambda dados: ler_excel(ARQUIVO_DESCARTES, ESQUEMA_DESCARTES)),
+    # Colunas livres (varia conforme a origem), mas sempre como texto
+    'nao_classificados': (
+        [ARQUIVO_NAO_CLASSIFICADOS], lambda dados: pd.read_excel(ARQUIVO_NAO_CLASSIFICADOS, dtype='string')
+    ),
+    'paineis': ([ARQUIVO_PAINEIS, ARQUIVO_PRECIFICACAO], _ler_paineis),
+}
+
+
+def _disponivel(nome):
+    """Se algum dos arquivos da tabela existe (sem lê-lo)."""
+    return any(os.path.exists(arquivo) for arquivo in LEITORES[nome][0])
+
+
+class ResultadosSobDemanda(Mapping):
+    """Resultados lidos do disco no primeiro acesso a cada tabela.
+
+    A página que abre primeiro lê só o que exibe (os painéis, na Visão Executiva). `nome in dados`
+    lê a tabela se preciso e é falso quando a leitura falha (o erro vai para `erros`); len() e a
+    iteração consideram os arquivos existentes, sem lê-los.
+    """
+
+    def __init__(self, erros, tabelas=None):
+        self.erros = erros
+        self._tabelas = dict(tabelas or {})
+        self._trava = threading.RLock()
+
+    def _disponiveis(self):
+        lidas = [nome for nome, tabela in self._tabelas.items() if tabela is not None]
+        return lidas + [nome for nome in LEITORES if nome not in self._tabelas and _disponivel(nome)]
+
+    def _ler(self, nome):
+        if not _disponivel(nome):
+            return None
+        try:
+            return LEITORES[nome][1](self)
+        except Exception as e:
+            self.erros.append(f"Erro ao carregar {nome}: {e}")
+            return None
+
+    def __getitem__(self, nome):
+        if nome not in self._tabelas and nome in LEITORES:
+            with self._trava:
+                if nome not in self._tabelas:
+                    self._tabelas[nome] = self._ler(nome)
+        tabela = self._tabelas.get(nome)
+        if tabela is None:
+            raise KeyError(nome)
+        return tabela
+
+    def __iter__(self):
+        return iter(self._disponiveis())
+
+    def __len__(self):
+        return len(self._disponiveis())
+
+
+@st.cache_resource
+def _servico_dados():
+    """Estado único por processo, compartilhado por todas as sessões."""
+    return {'versao': None, 'dados': {}, 'erros': [], 'visoes': {}, 'indices': {}, 'trava': threading.Lock()}
+
+
+def obter_dados():
+    """Resultados compartilhados, renovados apenas quando os arquivos mudam.
+
+    Retorna (dados, versao, erros). `dados` lê cada tabela do disco no primeiro acesso
+    (ResultadosSobDemanda); os DataFrames não devem ser alterados por quem os recebe.
+    """
+    servico = _servico_dados()
+    versao = versao_resultados()
+    if servico['versao'] != versao:
+        with servico['trava']:
+            if servico['versao'] != versao:
+                erros = []
+                servico.update(dados=ResultadosSobDemanda(erros), erros=erros, visoes={}, indices={}, versao=versao)
+    return servico['dados'], servico['versao'], servico['erros']
+
+
+def publicar_dados(dados):
+    """Publica resultados recém-calculados no processo, sem reler os relatórios gravados.
+
+    `dados` traz as tabelas já nos esquemas ('ajustes', 'precificacao', 'descartes', 'paineis');
+    as ausentes continuam sendo lidas sob demanda. A versão passa a ser a dos arquivos
+    recém-gravados, então as sessões não disparam uma nova leitura.
+    """
+    servico = _servico_dados()
+    erros = []
+    with servico['trava']:
+        servico.update(
+            dados=ResultadosSobDemanda(erros, dados), erros=erros, visoes={}, indices={}, versao=versao_resultados()
+        )
+
+
+def indices_compartilhados():
+    """Armazenamento dos índices do explorador, compartilhado entre sessões (renovado a cada versão)."""
+    return _servico_dados()['indices']
+
+
+def _mascara_amostra(total, fracao):
+    """Amostra fixa (mesma semente para todas as sessões) de uma tabela de detalhe."""
+    if fracao is None:
+        return None
+    mascara = np.random.default_rng(SEMENTE_AMOSTRA).random(total) < fracao
+    mascara.setflags(write=False)
+    return mascara
+
+
+def obter_visao(perfil):
+    """Visão do perfil sobre os dados compartilhados, sem copiar os DataFrames.
+
+    Retorna um dicionário com 'dados', 'versao', 'erros', 'amostra' (fração exibida das tabelas
+    de detalhe, None quando todas), 'mascaras' (preenchidas por aplicar_visao) e 'download'.
+    """
+    dados, versao, erros = obter_dados()
+    servico = _servico_dados()
+    config = PERFIS.get(perfil, PERFIS['demo'])
+
+    visao = servico['visoes'].get(perfil)
+    if visao is None or visao['versao'] != versao:
+        visao = {
+            'dados': dados,
+            'versao': versao,
+            'erros': erros,
+            'amostra': config['amostra'],
+            'mascaras': {},
+            'download': config['download'],
+        }
+        servico['visoes'][perfil] = visao
+    return visao
+
+
+def aplicar_visao(visao, nome, mascara):
+    """Restringe uma máscara do explorador às linhas visíveis para o perfil."""
+    if visao['amostra'] is None or nome not in TABELAS_DETALHE:
+        return mascara
+    # A amostra de cada tabela é sorteada no primeiro uso (a tabela só é lida quando exibida)
+    mascara_perfil = visao['mascaras'].get(nome)
+    if mascara_perfil is None:
+        mascara_perfil = visao['mascaras'].setdefault(nome, _mascara_amostra(len(mascara), visao['amostra']))
+    return mascara & mascara_perfil
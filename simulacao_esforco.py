@@ -0,0 +1,89 @@
+# 📈 Simulação Monte Carlo do esforço da proposta
+# O esforço de cada frente de trabalho é incerto: ao lado do esforço nominal, cada frente traz os
+# multiplicadores otimista e pessimista de uma distribuição PERT (beta) cujo valor mais provável é o
+# nominal. Cada categoria de esforço (Dev, Testes) tem ainda um fator de produtividade comum a todas
+# as frentes (lognormal de mediana 1), que faz os desvios andarem juntos. Os cenários são sorteados
+# de uma vez em matrizes NumPy (cenários × frentes) e resumidos em percentis e em um histograma.
+
+import os
+import math
+import numpy as np
+import pandas as pd
+
+CENARIOS_PADRAO = int(os.environ.get("CNPJ_CENARIOS", "100000"))
+SEMENTE_SIMULACAO = 42
+PERCENTIS = (50, 80, 95)
+FAIXAS_HISTOGRAMA = 40
+# Peso do valor mais provável na PERT clássica: média = (otimista + 4·provável + pessimista) / 6
+PESO_PERT = 4
+
+# Categoria de esforço -> campo do esforço nominal em cada frente
+CAMPOS_CATEGORIA = {'Dev': 'esforco_dev', 'Testes': 'esforco_testes'}
+METRICAS_CATEGORIA = {'Dev': 'Esforço Desenvolvimento', 'Testes': 'Esforço Testes QA'}
+
+
+def sortear_pert(gerador, minimo, provavel, maximo, cenarios):
+    """Amostras PERT (cenários × colunas) para vetores de mínimo, mais provável e máximo."""
+    amplitude = maximo - minimo
+    com_amplitude = amplitude > 0
+    alfa = 1 + PESO_PERT * np.divide(provavel - minimo, amplitude, out=np.zeros_like(amplitude), where=com_amplitude)
+    beta = 1 + PESO_PERT * np.divide(maximo - provavel, amplitude, out=np.zeros_like(amplitude), where=com_amplitude)
+    return minimo + amplitude * gerador.beta(alfa, beta, size=(cenarios, len(minimo)))
+
+
+def simular_esforco(atividades, incerteza_categorias, cenarios=CENARIOS_PADRAO, semente=SEMENTE_SIMULACAO):
+    """Sorteia o esforço das frentes em `cenarios` cenários.
+
+    `atividades` segue ATIVIDADES_BASE_PROJETO ('incerteza': {'otimista', 'pessimista'} em
+    multiplicadores do nominal; sem ela, a frente é fixa) e `incerteza_categorias` é {categoria:
+    desvio-padrão do log do fator de produtividade}. Retorna {categoria: matriz cenários × frentes}.
+    """
+    gerador = np.random.default_rng(semente)
+    incertezas = [config.get('incerteza', {}) for config in atividades.values()]
+    otimista = np.array([i.get('otimista', 1.0) for i in incertezas])
+    pessimista = np.array([i.get('pessimista', 1.0) for i in incertezas])
+
+    esforcos = {}
+    for categoria, campo in CAMPOS_CATEGORIA.items():
+        nominal = np.array([config[campo] for config in atividades.values()], dtype=float)
+        amostras = sortear_pert(gerador, nominal * otimista, nominal, nominal * pessimista, cenarios)
+        fator = gerador.lognormal(0.0, incerteza_categorias.get(categoria, 0.0), size=(cenarios, 1))
+        esforcos[categoria] = amostras * fator
+    return esforcos
+
+
+def _linha_percentis(amostras, deterministico):
+    percentis = np.percentile(amostras, PERCENTIS)
+    return {
+        'Determinístico (h)': round(deterministico), 'Média (h)': round(float(amostras.mean())),
+        **{f"P{p} (h)": round(float(valor)) for p, valor in zip(PERCENTIS, percentis)},
+    }
+
+
+def resumir_simulacao(atividades, esforcos, faixas=FAIXAS_HISTOGRAMA):
+    """Tabelas da simulação: {'simulacao' (totais), 'simulacao_frentes' (por frente), 'histograma' (do total)}."""
+    totais = {categoria: matriz.sum(axis=1) for categoria, matriz in esforcos.items()}
+    total = sum(totais.values())
+    nominais = {categoria: sum(config[campo] for config in atividades.values())
+                for categoria, campo in CAMPOS_CATEGORIA.items()}
+
+    simulacao = [{'Métrica': METRICAS_CATEGORIA[c], **_linha_percentis(totais[c], nominais[c])} for c in totais]
+    simulacao.append({'Métrica': 'Total Estimado', **_linha_percentis(total, sum(nominais.values()))})
+
+    por_frente = sum(esforcos.values())
+    frentes = [
+        {'Frente de Trabalho': config['nome'],
+         **_linha_percentis(por_frente[:, coluna], sum(config[campo] for campo in CAMPOS_CATEGORIA.values()))}
+        for coluna, config in enumerate(atividades.values())
+    ]
+
+    # Faixas de largura inteira (horas) cobrindo todos os cenários
+    inicio = math.floor(total.min())
+    largura = max(1, math.ceil((math.ceil(total.max()) - inicio) / faixas))
+    limites = inicio + largura * np.arange(faixas + 1)
+    contagem, _ = np.histogram(total, bins=limites)
+    histograma = pd.DataFrame({
+        'Início (h)': limites[:-1], 'Fim (h)': limites[1:], 'Cenários': contagem,
+        'Acumulado (%)': np.round(100 * np.cumsum(contagem) / len(total), 2),
+    })
+    return {'simulacao': pd.DataFrame(simulacao), 'simulacao_frentes': pd.DataFrame(frentes), 'histograma': histograma}